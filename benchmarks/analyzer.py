@@ -0,0 +1,45 @@
+"""
+Benchmark of the sliding window lane search of modules.analyzer against its former per-pixel version.
+
+    python -m benchmarks.analyzer [--repeat 3]
+"""
+import math
+import time
+import argparse
+import warnings
+
+from modules.analyzer import SlidingWindow
+from tests.legacy.analyzer import legacy_find_lines, synthetic_segment, same_lines
+
+
+def timeit(func, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_find_lines(img, ls, outlier_threshold, repeat):
+    window = SlidingWindow(img, ls)
+    legacy, expected = timeit(lambda: legacy_find_lines(img, ls, 0, outlier_threshold, 12), repeat)
+    vectorized, actual = timeit(lambda: window.find_lines(0, outlier_threshold, 12), repeat)
+    assert all(same_lines(e, a) for e, a in zip(expected, actual)), 'the window lines differ'
+    print(f'find_lines {img.shape[1]}x{img.shape[0]} outlier_threshold={outlier_threshold}: '
+          f'legacy {legacy * 1000:9.2f} ms, array {vectorized * 1000:8.2f} ms, x{legacy / vectorized:6.1f}')
+
+
+def main():
+    warnings.filterwarnings('ignore')
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for width, height in [(400, 300), (1200, 900)]:
+        img, ls = synthetic_segment(width, height)
+        for outlier_threshold in [0, 5]:
+            bench_find_lines(img, ls, outlier_threshold, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark of the vehicle extraction steps of modules.crisce.car against their former versions: the color
+segmentation, the crash point search, the triangle extraction and the projection of the vehicles on the sides of the
+frame.
+
+    python -m benchmarks.car [--repeat 3]
+
+The vehicle snapshots are synthetic: rotated boxes along two crossing paths, with the nodes of Car.edgesofTheCar,
+drawn as colored boxes with a white triangle on a white sketch.
+"""
+import math
+import time
+import argparse
+import numpy as np
+
+from modules.constant import CONST
+from modules.crisce.artifacts import ArtifactWriter
+from tests.legacy.car import legacy_segmentation, legacy_closest_nodes, legacy_extract_triangle, \
+    legacy_projected_sides, projected_sides, synthetic_sketch, synthetic_vehicles, stacks_of
+
+
+def timeit(func, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_segmentation(num_snapshots, width, height, repeat):
+    car, image = synthetic_sketch(num_snapshots, width, height)
+    legacy, (expected_masks, expected) = timeit(lambda: legacy_segmentation(car.pre_process, image), repeat)
+    fused, (masks, segments) = timeit(lambda: car.pre_process.segmentVehicles(image), repeat)
+    for vehicle_color in expected:
+        assert np.array_equal(masks[vehicle_color], expected_masks[vehicle_color]), 'the masks differ'
+        assert np.array_equal(segments[vehicle_color], expected[vehicle_color]), 'the segmented masks differ'
+    print(f'segmentVehicles {width}x{height}: legacy {legacy * 1000:9.2f} ms, '
+          f'single stage {fused * 1000:8.2f} ms, x{legacy / fused:6.1f}')
+
+
+def bench_crash_point(num_snapshots, repeat):
+    car = synthetic_vehicles(num_snapshots)
+    car.output_folder, car.process_number = "", 0
+    car.artifacts = ArtifactWriter(level=CONST.ARTIFACTS_NONE, asynchronous=False)
+    image = np.zeros((1000, 1000, 3), dtype=np.uint8)
+    legacy, expected = timeit(lambda: legacy_closest_nodes(stacks_of(car)), repeat)
+    vectorized, crash_point = timeit(lambda: car.extractingCrashPoint(image, dict()), repeat)
+    expected_point = [(expected[1][0] + expected[2][0]) // 2, (expected[1][1] + expected[2][1]) // 2]
+    assert crash_point == expected_point, 'the crash points differ'
+    assert car.vehicles["red"]["crash_point"]["dist_to_vehicle"] == expected[0], 'the distances differ'
+    print(f'extractingCrashPoint {num_snapshots:>3} snapshots per vehicle: legacy {legacy * 1000:9.2f} ms, '
+          f'array {vectorized * 1000:8.2f} ms, x{legacy / vectorized:6.1f}')
+
+
+def bench_extract_triangle(num_snapshots, width, height, repeat):
+    car, image = synthetic_sketch(num_snapshots, width, height)
+    car.output_folder, car.process_number, car.headless = "", 0, True
+    car.artifacts = ArtifactWriter(level=CONST.ARTIFACTS_NONE, asynchronous=False)
+    legacy_image, roi_image = image.copy(), image.copy()
+    legacy, expected = timeit(lambda: legacy_extract_triangle(car.vehicles, legacy_image), repeat)
+    roi, _ = timeit(lambda: car.extractTriangle(roi_image, dict()), repeat)
+    for (vehicle_color, vehicle_id), position in expected.items():
+        actual = car.vehicles[vehicle_color]["vehicle_info"][vehicle_id]["triangle_position"]
+        assert actual == position, 'the triangle positions differ'
+    assert np.array_equal(legacy_image, roi_image), 'the images differ'
+    print(f'extractTriangle {width}x{height} {2 * num_snapshots:>3} snapshots: legacy {legacy * 1000:9.2f} ms, '
+          f'roi {roi * 1000:8.2f} ms, x{legacy / roi:6.1f}')
+
+
+def bench_projected_sides(num_snapshots, width, height, repeat):
+    car = synthetic_vehicles(num_snapshots, width, height)
+    legacy, expected = timeit(lambda: [legacy_projected_sides(car, color, height, width) for color in car.vehicles],
+                              repeat)
+    analytic, actual = timeit(lambda: [projected_sides(car, color, height, width) for color in car.vehicles], repeat)
+    assert actual == expected, 'the projected sides differ'
+    print(f'extractVehicleProjectedSide {width}x{height} {2 * num_snapshots:>3} snapshots: '
+          f'legacy {legacy * 1000:9.2f} ms, analytic {analytic * 1000:8.2f} ms, x{legacy / analytic:6.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for width, height in [(1000, 1000), (3000, 2000)]:
+        bench_segmentation(10, width, height, args.repeat)
+    for num_snapshots in [3, 10, 30]:
+        bench_crash_point(num_snapshots, args.repeat)
+    for width, height in [(1000, 1000), (3000, 2000)]:
+        for num_snapshots in [5, 20]:
+            bench_extract_triangle(num_snapshots, width, height, args.repeat)
+    for width, height in [(1000, 1000), (4000, 3000), (12000, 9000)]:
+        bench_projected_sides(10, width, height, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark of the array-backed Stripe and Vehicle script against the former lists of tuples and dicts: memory held by
+the points of the stripes and the nodes of the scripts, time to build them and time to encode them for data.json.
+
+    python -m benchmarks.models [--repeat 3]
+"""
+import json
+import math
+import time
+import argparse
+import tracemalloc
+import numpy as np
+from types import SimpleNamespace
+
+from modules.constant import CONST
+from modules.models import Line, Stripe
+from modules.models.lib import generate
+from modules.crisce.vehicle import Vehicle
+from modules.data_handler import encode, encode_stripe
+
+
+def legacy_generate(line, r, width):
+    """ Former models.lib.generate """
+    return [(x, y, 0, width) for x, y in line.scale(r).tolist()]
+
+
+def legacy_script(xs, ys, ts):
+    """ The former script of a vehicle, as built by Kinematics.convertingToScriptFormat """
+    return [{'x': x, 'y': y, 'z': 0, 't': t} for x, y, t in zip(xs.tolist(), ys.tolist(), ts.tolist())]
+
+
+def build_legacy(lines, paths):
+    stripes = [SimpleNamespace(points=legacy_generate(line, 1.5, 0.1), num=line.num, pattern=line.pattern)
+               for line in lines]
+    return stripes, [legacy_script(*path) for path in paths]
+
+
+def build(lines, paths):
+    stripes = [Stripe(generate(line, 1.5, 0.1), line.num, line.pattern) for line in lines]
+    vehicles = [Vehicle(legacy_script(*path), (0, 0, 0), (0, 0, -90), "red", CONST.RED_RGBA, [], [])
+                for path in paths]
+    return stripes, vehicles
+
+
+def encode_legacy(stripes, scripts):
+    """ The stripes and scripts in JSON, as the former DataHandler.write_json encoded them """
+    return [encode(s.__dict__) for s in stripes], [encode(script) for script in scripts]
+
+
+def encode_arrays(stripes, vehicles):
+    return [encode_stripe(s) for s in stripes], [encode(v.script) for v in vehicles]
+
+
+def held_memory(func):
+    """ Memory in bytes still allocated by func when it returns, i.e. held by its result """
+    # Vehicle imports matplotlib.colors on its first construction
+    import matplotlib.colors
+    tracemalloc.start()
+    try:
+        result = func()
+        return tracemalloc.get_traced_memory()[0], result
+    finally:
+        tracemalloc.stop()
+
+
+def timeit(func, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_models(num_lines, num_points, num_nodes, repeat):
+    rng = np.random.default_rng(0)
+    lines = [Line(ls=None).with_coords(np.stack([np.linspace(0, 100, num_points), rng.normal(i, 0.1, num_points)],
+                                                axis=1)) for i in range(num_lines)]
+    for line in lines:
+        line.num, line.pattern = CONST.SINGLE, CONST.SOLID
+    paths = [(np.linspace(0, 50, num_nodes), np.full(num_nodes, 25.0), np.arange(num_nodes) * 0.05)] * 2
+
+    legacy_memory, _ = held_memory(lambda: build_legacy(lines, paths))
+    memory, _ = held_memory(lambda: build(lines, paths))
+    legacy_build, legacy = timeit(lambda: build_legacy(lines, paths), repeat)
+    array_build, built = timeit(lambda: build(lines, paths), repeat)
+    legacy_encode, expected = timeit(lambda: encode_legacy(*legacy), repeat)
+    array_encode, actual = timeit(lambda: encode_arrays(*built), repeat)
+    assert [json.loads(e) for e in expected[0] + expected[1]] == [json.loads(a) for a in actual[0] + actual[1]], \
+        'the JSON differs'
+    print(f'{num_lines:>5} stripes x {num_points:>6} points, {num_nodes:>6} nodes: '
+          f'memory legacy {legacy_memory / 2 ** 20:8.2f} MiB, arrays {memory / 2 ** 20:8.2f} MiB | '
+          f'stripes from lines legacy {legacy_build * 1000:8.2f} ms, arrays {array_build * 1000:8.2f} ms | '
+          f'encode legacy {legacy_encode * 1000:8.2f} ms, arrays {array_encode * 1000:8.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for num_lines, num_points, num_nodes in [(12, 100, 50), (50, 1000, 1000), (200, 5000, 20000)]:
+        bench_models(num_lines, num_points, num_nodes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark of the outputs of DataHandler: the streaming data.json writer against the former one (write time and
+peak memory), and the columnar output (modules.columnar) against data.json (write time, size on disk and load time).
+
+    python -m benchmarks.output [--repeat 3]
+
+Scenarios are synthetic: roads of two lanes whose stripes have many points, and two vehicles with long crossing
+scripts. The columnar output is loaded both memory-mapped (header and arrays, what a batch consumer reads) and
+converted to the dict of data.json.
+"""
+import os
+import json
+import math
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+import numpy as np
+
+from modules.constant import CONST
+from modules.crisce.vehicle import Vehicle
+from modules.data_handler import DataHandler
+from modules.columnar import load_columnar, to_dict
+from tests.legacy.output import stripe, road
+
+
+def synthetic_scenario(num_roads, num_points, num_nodes, seed=0):
+    rng = np.random.default_rng(seed)
+    xs = np.linspace(0, 100, num_points).tolist()
+    noisy = lambda offset, width: stripe(offset + rng.normal(0, 0.1, num_points), xs, CONST.SINGLE, CONST.SOLID, width)
+    roads = [road(left=noisy(7, 0.1), center=noisy(3.5, 7), right=noisy(0, 0.1), marks=[noisy(3.5, 0.1)])
+             for _ in range(num_roads)]
+    vehicles = list()
+    # The trajectories cross once, at the crash point
+    path = np.linspace(0, 50, num_nodes)
+    for color, code, xs, ys in [("red", CONST.RED_RGBA, path, np.full(num_nodes, 25.0)),
+                                ("blue", CONST.BLUE_RGBA, np.full(num_nodes, 25.0), path)]:
+        script = [{'x': x, 'y': y, 'z': 0, 't': i * 0.05} for i, (x, y) in enumerate(zip(xs.tolist(), ys.tolist()))]
+        vehicles.append(Vehicle(script, (0, 2, 0), (0, 0, -90), color, code, [(p['x'], p['y'], 0) for p in script],
+                                [(p['x'], p['y'], 0, 0.25) for p in script]))
+    return DataHandler(vehicles=vehicles, roads=roads, sketch_name="bench", rot_deg=0)
+
+
+def legacy_to_json(dh):
+    """ Former DataHandler.to_json, which encodes the whole document in one string """
+    vehicles, crash_point = dh.vehicles2json()
+    data = {"name": dh.sketch_name, "roads": dh.roads2json(), "vehicles": vehicles, "crash_point": crash_point,
+            "rot_deg": dh.rot_deg}
+    json_string = json.dumps(data)
+    os.makedirs(f'outputs/{dh.sketch_name}/', exist_ok=True)
+    with open(f'outputs/{dh.sketch_name}/data.json', 'w') as outfile:
+        outfile.write(json_string)
+
+
+def peak_memory(func):
+    """ Peak of the memory allocated by func in bytes """
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def timeit(func, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def load_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def bench_output(num_roads, num_points, num_nodes, repeat):
+    dh = synthetic_scenario(num_roads, num_points, num_nodes)
+    cwd = os.getcwd()
+    folder = tempfile.mkdtemp()
+    try:
+        # DataHandler writes to outputs/<sketch_name> of the working directory
+        os.chdir(folder)
+        legacy_write, _ = timeit(lambda: legacy_to_json(dh), repeat)
+        legacy_peak = peak_memory(lambda: legacy_to_json(dh))
+        legacy = load_json("outputs/bench/data.json")
+        json_write, _ = timeit(dh.to_json, repeat)
+        json_peak = peak_memory(dh.to_json)
+        columnar_write, _ = timeit(dh.to_columnar, repeat)
+        json_path, columnar_path = "outputs/bench/data.json", "outputs/bench/data"
+        json_load, expected = timeit(lambda: load_json(json_path), repeat)
+        mmap_load, _ = timeit(lambda: load_columnar(columnar_path), repeat)
+        dict_load, actual = timeit(lambda: to_dict(*load_columnar(columnar_path, mmap_mode=None)), repeat)
+        assert expected == legacy, 'the streamed data.json differs'
+        assert actual == expected, 'the outputs differ'
+        json_size, columnar_size = size(json_path), size(columnar_path)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(folder, ignore_errors=True)
+    print(f'{num_roads:>4} roads x {num_points:>6} points, {num_nodes:>6} nodes: '
+          f'write legacy json {legacy_write * 1000:9.2f} ms (peak {legacy_peak / 2 ** 20:7.1f} MiB), '
+          f'json {json_write * 1000:9.2f} ms (peak {json_peak / 2 ** 20:7.1f} MiB), '
+          f'columnar {columnar_write * 1000:8.2f} ms | '
+          f'size json {json_size / 1024:9.1f} KiB, columnar {columnar_size / 1024:8.1f} KiB | '
+          f'load json {json_load * 1000:9.2f} ms, columnar mmap {mmap_load * 1000:6.2f} ms, '
+          f'as dict {dict_load * 1000:8.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for num_roads, num_points, num_nodes in [(4, 100, 50), (10, 1000, 1000), (50, 5000, 20000)]:
+        bench_output(num_roads, num_points, num_nodes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Benchmark of the stages of modules.process.run over synthetic accident sketches, with regression thresholds.
+
+    python -m benchmarks.pipeline [--repeat 5] [--scales 1 2 3] [--tolerance 0.5] [--update]
+
+The start-up of the command line is measured as well, under the "imports" case: the wall time of a fresh
+`python main.py --help` and the cumulative import time (python -X importtime) of main and modules.process.
+
+Every sketch is drawn at several resolutions: straight, curved, T-section and 4-way roads with a red and a blue car
+driving towards each other and a direction arrow. The best wall time of each stage over --repeat runs is compared
+with the baseline (benchmarks/baseline.json), a stage slower than its baseline by more than --tolerance (and by
+more than --min-delta seconds) is a regression and fails the run. --update writes the current timings as the new
+baseline, which is specific to the machine that measured it.
+"""
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import argparse
+import tempfile
+import warnings
+import subprocess
+
+from modules.constant import CONST
+from tests.legacy.sketches import synthetic_case, WIDTH, HEIGHT
+
+# Name of each benchmarked stage and the span of modules.process.run which times it
+STAGES = {"Car": "vehicles", "Roads": "roads", "Kinematics": "kinematics", "ArrowAnalyzer": "arrow",
+          "Analyzer": "lane_analysis", "Slash": "slash"}
+KINDS = ["straight", "curved", "t-section", "4-way"]
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules whose cumulative import time is measured
+IMPORTS = ["main", "modules.process"]
+
+
+def bench_case(kind, scale, repeat):
+    """
+    Best wall time of each stage over repeat runs of a synthetic case
+
+    Returns:
+        dict of stage to seconds, or the error of the run
+    """
+    from modules.process import run
+
+    cwd = os.getcwd()
+    folder = tempfile.mkdtemp()
+    best = {stage: math.inf for stage in STAGES}
+    try:
+        case = synthetic_case(os.path.join(folder, f'{kind}-x{scale:g}'), kind, scale)
+        # run writes to outputs/<case> of the working directory
+        os.chdir(folder)
+        for _ in range(repeat):
+            spans = run(case, headless=True, figure=False, artifacts=CONST.ARTIFACTS_NONE, cache=False, trace=False)
+            walls = {span["path"]: span["wall_time"] for span in spans}
+            for stage, path in STAGES.items():
+                best[stage] = min(best[stage], walls[path])
+    except Exception as ex:
+        return {"error": f'{type(ex).__name__}: {ex}'}
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(folder, ignore_errors=True)
+    return best
+
+
+def import_time(module):
+    """ Cumulative import time of a module in seconds, imported by a fresh interpreter with -X importtime """
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", f'import {module}'], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1e6
+    raise RuntimeError(f'No import time reported for {module}')
+
+
+def bench_imports(repeat):
+    """
+    Best start-up times of the command line over repeat fresh interpreters
+
+    Returns:
+        dict of measure to seconds, or the error of the run
+    """
+    best = {"cli --help": math.inf, **{f'import {module}': math.inf for module in IMPORTS}}
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "main.py", "--help"], cwd=ROOT, capture_output=True, check=True)
+            best["cli --help"] = min(best["cli --help"], time.perf_counter() - start)
+            for module in IMPORTS:
+                best[f'import {module}'] = min(best[f'import {module}'], import_time(module))
+    except (subprocess.CalledProcessError, RuntimeError) as ex:
+        return {"error": f'{type(ex).__name__}: {ex}'}
+    return best
+
+
+def report(case, timings):
+    if "error" in timings:
+        print(f'{case:>22}: {timings["error"]}')
+    else:
+        print(f'{case:>22}: ' + ", ".join(f'{stage} {seconds * 1000:8.2f} ms' for stage, seconds in timings.items()))
+
+
+def compare(results, baseline, tolerance, min_delta):
+    """
+    Regressions of the results against the baseline
+
+    Returns:
+        list of (case, stage, baseline seconds, current seconds)
+    """
+    regressions = list()
+    for case, stages in results.items():
+        if case not in baseline or "error" in baseline[case]:
+            continue
+        if "error" in stages:
+            regressions.append((case, "error", None, stages["error"]))
+            continue
+        for stage, current in stages.items():
+            expected = baseline[case].get(stage)
+            if expected is not None and current > expected * (1 + tolerance) and current - expected > min_delta:
+                regressions.append((case, stage, expected, current))
+    return regressions
+
+
+def main():
+    warnings.filterwarnings('ignore')
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=KINDS)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--output", default=None, help="Write the timings of this run to a JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed slowdown relative to the baseline")
+    parser.add_argument("--min-delta", type=float, default=0.01, help="Slowdowns below it (seconds) are noise")
+    parser.add_argument("--update", action="store_true", help="Write the timings of this run as the baseline")
+    args = parser.parse_args()
+
+    results = {"imports": bench_imports(args.repeat)}
+    report("imports", results["imports"])
+    for kind in args.kinds:
+        for scale in args.scales:
+            case = f'{kind}@{int(WIDTH * scale)}x{int(HEIGHT * scale)}'
+            results[case] = bench_case(kind, scale, args.repeat)
+            report(case, results[case])
+
+    if args.output:
+        with open(args.output, "w") as outfile:
+            json.dump(results, outfile, indent=2)
+    if args.update:
+        with open(args.baseline, "w") as outfile:
+            json.dump(results, outfile, indent=2)
+        print(f'Baseline is written to {args.baseline} !')
+        return
+    if not os.path.exists(args.baseline):
+        print(f'No baseline {args.baseline}, run with --update to create it')
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.min_delta)
+    for case, stage, expected, current in regressions:
+        if stage == "error":
+            print(f'REGRESSION {case}: {current}')
+        else:
+            print(f'REGRESSION {case} {stage}: {expected * 1000:.2f} ms -> {current * 1000:.2f} ms')
+    if len(regressions) > 0:
+        sys.exit(1)
+    print(f'No regression beyond {args.tolerance:.0%} of the baseline')
+
+
+if __name__ == "__main__":
+    main()
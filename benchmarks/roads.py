@@ -0,0 +1,96 @@
+"""
+Benchmark of the road extraction helpers of modules.crisce.roads against their former pure-Python versions.
+
+    python -m benchmarks.roads [--cases cases/original] [--repeat 5]
+
+Without cases, synthetic long contours are used.
+"""
+import os
+import math
+import time
+import argparse
+import itertools
+import numpy as np
+import cv2
+
+from modules.crisce.roads import Roads
+from tests.legacy.roads import legacy_nearest_point_pairs, legacy_remove_redundant_midpoints, synthetic_midpoints
+
+
+def synthetic_contours(num_points=6000, num_contours=4, seed=0):
+    """ Long closed contours, similar to the borders of the roads of a 4-way sketch """
+    rng = np.random.default_rng(seed)
+    contours = []
+    for i in range(num_contours):
+        t = np.linspace(0, 2 * np.pi, num_points, endpoint=False)
+        center = rng.integers(300, 900, size=2)
+        radius = rng.integers(150, 400, size=2)
+        contour = np.stack([center[0] + radius[0] * np.cos(t), center[1] + radius[1] * np.sin(t)], axis=1)
+        contours.append(np.round(contour).astype(np.int32))
+    return contours
+
+
+def case_contours(case, min_length=200):
+    """ Large contours of the road sketch of a case, extracted as in Roads.extractRoadInformation """
+    path = os.path.join(case, "road.jpeg")
+    if not os.path.exists(path):
+        path = os.path.join(case, "road.jpg")
+    gray = cv2.cvtColor(cv2.imread(path), cv2.COLOR_BGR2GRAY)
+    _, thresh = cv2.threshold(gray, 50, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    morph = cv2.erode(cv2.dilate(thresh, np.ones((10, 10), np.uint8)), np.ones((10, 10), np.uint8))
+    contours, _ = cv2.findContours(morph, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+    return [c.reshape(c.shape[0], 2) for c in contours if cv2.arcLength(c, False) >= min_length]
+
+
+def timeit(func, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_nearest_point_pairs(name, contours, repeat):
+    roads = Roads()
+    pairs = [(c1[0::15, :], c2[0::15, :]) for c1, c2 in itertools.combinations(contours, 2)]
+    legacy, expected = timeit(lambda: [legacy_nearest_point_pairs(p1, p2) for p1, p2 in pairs], repeat)
+    vectorized, actual = timeit(lambda: [roads.nearestPointPairs(p1, p2) for p1, p2 in pairs], repeat)
+    assert actual == expected, f'{name}: the nearest point pairs differ'
+    print(f'nearestPointPairs {name:>20}: {len(contours)} contours, legacy {legacy * 1000:9.2f} ms, '
+          f'vectorized {vectorized * 1000:8.2f} ms, x{legacy / vectorized:6.1f}')
+
+
+def bench_remove_redundant_midpoints(num_points, repeat):
+    roads = Roads()
+    midpoints = synthetic_midpoints(num_points)
+    sample_size = 15
+    legacy, expected = timeit(lambda: legacy_remove_redundant_midpoints(midpoints, sample_size), repeat)
+    spatial, actual = timeit(lambda: roads.removeRedundantMidpointsOfLane(midpoints, sample_size), repeat)
+    assert np.allclose(np.array(actual, dtype=float), np.array(expected, dtype=float)), 'the merged midpoints differ'
+    print(f'removeRedundantMidpointsOfLane {len(midpoints):>7} midpoints: legacy {legacy * 1000:9.2f} ms, '
+          f'KD-tree {spatial * 1000:8.2f} ms, x{legacy / spatial:6.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", help="Folder of accident sketches")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    benchmarks = [("synthetic", synthetic_contours())]
+    if args.cases:
+        for case in sorted(os.listdir(args.cases)):
+            contours = case_contours(os.path.join(args.cases, case))
+            if len(contours) >= 2:
+                benchmarks.append((case, contours))
+
+    for name, contours in benchmarks:
+        bench_nearest_point_pairs(name, contours, args.repeat)
+
+    for num_points in [500, 2000, 5000]:
+        bench_remove_redundant_midpoints(num_points, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
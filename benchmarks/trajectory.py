@@ -0,0 +1,48 @@
+"""
+Benchmark of the script generation of modules.crisce.kinematics against the former loops: the arc length of the
+simulation trajectories and their conversion to BeamNG AI scripts, with the time stamps of the nodes.
+
+    python -m benchmarks.trajectory [--repeat 3]
+
+The trajectories are synthetic: a red and a blue vehicle on noisy crossing paths, the blue one being shorter so that
+it is delayed.
+"""
+import math
+import time
+import argparse
+
+from modules.crisce.trajectory import script_dicts
+from tests.legacy.kinematics import synthetic_vehicles, plan, legacy_plan
+
+
+def timeit(func, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_trajectory(num_points, repeat):
+    vehicles = synthetic_vehicles(num_points)
+    # Kinematics prints the time stamps of the vehicles
+    array_time, planned = timeit(lambda: plan(vehicles), repeat)
+    legacy_time, legacy = timeit(lambda: legacy_plan(planned), repeat)
+    for color, (arc, script) in legacy.items():
+        assert math.isclose(planned[color]["kinematics"]["arc_length"], arc, rel_tol=1e-12), 'the arc lengths differ'
+        assert script_dicts(planned[color]["trajectories"]["script_trajectory"]) == script, 'the scripts differ'
+    print(f'{num_points:>7} points: legacy {legacy_time * 1000:9.2f} ms, arrays {array_time * 1000:8.2f} ms '
+          f'({legacy_time / array_time:5.1f}x)')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for num_points in [50, 1000, 20000, 200000]:
+        bench_trajectory(num_points, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
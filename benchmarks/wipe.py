@@ -0,0 +1,47 @@
+"""
+Benchmark of the overlap removal of modules.wipe.Slash against its former pairwise version.
+
+    python -m benchmarks.wipe [--repeat 3]
+
+Segments are synthetic: n-leg intersections, and grid maps of many short roads overlapping at their crossings.
+"""
+import copy
+import math
+import time
+import argparse
+import warnings
+
+from modules.wipe import Slash
+from tests.legacy.wipe import legacy_simplify, star_segments, grid_segments
+
+
+def timeit(func, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_simplify(name, segments, repeat):
+    legacy, expected = timeit(lambda: legacy_simplify(copy.deepcopy(segments)), repeat)
+    indexed, actual = timeit(lambda: Slash(segments).simplify(), repeat)
+    assert actual == expected, 'the simplified lines differ'
+    print(f'simplify {name:>12} {len(segments):>4} segments: legacy {legacy * 1000:9.2f} ms, '
+          f'indexed {indexed * 1000:8.2f} ms, x{legacy / indexed:6.1f}')
+
+
+def main():
+    warnings.filterwarnings('ignore')
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for num_legs in [3, 4, 5]:
+        bench_simplify(f'{num_legs}-leg', star_segments(num_legs), args.repeat)
+    for rows, cols in [(3, 3), (6, 6), (10, 10)]:
+        bench_simplify(f'grid {rows}x{cols}', grid_segments(rows, cols), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,12 @@
 import os
 import sys
 import click
-import platform
 import warnings
 from pathlib import Path
-from modules.crisce import extract_data_from_scenario
-from modules.roadlane import categorize_roadlane, refine_roadlanes
-from modules.analyzer import Analyzer
 from modules.constant import CONST
-from modules.process import run
 
 warnings.filterwarnings('ignore')
 
-if platform.system() == CONST.WINDOWS:
-    from modules.crisce.simulation import Simulation
-
 # Ensure PythonRobotics modules are included
 root_folder = Path(Path(Path(__file__).parent).parent).absolute()
 sys.path.append(os.path.join(root_folder, "PythonRobotics", "PathPlanning", "BezierPath"))
@@ -36,23 +28,78 @@ def cli(ctx, log_to, debug):
 @cli.command()
 @click.option('--accident-sketch', required=True, type=click.Path(exists=True), multiple=False,
               help="Input accident sketch for generating the simulation")
+@click.option('--headless', required=False, is_flag=True, default=False, show_default='Disabled',
+              help="Do not display any window or figure")
+@click.option('--figure/--no-figure', required=False, default=True, show_default=True,
+              help="Render the summary figure to outputs/<case>/viz.png")
+@click.option('--artifacts', required=False, type=click.Choice(CONST.ARTIFACT_LEVELS), default=CONST.ARTIFACTS_ALL,
+              show_default=True, help="Debug images written to the output folder of the accident sketch")
+@click.option('--trajectory-plots', required=False, is_flag=True, default=False, show_default='Disabled',
+              help="Plot the trajectories planned for each vehicle to the output folder of the accident sketch")
+@click.option('--cache/--no-cache', required=False, default=True, show_default=True,
+              help="Load the outputs of the unchanged extraction stages from the stage cache")
+@click.option('--trace/--no-trace', required=False, default=True, show_default=True,
+              help="Write the timings and peak memory of the stages to outputs/<case>/trace.json (Chrome trace)")
+@click.option('--format', 'formats', required=False, type=click.Choice(CONST.OUTPUT_FORMATS), multiple=True,
+              default=[CONST.FORMAT_JSON], show_default=True,
+              help="Output format of the scenario, can be repeated: json (data.json), commonroad (commonroad.xml) or "
+                   "columnar (data/, NumPy arrays and a JSON header)")
+@click.option('--road-map', required=False, type=click.Path(exists=True), default=None,
+              help="CommonRoad scenario or map whose lanelets replace the roads of the road sketch")
+@click.pass_context
+def generate(ctx, accident_sketch, headless, figure, artifacts, trajectory_plots, cache, trace, formats, road_map):
+    # Pass the context of the command down the line
+    ctx.ensure_object(dict)
+    # The pipeline and its dependencies are only loaded by the commands which need them
+    from modules.process import run
+    run(accident_sketch, headless=headless, figure=figure, artifacts=artifacts, trajectory_plots=trajectory_plots,
+        cache=cache, trace=trace, formats=formats, road_map=road_map)
+
+
+@cli.command()
+@click.option('--cases', required=True, type=click.Path(exists=True), multiple=False,
+              help="Folder of accident sketches or manifest file listing one accident sketch folder per line")
+@click.option('--workers', required=False, type=click.IntRange(min=1), default=None,
+              help="Number of worker processes. Defaults to the number of CPUs")
+@click.option('--summary', required=False, type=click.Path(exists=False), default="outputs/summary.json",
+              show_default=True, help="Location of the summary file with the status and timings of each case")
+@click.option('--resume/--no-resume', required=False, default=True, show_default=True,
+              help="Skip the cases whose outputs/<case>/data.json is up-to-date")
+@click.option('--figure/--no-figure', required=False, default=True, show_default=True,
+              help="Render the summary figure of each case to outputs/<case>/viz.png")
+@click.option('--artifacts', required=False, type=click.Choice(CONST.ARTIFACT_LEVELS), default=CONST.ARTIFACTS_FINAL,
+              show_default=True, help="Debug images written to the output folder of each accident sketch")
+@click.option('--cache/--no-cache', required=False, default=True, show_default=True,
+              help="Load the outputs of the unchanged extraction stages from the stage cache")
+@click.option('--trace/--no-trace', required=False, default=True, show_default=True,
+              help="Write the timings and peak memory of the stages to outputs/<case>/trace.json (Chrome trace)")
+@click.option('--format', 'formats', required=False, type=click.Choice(CONST.OUTPUT_FORMATS), multiple=True,
+              default=[CONST.FORMAT_JSON], show_default=True,
+              help="Output format of the scenario, can be repeated: json (data.json), commonroad (commonroad.xml) or "
+                   "columnar (data/, NumPy arrays and a JSON header)")
 @click.pass_context
-def generate(ctx, accident_sketch):
+def batch(ctx, cases, workers, summary, resume, figure, artifacts, cache, trace, formats):
     # Pass the context of the command down the line
     ctx.ensure_object(dict)
-    run(accident_sketch)
+    from modules.batch import collect_cases, run_batch
+    # Cases always run headless in the worker processes
+    options = {"headless": True, "figure": figure, "artifacts": artifacts, "cache": cache, "trace": trace,
+               "formats": formats}
+    try:
+        report = run_batch(collect_cases(cases), workers=workers, summary=summary, resume=resume, options=options)
+    except ValueError as ex:
+        raise click.UsageError(str(ex), ctx)
+    if report["failed"] > 0 or report["interrupted"] > 0:
+        ctx.exit(1)
 
 
 # Execute the Command Line Interpreter
 if __name__ == '__main__':
-    BASE_DIR = "cases/original"
-    CASES = [100271, 103378, 105203, 105222, 108812, 117021, 119489, 119839, 120013, 120305, 121520, 122080, 122168,
-             128066, 128697, 129224, 137748, 148154, 171831, 99817]
-
-    for case in CASES:
-        run(accident_sketch=f'{BASE_DIR}/{case}')
     cli()
     exit()
+    from modules.crisce import extract_data_from_scenario
+    from modules.roadlane import categorize_roadlane, refine_roadlanes
+    from modules.analyzer import Analyzer
     # single = [99817, 100343, 102804, 105165, 108812, 109176, 109536, 117692, 135859, 142845]
     # parallel = [100, 101, 105222, 119897, 128719, 171831]
     # intersections = [100237, 103378, 117021]
@@ -1,3 +1,12 @@
 from .constant import CONST
-from .common import angle, dot, slice_when
-from .data_handler import DataHandler
+
+
+def __getattr__(name):
+    # The pipeline modules are loaded on first use, importing modules.constant stays cheap
+    if name in ["angle", "dot", "slice_when"]:
+        from . import common
+        return getattr(common, name)
+    if name == "DataHandler":
+        from .data_handler import DataHandler
+        return DataHandler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,3 +1,4 @@
 from .analyzer import Analyzer
 from .visualization import Visualization
-from .winline import Winline
\ No newline at end of file
+from .winline import Winline
+from .window import SlidingWindow
@@ -1,15 +1,15 @@
 import cv2
-import imutils
 import numpy as np
 from .winline import Winline
+from .window import SlidingWindow
 from .visualization import Visualization
-from .lib import create, find, analyze, define_roi
+from .lib import define_roi
 from math import floor, ceil
 from typing import List
 from shapely import affinity
 from shapely.geometry import Point, LineString
 from modules import slice_when, angle
-from modules.common import translate_ls_to_new_origin, reverse_geom, smooth_line, get_dbscan_labels
+from modules.common import translate_ls_to_new_origin, reverse_geom, smooth_line
 from modules.constant import CONST
 from modules.roadlane.laneline import Laneline
 from modules.models import Segment, Line
@@ -45,80 +45,13 @@ class Analyzer:
         self.angle = 0
 
     def del_oor_lines(self):
-        # Define list contain out of range lines
-        oor_lines = dict()
-        step, stop = 0, False
-        img, ls = self.rotated_img, self.rotated_ls
-
-        # Searching invalid lines
-        while stop is False:
-            window_line = translate_ls_to_new_origin(ls, Point(step, 0))
-            if list(window_line.coords)[-1][1] < 0:
-                window_line = translate_ls_to_new_origin(ls, Point(step, img.shape[0]))
-
-            # Check if x value of all points (from a line string)
-            # is in an x-axis range of a rotated image or not.
-            # Otherwise, the linestring is invalid.
-            invalid_line = False
-            for point in list(window_line.coords):
-                if point[0] < 0:
-                    invalid_line = True
-                    oor_lines[step] = Winline(id=step, points=list(window_line.coords))
-                    step = step + 1
-                    break
-
-            if invalid_line is False:
-                stop = True
-
-        return step, oor_lines
+        # Find the first window line which is not out of range (oor)
+        return SlidingWindow(self.rotated_img, self.rotated_ls).del_oor_lines()
 
     def find_lines(self, starting_x, outlier_threshold, num_points: int = 10):
-        good_lines, bad_lines = dict(), dict()
-        first_x_valid, starting_color_index = -1, 0
-        img, ls = self.rotated_img, self.rotated_ls
-
         # Searching the valid lane ids from remaining lines
-        x = starting_x
-        while x < img.shape[1]:
-            expected_num_points = num_points + starting_color_index
-            window_line = create(img=img, point_x=x, ls=ls, num_points=expected_num_points)
-            coords = [(ceil(p[0]), ceil(p[1])) for p in list(window_line.coords[starting_color_index:])]
-
-            # Compute the white density from a pixel image
-            total, points = 0, list()
-            for p in coords:
-                try:
-                    total += int(img[p[1], p[0]])
-                    points.append(p)
-                except IndexError:
-                    pass
-
-            # Remove outliers from window line
-            if len(points) > 1 and outlier_threshold > 0:
-                fpoints = []
-                labels = get_dbscan_labels(X=points, distance=outlier_threshold)
-                for l, p in zip(labels, points):
-                    if l > -1:
-                        fpoints.append(p)
-                points = fpoints
-
-            if total > 0:
-                length, non_zeros, zeros = analyze(points=points, img=img)
-                if zeros / length >= CONST.MAX_PERCENTAGE_ZEROS:
-                    bad_lines[x] = Winline(id=x, points=list(window_line.coords))
-                else:
-                    # Look for index of the first point has color value bigger than 0 in the first valid line
-                    # Take that index as a base index and use it on other lines to find line type
-                    if first_x_valid == -1:
-                        first_x_valid = x
-                        starting_color_index = find(points=points, img=img)
-                        continue
-                    good_lines[x] = Winline(id=x, points=points, total=total, zero_perc=zeros / length)
-            else:
-                bad_lines[x] = Winline(id=x, points=list(window_line.coords))
-            x = x + 1
-
-        return good_lines, bad_lines
+        window = SlidingWindow(self.rotated_img, self.rotated_ls)
+        return window.find_lines(starting_x=starting_x, outlier_threshold=outlier_threshold, num_points=num_points)
 
     def search_laneline(self, num_points: int = 10, outlier_threshold: int = 0, debug: bool = False):
         """
@@ -134,6 +67,7 @@ class Analyzer:
                 176: 207, 177: 858, 178: 993, 179: 239  // 3rd lane
             }
         """
+        import imutils
 
         # Define the bounding rectangle
         # Region of Interest (ROI) to be cropped
@@ -2,7 +2,6 @@ import numpy as np
 from modules import slice_when
 from modules.models import Segment
 from modules.roadlane.laneline import Laneline
-import matplotlib.pyplot as plt
 
 
 class Visualization:
@@ -33,6 +32,7 @@ class Visualization:
 
     @staticmethod
     def draw_img_with_a_single_line(title, lst, image, color, is_save: bool = False):
+        import matplotlib.pyplot as plt
         fig = plt.gcf()
         plt.title(title)
         plt.imshow(image, cmap="gray")
@@ -88,6 +88,7 @@ class Visualization:
 
     @staticmethod
     def draw_img(ax, masked_img, title):
+        import matplotlib.pyplot as plt
         ax.title.set_text(title)
         ax.imshow(masked_img, cmap='gray')
         ax = plt.gca().set_aspect('auto')
@@ -0,0 +1,163 @@
+import numpy as np
+from shapely.geometry import LineString
+from modules.common import get_outlier_mask
+from modules.constant import CONST
+from .winline import Winline
+
+
+class SlidingWindow:
+    """
+    Array-backed sliding window lines. A window line is the baseline translated so that its first point is at
+    (x, 0), or at (x, image height) when the baseline goes upward. The offsets of the baseline are computed once,
+    and the window lines of all x are generated as one (num_x, num_points, 2) array whose pixel values are
+    gathered with a single fancy-indexing call.
+
+    Args:
+        img (np.array): the rotated image of a segment.
+        ls (LineString): the rotated baseline of a segment.
+    """
+
+    def __init__(self, img: np.array, ls: LineString):
+        self.img = img
+        self.height, self.width = img.shape[:2]
+        self.coords = np.asarray(ls.coords, dtype=np.float64)[:, :2]
+        first_x, first_y = self.coords[0]
+        self.first_x = first_x
+        self.ys = self.coords[:, 1] - (first_y - 0)
+        if self.ys[-1] < 0:
+            self.ys = self.coords[:, 1] - (first_y - self.height)
+
+    def translate(self, xs: np.array):
+        """
+        Window lines whose first points are at xs, as a (num_x, num_points, 2) array.
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        window_xs = self.coords[np.newaxis, :, 0] - (self.first_x - xs[:, np.newaxis])
+        window_ys = np.broadcast_to(self.ys, window_xs.shape)
+        return np.stack([window_xs, window_ys], axis=2)
+
+    def in_image(self, xs: np.array, ys: np.array):
+        """ Integer pixel positions which can index the image (negative ones wrap around as in numpy) """
+        return (-self.width <= xs) & (xs < self.width) & (-self.height <= ys) & (ys < self.height)
+
+    def pixels(self, xs: np.array, ys: np.array, valid: np.array):
+        """ Pixel values at the valid positions, 0 elsewhere """
+        values = self.img[np.where(valid, ys, 0), np.where(valid, xs, 0)].astype(np.int64)
+        values[~valid] = 0
+        return values
+
+    def del_oor_lines(self):
+        """
+        Find the first x (step) whose window line lies entirely at non negative x values.
+
+        Returns:
+            step (int): the first valid x.
+            oor_lines (dict): the out of range window lines before it.
+        """
+        min_x = np.min(self.coords[:, 0])
+
+        def is_valid(s):
+            return np.min(self.coords[:, 0] - (self.first_x - s)) >= 0
+
+        step = max(0, int(np.ceil(self.first_x - min_x)))
+        while step > 0 and is_valid(step - 1):
+            step = step - 1
+        while not is_valid(step):
+            step = step + 1
+
+        oor_lines = dict()
+        if step > 0:
+            for s, window_line in enumerate(self.translate(np.arange(step)).tolist()):
+                oor_lines[s] = Winline(id=s, points=[tuple(p) for p in window_line])
+        return step, oor_lines
+
+    def evaluate(self, xs: np.array, num_points: int, starting_color_index: int, outlier_threshold: int):
+        """
+        Evaluate the window lines of xs.
+
+        Args:
+            xs (np.array): x values of the window lines.
+            num_points (int): number of points of a window line, taken from the points inside the image.
+            starting_color_index (int): number of leading points of a window line to skip.
+            outlier_threshold (int): DBSCAN distance used to remove outlier points, 0 to keep every point.
+
+        Returns:
+            a dictionary of arrays with the window lines, their integer points and the reductions per x.
+        """
+        lines = self.translate(xs)
+        # Keep the first num_points of the points inside the image, or all the points when less than 3 are inside
+        inside = self.in_image(lines[:, :, 0].astype(np.int64), lines[:, :, 1].astype(np.int64))
+        num_inside = inside.sum(axis=1)
+        selected = np.where((num_inside < 3)[:, np.newaxis], True, inside & (np.cumsum(inside, axis=1) <= num_points))
+
+        # Skip the leading points, then round up to the pixel positions
+        used = selected & (np.cumsum(selected, axis=1) > starting_color_index)
+        px = np.ceil(lines[:, :, 0]).astype(np.int64)
+        py = np.ceil(lines[:, :, 1]).astype(np.int64)
+        valid = used & self.in_image(px, py)
+        values = self.pixels(px, py, valid)
+        totals = values.sum(axis=1)
+
+        kept = valid
+        if outlier_threshold > 0:
+            # Move the valid points of every line to the front, so the batch is only as wide as the longest line
+            order = np.argsort(~valid, axis=1, kind="stable")[:, :max(1, int(valid.sum(axis=1).max()))]
+            points = np.stack([np.take_along_axis(px, order, axis=1), np.take_along_axis(py, order, axis=1)], axis=2)
+            mask = np.take_along_axis(valid, order, axis=1)
+            noise = get_outlier_mask(X=points, distance=outlier_threshold, mask=mask)
+            # Lines with a single point are not filtered
+            noise &= (valid.sum(axis=1) > 1)[:, np.newaxis]
+            kept = valid.copy()
+            np.put_along_axis(kept, order, mask & ~noise, axis=1)
+
+        lengths = kept.sum(axis=1)
+        zeros = (kept & (values == 0)).sum(axis=1)
+        zero_percentages = zeros / np.maximum(lengths, 1)
+        good = (totals > 0) & (lengths > 0) & (zero_percentages < CONST.MAX_PERCENTAGE_ZEROS)
+        return {"lines": lines, "selected": selected, "px": px, "py": py, "values": values, "kept": kept,
+                "totals": totals, "lengths": lengths, "zeros": zeros, "good": good}
+
+    def starting_color_index(self, values: np.array):
+        """
+        Index of the first non-zero pixel after the first point of a window line, 0 if there is none.
+        """
+        non_zeros = np.flatnonzero(values[1:] > 0)
+        return int(non_zeros[0]) + 1 if len(non_zeros) > 0 else 0
+
+    def find_lines(self, starting_x: int, outlier_threshold: int, num_points: int = 10):
+        """
+        Slide the window line from starting_x to the right border of the image.
+
+        Returns:
+            good_lines (dict): window lines with enough non-zero pixels, by x.
+            bad_lines (dict): the other window lines, by x.
+        """
+        xs = np.arange(starting_x, self.width)
+        if len(xs) == 0:
+            return dict(), dict()
+        result = self.evaluate(xs, num_points, 0, outlier_threshold)
+        firsts = np.flatnonzero(result["good"])
+        results = [(xs, result)]
+        if len(firsts) > 0:
+            # The first valid line gives the index of its first coloured point, which is then skipped on every
+            # line starting from the first valid one
+            first = firsts[0]
+            row = result["kept"][first]
+            starting_color_index = self.starting_color_index(result["values"][first][row])
+            results = [(xs[:first], {k: v[:first] for k, v in result.items()}),
+                       (xs[first:], self.evaluate(xs[first:], num_points + starting_color_index,
+                                                  starting_color_index, outlier_threshold))]
+
+        good_lines, bad_lines = dict(), dict()
+        for xs, result in results:
+            lines = result["lines"]
+            for i, x in enumerate(xs.tolist()):
+                if result["good"][i]:
+                    row = result["kept"][i]
+                    points = list(zip(result["px"][i][row].tolist(), result["py"][i][row].tolist()))
+                    total, zeros, length = int(result["totals"][i]), int(result["zeros"][i]), int(result["lengths"][i])
+                    good_lines[x] = Winline(id=x, points=points, total=total, zero_perc=zeros / length)
+                else:
+                    points = lines[i][result["selected"][i]].tolist()
+                    bad_lines[x] = Winline(id=x, points=list(map(tuple, points)))
+        return good_lines, bad_lines
@@ -1,12 +1,11 @@
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 from typing import List, Tuple
-from sklearn.cluster import DBSCAN
 
 
 class DBScan:
     def __init__(self, points: List, epsilon=45, min_samples=3):
+        from sklearn.cluster import DBSCAN
         X = np.array(points)
         self.points = points
         self.db = DBSCAN(eps=epsilon, min_samples=min_samples).fit(X)
@@ -30,6 +29,7 @@ class DBScan:
                 group = Xs
                 break
         if debug:
+            import matplotlib.pyplot as plt
             plt.title("Found a group contain triangle: ")
             plt.imshow(img, cmap='gray')
             for c in group:
@@ -44,6 +44,7 @@ class DBScan:
         return group
 
     def debug(self, img: np.array):
+        import matplotlib.pyplot as plt
         X = np.array(self.points)
         y_pred = self.db.fit_predict(X)
         fig, ax = plt.subplots(1, 2, figsize=(16, 8))
@@ -1,6 +1,5 @@
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 from typing import List
 from .contour import Contour
 from .lib import ArrowLib
@@ -33,6 +32,7 @@ class ImgCV2:
             centers.append(ArrowLib.contour2list(contour.centeroid))
 
         if debug:
+            import matplotlib.pyplot as plt
             plt.imshow(self.img, cmap='gray')
             plt.title("List of centroids")
             for c in centers:
@@ -64,6 +64,7 @@ class ImgCV2:
             cnt_list.append(contour)
 
         if debug:
+            import matplotlib.pyplot as plt
             plt.imshow(self.img, cmap='gray')
             plt.title("Found a triangle")
             for v in ArrowLib.contour2list(triangle.vertexes):
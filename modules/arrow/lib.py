@@ -1,5 +1,4 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from modules.common import pairs, angle
 from typing import List, Tuple
 from shapely.geometry import Point, LineString
@@ -9,6 +8,7 @@ from .contour import Contour
 class ArrowLib:
     @staticmethod
     def draw(title, img):
+        import matplotlib.pyplot as plt
         plt.title(title)
         plt.imshow(img, cmap='gray')
         plt.show()
@@ -38,6 +38,7 @@ class ArrowLib:
                     result.append(c)
 
         if debug:
+            import matplotlib.pyplot as plt
             fig, ax = plt.subplots(1, 2, figsize=(16, 8))
             ax[0].title.set_text("Contours before filter")
             ax[0].imshow(img, cmap='gray')
@@ -68,6 +69,7 @@ class ArrowLib:
                 pair = [c1, c2]
 
         if debug:
+            import matplotlib.pyplot as plt
             fig, ax = plt.subplots(1, 2, figsize=(16, 8))
             ax[0].title.set_text("Shortest pair")
             ax[0].imshow(img, cmap='gray')
@@ -117,6 +119,7 @@ class ArrowLib:
             cm = f'deg Ox'
 
         if debug:
+            import matplotlib.pyplot as plt
             fig, ax = plt.subplots(1, 1, figsize=(8, 8))
             x1, y1 = point_line[0], point_line[1]
             x2, y2 = point_tria[0], point_tria[1]
@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List
+from modules.trace import aggregate
+from modules.constant import CONST
+
+INPUT_FILES = ["sketch.jpeg", "sketch.jpg", "road.jpeg", "road.jpg", "road_arrow.jpeg", "road_arrow.jpg",
+               "external.csv"]
+# Output file of each output format in outputs/<case>
+OUTPUT_FILES = {CONST.FORMAT_JSON: "data.json", CONST.FORMAT_COMMONROAD: "commonroad.xml",
+                CONST.FORMAT_COLUMNAR: os.path.join("data", "header.json")}
+STATUS_SUCCESS = "success"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+STATUS_INTERRUPTED = "interrupted"
+
+
+def case_name(case: str) -> str:
+    """
+    Name of the output folder of an accident sketch case (outputs/<case>)
+    """
+    return os.path.basename(os.path.normpath(case))
+
+
+def is_case(path: str) -> bool:
+    return os.path.isdir(path) and any(os.path.exists(os.path.join(path, f)) for f in ["sketch.jpeg", "sketch.jpg"])
+
+
+def unique_cases(cases: List[str]) -> List[str]:
+    """
+    The cases without repetitions, the paths to the same folder being one case whose first path is kept
+    """
+    seen, unique = set(), []
+    for case in cases:
+        key = os.path.realpath(case)
+        if key not in seen:
+            seen.add(key)
+            unique.append(case)
+    return unique
+
+
+def check_case_names(cases: List[str]):
+    """
+    Raise a ValueError when different cases have the same name: they would share their outputs/<case> folder, and
+    the outputs of one would make the other look up-to-date
+    """
+    folders = dict()
+    for case in cases:
+        folders.setdefault(case_name(case), []).append(case)
+    collisions = {name: paths for name, paths in folders.items() if len(paths) > 1}
+    if len(collisions) > 0:
+        raise ValueError("Cases with the same name share outputs/<case>, rename them: " +
+                         "; ".join(f'{name}: {", ".join(paths)}' for name, paths in collisions.items()))
+
+
+def collect_cases(source: str) -> List[str]:
+    """
+    Collect the case folders to run
+
+    Args:
+        source: a folder of cases (or a single case), or a manifest file listing one case folder per line.
+                Blank lines and lines starting with # are ignored.
+
+    Returns:
+        the list of case folders, a case listed twice in a manifest is kept once
+    """
+    if os.path.isdir(source):
+        if is_case(source):
+            return [source]
+        return [os.path.join(source, d) for d in sorted(os.listdir(source)) if is_case(os.path.join(source, d))]
+
+    base = os.path.dirname(source)
+    cases = []
+    with open(source) as manifest:
+        for line in manifest:
+            line = line.strip()
+            if len(line) == 0 or line.startswith("#"):
+                continue
+            cases.append(line if os.path.isabs(line) or os.path.isdir(line) else os.path.join(base, line))
+    return unique_cases(cases)
+
+
+def is_up_to_date(case: str, output_dir: str = "outputs", formats=(CONST.FORMAT_JSON,)) -> bool:
+    """
+    A case is up-to-date when the output file of every format (data.json by default) is newer than every input file
+    of the case
+    """
+    inputs = [os.path.join(case, f) for f in INPUT_FILES if os.path.exists(os.path.join(case, f))]
+    for output in formats:
+        data_file = os.path.join(output_dir, case_name(case), OUTPUT_FILES[output])
+        if not os.path.exists(data_file):
+            return False
+        if any(os.path.getmtime(f) > os.path.getmtime(data_file) for f in inputs):
+            return False
+    return True
+
+
+def run_case(case: str, options: dict) -> dict:
+    """
+    Run a single case, capturing any failure so that the remaining cases of the batch are not affected. A
+    KeyboardInterrupt is not a failure of the case, it stops the batch.
+    """
+    from modules.process import run
+
+    start_time, start_cpu = time.time(), time.process_time()
+    result = {"case": case, "name": case_name(case), "status": STATUS_SUCCESS, "error": None}
+    try:
+        result["spans"] = run(case, **options)
+    except Exception as ex:
+        result["status"] = STATUS_FAILED
+        result["error"] = "".join(traceback.format_exception_only(type(ex), ex)).strip()
+        result["traceback"] = traceback.format_exc()
+    result["wall_time"] = time.time() - start_time
+    result["cpu_time"] = time.process_time() - start_cpu
+    return result
+
+
+def collect_result(results: dict, case: str, future):
+    """
+    Store the result of the future of a case in results
+    """
+    try:
+        results[case] = future.result()
+    except KeyboardInterrupt:
+        # The worker was interrupted with the batch (Ctrl+C reaches the whole process group)
+        results[case] = {"case": case, "name": case_name(case), "status": STATUS_INTERRUPTED,
+                         "error": None, "wall_time": None, "cpu_time": None}
+    except Exception as ex:
+        # The worker itself died (e.g. killed or out of memory)
+        results[case] = {"case": case, "name": case_name(case), "status": STATUS_FAILED,
+                         "error": repr(ex), "wall_time": None, "cpu_time": None}
+
+
+def run_batch(cases: List[str], workers: int = None, summary: str = "outputs/summary.json", resume: bool = True,
+              options: dict = None) -> dict:
+    """
+    Run many cases on a pool of processes
+
+    Args:
+        cases: the case folders, repeated folders are run once and different cases must have different names
+        workers: the number of worker processes, defaults to the number of CPUs
+        summary: the summary file with the status and the timings of each case
+        resume: skip the cases whose outputs are up-to-date
+        options: keyword arguments passed to modules.process.run
+
+    Returns:
+        the summary, written as well when the batch is interrupted (Ctrl+C): the cases which did not run are then
+        reported as interrupted
+
+    Raises:
+        ValueError: when different cases have the same name (see check_case_names)
+    """
+    cases = unique_cases(cases)
+    check_case_names(cases)
+    options = dict() if options is None else options
+    start_time = time.time()
+    results = {}
+    pending = []
+    for case in cases:
+        if resume and is_up_to_date(case, formats=options.get("formats", (CONST.FORMAT_JSON,))):
+            results[case] = {"case": case, "name": case_name(case), "status": STATUS_SKIPPED, "error": None,
+                             "wall_time": 0, "cpu_time": 0}
+        else:
+            pending.append(case)
+
+    if len(pending) > 0:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        futures = {executor.submit(run_case, case, options): case for case in pending}
+        try:
+            for future in as_completed(futures):
+                case = futures[future]
+                collect_result(results, case, future)
+                print(f'[{len(results)}/{len(cases)}] {case}: {results[case]["status"]}')
+        except KeyboardInterrupt:
+            print("Interrupted, waiting for the running cases...")
+            # The queued cases are cancelled, the running ones finish (or are interrupted as well)
+            executor.shutdown(wait=True, cancel_futures=True)
+            for future, case in futures.items():
+                if case not in results and future.done() and not future.cancelled():
+                    collect_result(results, case, future)
+            for case in pending:
+                if case not in results:
+                    results[case] = {"case": case, "name": case_name(case), "status": STATUS_INTERRUPTED,
+                                     "error": None, "wall_time": None, "cpu_time": None}
+        finally:
+            executor.shutdown(wait=True)
+
+    report = {
+        "workers": workers if workers else os.cpu_count(),
+        "wall_time": time.time() - start_time,
+        "total": len(cases),
+        "success": sum(1 for r in results.values() if r["status"] == STATUS_SUCCESS),
+        "failed": sum(1 for r in results.values() if r["status"] == STATUS_FAILED),
+        "skipped": sum(1 for r in results.values() if r["status"] == STATUS_SKIPPED),
+        "interrupted": sum(1 for r in results.values() if r["status"] == STATUS_INTERRUPTED),
+        # The spans of every case are summarized, the case traces are in outputs/<case>/trace.json
+        "stages": aggregate([r.pop("spans") for r in results.values() if "spans" in r]),
+        "cases": [results[case] for case in cases]
+    }
+
+    if os.path.dirname(summary):
+        os.makedirs(os.path.dirname(summary), exist_ok=True)
+    with open(summary, 'w') as outfile:
+        json.dump(report, outfile, indent=2)
+    print(f'Summary is written to {summary} !')
+    return report
@@ -0,0 +1,177 @@
+import os
+import pickle
+import hashlib
+import importlib.util
+import tempfile
+import numpy as np
+from modules.constant import CONST
+
+MISSING = object()
+
+
+def describe(value):
+    """
+    Stable text of a stage parameter for the cache key: numpy arrays and containers are written out element by
+    element, dict keys in sorted order
+    """
+    if isinstance(value, np.ndarray):
+        return f'array({value.dtype}, {value.shape}, {value.tolist()!r})'
+    if isinstance(value, dict):
+        return "{" + ", ".join(f'{k!r}: {describe(value[k])}' for k in sorted(value, key=repr)) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(describe(v) for v in value) + "]"
+    return repr(value)
+
+
+class StageCache():
+    """
+    Content-addressed on-disk cache of the outputs of the pipeline stages.
+
+    A key is the hash of the stage name, the content of its input files, the source of its modules, its parameters
+    and the keys of the stages it depends on, so any change upstream recomputes the stage. Each entry is a pickle
+    file named after its key, with the output of the stage and the debug images it wrote, which are written again
+    when the entry is loaded. Loading an entry refreshes its modification time and the least recently used entries
+    are evicted once the cache grows beyond max_size bytes. A disabled cache never loads nor stores anything.
+    """
+
+    def __init__(self, folder: str = CONST.CACHE_FOLDER, max_size: int = CONST.CACHE_MAX_SIZE, enabled: bool = True):
+        self.folder = folder
+        self.max_size = max_size
+        self.enabled = enabled
+        self.file_hashes = dict()
+
+    def file_hash(self, path: str) -> str:
+        """ Hash of the content of a file, an absent file has its own hash """
+        if not os.path.exists(path):
+            return "absent"
+        stat = os.stat(path)
+        memo = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if memo not in self.file_hashes:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+            self.file_hashes[memo] = digest.hexdigest()
+        return self.file_hashes[memo]
+
+    def key(self, stage: str, files=(), depends=(), code=(), **params) -> str:
+        """
+        Key of a stage
+
+        Args:
+            stage: the name of the stage
+            files: the input files of the stage
+            depends: the keys of the upstream stages
+            code: the names of the modules implementing the stage, a change of their source recomputes the stage
+            params: the parameters of the stage
+        Returns:
+            key (str): hex digest, also the name of the entry
+        """
+        digest = hashlib.sha256()
+        digest.update(f'{CONST.CACHE_VERSION}:{stage}\n'.encode())
+        for path in files:
+            digest.update(f'file:{self.file_hash(path)}\n'.encode())
+        for key in depends:
+            digest.update(f'depends:{key}\n'.encode())
+        for module in code:
+            digest.update(f'code:{module}:{self.file_hash(importlib.util.find_spec(module).origin)}\n'.encode())
+        for name in sorted(params):
+            digest.update(f'{name}={describe(params[name])}\n'.encode())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.folder, key + ".pkl")
+
+    def load(self, key: str, default=MISSING):
+        """ Value of the entry, or default when the entry is missing or unreadable """
+        if not self.enabled:
+            return default
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            return default
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # A corrupted entry or an entry of classes which do not exist anymore
+            return default
+        return value
+
+    def store(self, key: str, value):
+        """ Write the entry atomically, then evict the least recently used entries """
+        if not self.enabled:
+            return
+        os.makedirs(self.folder, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp, self.path(key))
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+        self.evict()
+
+    def fetch(self, key: str, compute, artifacts=None):
+        """
+        Value of the entry, computed with compute() and stored when it is missing
+
+        Args:
+            key: the key of the stage
+            compute: computes the value of the stage
+            artifacts: the ArtifactWriter of the stage, the images written by compute() are stored in the entry and
+                       written again when it is loaded
+        Returns:
+            (value, hit): hit is True when the value is loaded from the cache
+        """
+        entry = self.load(key)
+        if entry is not MISSING:
+            value, images = entry
+            if artifacts is not None:
+                artifacts.replay(images)
+            return value, True
+        if artifacts is None:
+            value, images = compute(), []
+        else:
+            with artifacts.recording() as images:
+                value = compute()
+        self.store(key, (value, images))
+        return value, False
+
+    def entries(self):
+        """ (modification time, size, path) of every entry, the least recently used first """
+        entries = list()
+        if not os.path.isdir(self.folder):
+            return entries
+        for name in os.listdir(self.folder):
+            if not name.endswith(".pkl"):
+                continue
+            path = os.path.join(self.folder, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # Evicted by another process
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return sorted(entries)
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
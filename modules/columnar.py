@@ -0,0 +1,136 @@
+import os
+import json
+import numpy as np
+from typing import List
+from modules.common import as_table
+
+HEADER = "header.json"
+VERSION = 1
+# Columns of the arrays of a scenario, each array holds the rows of every stripe or vehicle one after the other
+ARRAYS = {
+    "stripes": ["x", "y", "z", "width"],
+    "scripts": ["x", "y", "z", "t"],
+    "debug_scripts": ["x", "y", "z"],
+    "spheres": ["x", "y", "z", "radius"],
+}
+STRIPES = ["left", "center", "right"]
+VEHICLE_FIELDS = ["pos", "rot", "color", "color_code", "speed", "delay"]
+
+
+class _Columns():
+    """
+    Rows appended block by block to one array, each block is referenced by its offset and count. A block with fewer
+    columns, e.g. the (x, y) points of a stripe clipped by Slash, is padded with NaN and keeps its number of columns.
+    """
+
+    def __init__(self, columns: int, dtype):
+        self.columns = columns
+        self.dtype = dtype
+        self.blocks = list()
+        self.count = 0
+
+    def append(self, rows) -> dict:
+        block = np.asarray(rows, dtype=self.dtype)
+        columns = block.shape[1] if block.ndim == 2 else self.columns
+        block = block.reshape(-1, columns)
+        if columns < self.columns:
+            block = np.hstack([block, np.full((len(block), self.columns - columns), np.nan, dtype=self.dtype)])
+        self.blocks.append(block)
+        self.count += len(block)
+        return {"offset": self.count - len(block), "count": len(block), "columns": columns}
+
+    def array(self):
+        if len(self.blocks) == 0:
+            return np.empty((0, self.columns), dtype=self.dtype)
+        return np.concatenate(self.blocks)
+
+
+def write_columnar(folder: str, name: str, roads: List, vehicles: List, crash_point, rot_deg, dtype=np.float64):
+    """
+    Write a scenario in the columnar format: a .npy file per array of ARRAYS and a JSON header with everything else,
+    the stripes and vehicles referencing their rows by offset and count. The arrays can be memory-mapped.
+
+    Args:
+        folder: the folder of the files
+        name: the name of the scenario
+        roads: the BngSegement of the roads
+        vehicles: the Vehicle of the scenario
+        crash_point: the crash point
+        rot_deg: the rotation of the scenario
+        dtype: the type of the arrays, float32 halves their size at the cost of precision
+    """
+    arrays = {key: _Columns(len(columns), dtype) for key, columns in ARRAYS.items()}
+
+    def stripe(s):
+        return dict(arrays["stripes"].append(s.array), num=s.num, pattern=s.pattern)
+
+    header_roads = list()
+    for road in roads:
+        header_road = {key: stripe(getattr(road, key)) for key in STRIPES}
+        header_road["marks"] = [stripe(m) for m in road.marks]
+        header_road["width"] = road.width
+        header_roads.append(header_road)
+
+    header_vehicles = list()
+    for v in vehicles:
+        header_vehicle = {
+            "script": arrays["scripts"].append(as_table(v.nodes)),
+            "debug_script": arrays["debug_scripts"].append(v.debug_script),
+            "spheres": arrays["spheres"].append(v.spheres),
+        }
+        header_vehicle.update({field: getattr(v, field) for field in VEHICLE_FIELDS})
+        header_vehicles.append(header_vehicle)
+
+    os.makedirs(folder, exist_ok=True)
+    header = {"version": VERSION, "name": name, "rot_deg": rot_deg, "crash_point": crash_point,
+              "roads": header_roads, "vehicles": header_vehicles, "arrays": dict()}
+    for key, columns in arrays.items():
+        array = columns.array()
+        np.save(os.path.join(folder, key + ".npy"), array)
+        header["arrays"][key] = {"columns": ARRAYS[key], "dtype": array.dtype.str, "shape": list(array.shape)}
+    # The header is written last, its presence marks a complete output
+    with open(os.path.join(folder, HEADER), "w") as outfile:
+        json.dump(header, outfile)
+
+
+def load_columnar(folder: str, mmap_mode: str = "r"):
+    """
+    Load a scenario written by write_columnar
+
+    Args:
+        folder: the folder of the files
+        mmap_mode: memory-map the arrays (see numpy.load), None reads them in memory
+    Returns:
+        (header, arrays): the header dict and a dict of the arrays
+    """
+    with open(os.path.join(folder, HEADER)) as f:
+        header = json.load(f)
+    arrays = {key: np.load(os.path.join(folder, key + ".npy"), mmap_mode=mmap_mode) for key in header["arrays"]}
+    return header, arrays
+
+
+def rows(array: np.array, block: dict) -> np.array:
+    """ The rows of a stripe or a vehicle, without their padding """
+    return array[block["offset"]:block["offset"] + block["count"], :block["columns"]]
+
+
+def to_dict(header: dict, arrays: dict) -> dict:
+    """ The scenario in the schema of data.json, all coordinates are floats """
+    def stripe(block):
+        return {"points": rows(arrays["stripes"], block).tolist(), "num": block["num"], "pattern": block["pattern"]}
+
+    roads = list()
+    for road in header["roads"]:
+        roads.append({"left": stripe(road["left"]), "center": stripe(road["center"]), "right": stripe(road["right"]),
+                      "marks": [stripe(m) for m in road["marks"]], "width": road["width"]})
+
+    vehicles = list()
+    for v in header["vehicles"]:
+        script = [dict(zip(ARRAYS["scripts"], row)) for row in rows(arrays["scripts"], v["script"]).tolist()]
+        vehicles.append({"script": script, "debug_script": rows(arrays["debug_scripts"], v["debug_script"]).tolist(),
+                         "pos": v["pos"], "rot": v["rot"], "color": v["color"], "color_code": v["color_code"],
+                         "spheres": rows(arrays["spheres"], v["spheres"]).tolist(), "speed": v["speed"],
+                         "delay": v["delay"]})
+
+    return {"name": header["name"], "roads": roads, "vehicles": vehicles, "crash_point": header["crash_point"],
+            "rot_deg": header["rot_deg"]}
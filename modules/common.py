@@ -5,7 +5,6 @@ import shapely.ops
 import numpy.polynomial.polynomial as poly
 import numpy as np
 from typing import List
-import matplotlib.pyplot as plt
 import math
 import copy
 
@@ -104,7 +103,12 @@ def midpoint(p1: Point, p2: Point):
 
 
 def order_points(points, ind: int = 0):
+    """
+    Order points by nearest neighbours from the point at ind, then along the x or y axis of a horizontal or
+    vertical line. The given list is not modified.
+    """
     is_horizontal, is_vertical = orient(points)
+    points = list(points)
     points_new = [points.pop(ind)]  # initialize a new list of points with the known first point
     pcurr = points_new[-1]  # initialize the current point (as the known point)
     while len(points) > 0:
@@ -207,6 +211,7 @@ def smooth_line(coords: List, debug: bool = False):
     coords = [(x, y) for x, y in zip(poly_xs, poly_ys)]
 
     if debug:
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots(1, 2, figsize=(12, 4))
         ax[0].plot(xs, ys, '.', label="Origin")
         ax[0].plot(poly_xs, poly_ys, '-', label="Interpolate")
@@ -252,6 +257,38 @@ def get_dbscan_labels(X, distance: int = 15, debug: bool = False):
     return labels
 
 
+def get_outlier_mask(X, distance: int = 15, min_samples: int = 2, mask=None):
+    """
+    Noise points (label -1) of DBSCAN(eps=distance, min_samples=min_samples) for tiny point sets, without
+    fitting a model. A point is a core point when at least min_samples points (itself included) are within
+    distance, a border point when it is within distance of a core point, and noise otherwise. The pairwise
+    distances of every set are computed at once, so many sets can be processed in one batched call.
+
+    Args:
+        X (np.array): (K,) 1-D points, (K, d) points, or a padded batch (N, K, d) of point sets.
+        distance (int): the maximum distance between two neighbour points (DBSCAN eps).
+        min_samples (int): the number of neighbours of a core point (DBSCAN min_samples).
+        mask (np.array): (K,) or (N, K) valid points of the padded sets, every point is valid by default.
+    Returns:
+        noise (np.array): boolean array of the shape of mask, True for the noise points.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X[:, np.newaxis]
+    batched = X.ndim == 3
+    if not batched:
+        X = X[np.newaxis]
+    mask = np.ones(X.shape[:2], dtype=bool) if mask is None else np.asarray(mask, dtype=bool).reshape(X.shape[:2])
+
+    differences = X[:, :, np.newaxis, :] - X[:, np.newaxis, :, :]
+    neighbours = np.sqrt(np.sum(differences ** 2, axis=3)) <= distance
+    neighbours &= mask[:, :, np.newaxis] & mask[:, np.newaxis, :]
+    core = (neighbours.sum(axis=2) >= min_samples) & mask
+    border = np.any(neighbours & core[:, np.newaxis, :], axis=2)
+    noise = mask & ~core & ~border
+    return noise if batched else noise[0]
+
+
 def intersect(list_lst: List[LineString]):
     assert len(list_lst) == 2
     first: LineString = list_lst[0]
@@ -260,3 +297,32 @@ def intersect(list_lst: List[LineString]):
     if point.is_empty:
         return []
     return [point.x, point.y]
+
+
+def as_records(rows, dtype: np.dtype):
+    """
+    Rows as a structured array of dtype, whose fields are float64. A row may have fewer values than dtype has fields,
+    e.g. the (x, y) points of a stripe clipped by Slash, the missing fields are NaN.
+
+    Returns:
+        (records, columns): the structured array and the number of values of the rows
+    """
+    if isinstance(rows, np.ndarray) and rows.dtype == dtype:
+        return rows, len(dtype.names)
+    values = np.asarray(rows, dtype=np.float64)
+    columns = values.shape[1] if values.ndim == 2 else len(dtype.names)
+    records = np.full(len(values), np.nan, dtype=dtype)
+    table = as_table(records)
+    table[:, :columns] = values.reshape(-1, columns)
+    return records, columns
+
+
+def as_table(records: np.array) -> np.array:
+    """ A (n, fields) float64 view of a structured array of float64 fields """
+    return records.view(np.float64).reshape(len(records), len(records.dtype.names))
+
+
+def read_only(array: np.array) -> np.array:
+    view = array.view()
+    view.flags.writeable = False
+    return view
@@ -0,0 +1,2 @@
+from .writer import CommonRoadWriter
+from .reader import CommonRoadReader, Lanelet
@@ -0,0 +1,157 @@
+import numpy as np
+from typing import Iterator, List
+from xml.etree import ElementTree
+from shapely.geometry import LineString
+from modules.constant import CONST
+from modules.models import Segment, Line
+from .writer import resample
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Number of lines and pattern of a Line for the line marking of a bound, the reverse of writer.LINE_MARKINGS
+LINE_TYPES = {
+    "solid": (CONST.SINGLE, CONST.SOLID),
+    "dashed": (CONST.SINGLE, CONST.DASHED),
+    "broad_solid": (CONST.DOUBLE, CONST.SOLID),
+    "broad_dashed": (CONST.DOUBLE, CONST.DASHED),
+}
+
+
+class Lanelet():
+    """ A lanelet of a CommonRoad map: its bounds as (n, 2) arrays, their line markings and its neighbours """
+
+    def __init__(self, lanelet_id: int, left: np.array, right: np.array, left_marking: str = None,
+                 right_marking: str = None, adjacent_left: int = None, adjacent_right: int = None):
+        self.id = lanelet_id
+        self.left = left
+        self.right = right
+        self.left_marking = left_marking
+        self.right_marking = right_marking
+        self.adjacent_left = adjacent_left
+        self.adjacent_right = adjacent_right
+
+    def direction(self) -> np.array:
+        return (self.left[-1] + self.right[-1]) - (self.left[0] + self.right[0])
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.__dict__)
+
+
+def parse_bound(bound) -> np.array:
+    return np.array([(float(p.findtext("x")), float(p.findtext("y"))) for p in bound.iterfind("point")],
+                    dtype=np.float64).reshape(-1, 2)
+
+
+def parse_adjacent(element):
+    # The driving direction of the neighbour is taken from its bounds, drivingDir is not reliable (see the
+    # 2018b tutorial scenario, whose lanes all run the same way)
+    return None if element is None else int(element.get("ref"))
+
+
+def as_line(coords: np.array, marking: str) -> Line:
+    line = Line(ls=None).with_coords(coords)
+    line.num, line.pattern = LINE_TYPES.get(marking, (CONST.INVALID_LINE, str(CONST.INVALID_LINE)))
+    return line
+
+
+class CommonRoadReader():
+    """
+    Reads the road network of a CommonRoad scenario or map. The file is parsed incrementally with iterparse (lxml
+    when it is installed): each lanelet is turned into arrays as soon as it is parsed and its elements are released,
+    so the memory is bounded by the coordinates of the lanelets rather than by the XML tree.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.attributes = dict()
+
+    def lanelets(self) -> Iterator[Lanelet]:
+        """ The lanelets of the file in document order, the attributes of the root are kept in self.attributes """
+        iterparse = etree.iterparse if etree is not None else ElementTree.iterparse
+        depth, root = 0, None
+        for event, element in iterparse(self.path, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = element
+                    self.attributes = dict(element.attrib)
+                depth += 1
+                continue
+            depth -= 1
+            # Only the children of the root, lanelets are also referenced inside planning problems
+            if depth != 1:
+                continue
+            if element.tag == "lanelet":
+                left, right = element.find("leftBound"), element.find("rightBound")
+                yield Lanelet(int(element.get("id")), parse_bound(left), parse_bound(right),
+                              left.findtext("lineMarking"), right.findtext("lineMarking"),
+                              parse_adjacent(element.find("adjacentLeft")),
+                              parse_adjacent(element.find("adjacentRight")))
+            # Release the parsed top-level elements
+            root.clear()
+
+    def segments(self) -> List[Segment]:
+        """
+        Road segments of the lanelets: adjacent lanelets form one segment whose lines are the bounds of its lanes
+        ordered from left to right, in the direction of its first lanelet in the file. The lines of a segment have
+        the same number of points.
+        """
+        lanelets = {lanelet.id: lanelet for lanelet in self.lanelets()}
+        segments, visited = list(), set()
+        for lanelet_id in lanelets:
+            if lanelet_id in visited:
+                continue
+            lanes = self.lanes(lanelets, lanelet_id)
+            visited.update(lanelet.id for lanelet, _ in lanes)
+
+            # The bounds of the lanes, from left to right in the direction of the segment
+            first, same = lanes[0]
+            bounds = [(first.left, first.left_marking) if same else (first.right[::-1], first.right_marking)]
+            for lanelet, same in lanes:
+                bounds.append((lanelet.right, lanelet.right_marking) if same else
+                              (lanelet.left[::-1], lanelet.left_marking))
+            n = max(len(coords) for coords, _ in bounds)
+            lines = [as_line(resample(coords, n), marking) for coords, marking in bounds]
+
+            left, right = lines[0].coords, lines[-1].coords
+            segment = Segment(CONST.ROAD_CURVE_OR_STRAIGHT, LineString((left + right) / 2),
+                              width=float(np.max(np.hypot(*(right - left).T))), road_id=len(segments),
+                              left_boundary=LineString(left), right_boundary=LineString(right))
+            segment.lines = lines
+            segment.generate_lanes(lines)
+            segments.append(segment)
+        return segments
+
+    @staticmethod
+    def lanes(lanelets: dict, lanelet_id: int) -> List[tuple]:
+        """
+        The lanelets adjacent to a lanelet, from left to right in its direction
+
+        Returns:
+            list of (lanelet, True when it runs in the same direction)
+        """
+        def neighbour(lanelet, same, to_left):
+            adjacent = lanelet.adjacent_left if to_left == same else lanelet.adjacent_right
+            if adjacent not in lanelets:
+                return None
+            other = lanelets[adjacent]
+            return other, same == (float(np.dot(lanelet.direction(), other.direction())) >= 0)
+
+        # Walk to the leftmost lane, then collect the lanes to the right
+        current, seen = (lanelets[lanelet_id], True), {lanelet_id}
+        while True:
+            left = neighbour(*current, to_left=True)
+            if left is None or left[0].id in seen:
+                break
+            current = left
+            seen.add(left[0].id)
+        lanes, seen = [current], {current[0].id}
+        while True:
+            right = neighbour(*lanes[-1], to_left=False)
+            if right is None or right[0].id in seen:
+                break
+            lanes.append(right)
+            seen.add(right[0].id)
+        return lanes
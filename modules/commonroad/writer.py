@@ -0,0 +1,267 @@
+import math
+import datetime
+import contextlib
+import numpy as np
+from typing import List
+from xml.sax.saxutils import XMLGenerator
+from modules.constant import CONST
+
+try:
+    from lxml import etree
+except ImportError:
+    # The standard library writes the same document, only slower
+    etree = None
+
+# Line marking of a bound for the pattern and the number of lines of a Stripe. CommonRoad 2020a has no double line,
+# a double line is written as a broad one.
+LINE_MARKINGS = {
+    (CONST.SOLID, CONST.SINGLE): "solid",
+    (CONST.SOLID, CONST.DOUBLE): "broad_solid",
+    (CONST.DASHED, CONST.SINGLE): "dashed",
+    (CONST.DASHED, CONST.DOUBLE): "broad_dashed",
+    (CONST.DOTTED, CONST.SINGLE): "dashed",
+    (CONST.DOTTED, CONST.DOUBLE): "broad_dashed",
+}
+
+
+def line_marking(stripe) -> str:
+    return LINE_MARKINGS.get((stripe.pattern, stripe.num), "unknown")
+
+
+def resample(points: np.array, n: int) -> np.array:
+    """ n points evenly spaced along the polyline of points """
+    distances = np.concatenate([[0], np.cumsum(np.hypot(*np.diff(points, axis=0).T))])
+    if len(points) == n or distances[-1] == 0:
+        return points[np.linspace(0, len(points) - 1, n).round().astype(int)]
+    samples = np.linspace(0, distances[-1], n)
+    return np.stack([np.interp(samples, distances, points[:, 0]), np.interp(samples, distances, points[:, 1])], axis=1)
+
+
+def bounds(first: np.array, second: np.array):
+    """
+    Left and right bounds of the lanelet between two stripes, with the same number of points. The lanelet runs in
+    the direction of the points, the left bound is the stripe on its left.
+
+    Returns:
+        (left, right, first_is_left)
+    """
+    n = max(len(first), len(second))
+    first, second = resample(first, n), resample(second, n)
+    direction = first[-1] - first[0]
+    offset = second.mean(axis=0) - first.mean(axis=0)
+    if direction[0] * offset[1] - direction[1] * offset[0] > 0:
+        return second, first, False
+    return first, second, True
+
+
+def states(nodes: np.array, time_step_size: float):
+    """
+    States of a vehicle script at every time step of the scenario, linearly interpolated between the nodes
+
+    Args:
+        nodes: the structured array of the script (Vehicle.nodes)
+        time_step_size: the time step of the scenario
+
+    Returns:
+        (time steps, positions, orientations, velocities, accelerations, yaw rates) arrays
+    """
+    t = nodes['t']
+    xy = np.stack([nodes['x'], nodes['y']], axis=1)
+    steps = np.arange(math.ceil(t[0] / time_step_size - 1e-9), math.floor(t[-1] / time_step_size + 1e-9) + 1)
+    if len(steps) < 2:
+        # A stationary vehicle or a script shorter than a time step
+        step = np.array([round(t[0] / time_step_size)])
+        heading = xy[-1] - xy[0]
+        orientation = np.array([math.atan2(heading[1], heading[0])])
+        velocity = np.array([np.hypot(*heading) / (t[-1] - t[0]) if t[-1] > t[0] else 0.0])
+        return step, xy[:1], orientation, velocity, np.zeros(1), np.zeros(1)
+
+    times = steps * time_step_size
+    positions = np.stack([np.interp(times, t, xy[:, 0]), np.interp(times, t, xy[:, 1])], axis=1)
+    vx, vy = np.gradient(positions, time_step_size, axis=0).T
+    orientations = np.unwrap(np.arctan2(vy, vx))
+    velocities = np.hypot(vx, vy)
+    return (steps.astype(int), positions, orientations, velocities, np.gradient(velocities, time_step_size),
+            np.gradient(orientations, time_step_size))
+
+
+class _XmlStream():
+    """ Indented XML written element by element, with lxml.etree.xmlfile or xml.sax XMLGenerator """
+
+    def __init__(self, xf, indent="  "):
+        self.xf = xf
+        self.indent = indent
+        self.depth = 0
+
+    @classmethod
+    @contextlib.contextmanager
+    def open(cls, outfile):
+        if etree is not None:
+            with etree.xmlfile(outfile, encoding="utf-8") as xf:
+                xf.write_declaration()
+                yield cls(xf)
+        else:
+            generator = XMLGenerator(outfile, encoding="utf-8", short_empty_elements=True)
+            generator.startDocument()
+            yield cls(generator)
+            generator.endDocument()
+
+    def text(self, text):
+        if etree is not None:
+            self.xf.write(text)
+        else:
+            self.xf.characters(text)
+
+    def newline(self):
+        self.text("\n" + self.indent * self.depth)
+
+    @contextlib.contextmanager
+    def element(self, tag, **attrs):
+        if self.depth > 0:
+            self.newline()
+        self.depth += 1
+        if etree is not None:
+            with self.xf.element(tag, attrs):
+                yield self
+                self.depth -= 1
+                self.newline()
+        else:
+            self.xf.startElement(tag, attrs)
+            yield self
+            self.depth -= 1
+            self.newline()
+            self.xf.endElement(tag)
+
+    def leaf(self, tag, text=None, **attrs):
+        """ An element without children """
+        self.newline()
+        if etree is not None:
+            element = etree.Element(tag, attrs)
+            element.text = text
+            self.xf.write(element)
+        else:
+            self.xf.startElement(tag, attrs)
+            if text is not None:
+                self.xf.characters(text)
+            self.xf.endElement(tag)
+
+
+class CommonRoadWriter():
+    """
+    Writes a generated scenario as a CommonRoad 2020a scenario. Each lane of a road (BngSegement), between two
+    consecutive stripes, is a lanelet whose bounds carry the line markings of the stripes. Each vehicle is a dynamic
+    obstacle whose script is sampled at every time step of the scenario.
+
+    The document is streamed element by element, with lxml when it is installed, so the memory does not grow with
+    the number of lanelets and trajectory states.
+    """
+
+    def __init__(self, time_step_size: float = CONST.COMMONROAD_TIME_STEP, vehicle_length: float = CONST.CAR_LENGTH_SIM,
+                 vehicle_width: float = CONST.CAR_WIDTH_SIM, author: str = "", affiliation: str = "",
+                 source: str = "CRISCE accident sketch"):
+        self.time_step_size = time_step_size
+        self.vehicle_length = vehicle_length
+        self.vehicle_width = vehicle_width
+        self.author = author
+        self.affiliation = affiliation
+        self.source = source
+
+    @staticmethod
+    def benchmark_id(name: str) -> str:
+        return f'ZAM_{"".join(c if c.isalnum() else "-" for c in name)}-1_1_T-1'
+
+    def write(self, path: str, name: str, roads: List, vehicles: List):
+        """
+        Write the scenario
+
+        Args:
+            path: the XML file
+            name: the name of the scenario, part of its benchmark ID
+            roads: the BngSegement of the roads
+            vehicles: the Vehicle of the scenario
+        """
+        with open(path, "wb") as outfile, _XmlStream.open(outfile) as xml:
+            with xml.element("commonRoad", commonRoadVersion=CONST.COMMONROAD_VERSION,
+                             benchmarkID=self.benchmark_id(name), date=datetime.date.today().isoformat(),
+                             author=self.author, affiliation=self.affiliation, source=self.source,
+                             timeStepSize=f'{self.time_step_size:g}'):
+                with xml.element("location"):
+                    xml.leaf("geoNameId", "-999")
+                    xml.leaf("gpsLatitude", "999")
+                    xml.leaf("gpsLongitude", "999")
+                with xml.element("scenarioTags"):
+                    xml.leaf("Critical")
+                    xml.leaf("Simulated")
+                next_id = 1
+                for road in roads:
+                    next_id = self.write_road(xml, road, next_id)
+                for vehicle in vehicles:
+                    self.write_vehicle(xml, vehicle, next_id)
+                    next_id += 1
+
+    def write_road(self, xml: _XmlStream, road, first_id: int) -> int:
+        """
+        Write the lanelets of a road
+
+        Returns:
+            the next free id
+        """
+        stripes = [road.left] + road.marks + [road.right]
+        for i, (first, second) in enumerate(zip(stripes, stripes[1:])):
+            lanelet_id = first_id + i
+            left, right, first_is_left = bounds(first.array[:, :2], second.array[:, :2])
+            left_stripe, right_stripe = (first, second) if first_is_left else (second, first)
+            # The lanelets of a road run in the same direction, the neighbour across the first stripe is the previous one
+            previous = lanelet_id - 1 if i > 0 else None
+            following = lanelet_id + 1 if i < len(stripes) - 2 else None
+            adjacent_left, adjacent_right = (previous, following) if first_is_left else (following, previous)
+            with xml.element("lanelet", id=str(lanelet_id)):
+                for tag, points, stripe in [("leftBound", left, left_stripe), ("rightBound", right, right_stripe)]:
+                    with xml.element(tag):
+                        for x, y in points.tolist():
+                            self.write_point(xml, x, y)
+                        xml.leaf("lineMarking", line_marking(stripe))
+                if adjacent_left is not None:
+                    xml.leaf("adjacentLeft", ref=str(adjacent_left), drivingDir="same")
+                if adjacent_right is not None:
+                    xml.leaf("adjacentRight", ref=str(adjacent_right), drivingDir="same")
+                xml.leaf("laneletType", "unknown")
+        return first_id + len(stripes) - 1
+
+    def write_vehicle(self, xml: _XmlStream, vehicle, obstacle_id: int):
+        steps, positions, orientations, velocities, accelerations, yaw_rates = states(vehicle.nodes,
+                                                                                       self.time_step_size)
+        with xml.element("dynamicObstacle", id=str(obstacle_id)):
+            xml.leaf("type", "car")
+            with xml.element("shape"):
+                with xml.element("rectangle"):
+                    xml.leaf("length", repr(float(self.vehicle_length)))
+                    xml.leaf("width", repr(float(self.vehicle_width)))
+            with xml.element("initialState"):
+                self.write_state(xml, steps[0], positions[0], orientations[0], velocities[0], accelerations[0],
+                                 yaw_rate=yaw_rates[0], slip_angle=0.0)
+            if len(steps) > 1:
+                with xml.element("trajectory"):
+                    for k in range(1, len(steps)):
+                        with xml.element("state"):
+                            self.write_state(xml, steps[k], positions[k], orientations[k], velocities[k],
+                                             accelerations[k])
+
+    @staticmethod
+    def write_point(xml: _XmlStream, x: float, y: float):
+        with xml.element("point"):
+            xml.leaf("x", repr(x))
+            xml.leaf("y", repr(y))
+
+    def write_state(self, xml: _XmlStream, step, position, orientation, velocity, acceleration, yaw_rate=None,
+                    slip_angle=None):
+        """ Elements of a state, the initial state also has a yaw rate and a slip angle """
+        with xml.element("position"):
+            self.write_point(xml, float(position[0]), float(position[1]))
+        values = [("orientation", float(orientation)), ("time", int(step)), ("velocity", float(velocity)),
+                  ("acceleration", float(acceleration))]
+        if yaw_rate is not None:
+            values += [("yawRate", float(yaw_rate)), ("slipAngle", float(slip_angle))]
+        for tag, value in values:
+            with xml.element(tag):
+                xml.leaf("exact", repr(value))
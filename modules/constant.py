@@ -1,3 +1,6 @@
+import os
+
+
 class Constant:
     def __init__(self):
         self.ROAD_CURVE_OR_STRAIGHT = 0
@@ -24,6 +27,20 @@ class Constant:
         self.WINDOWS = "Windows"
         self.RED_RGBA = "1 0 0"
         self.BLUE_RGBA = "0 0 1"
+        self.ARTIFACTS_NONE = "none"
+        self.ARTIFACTS_FINAL = "final"
+        self.ARTIFACTS_ALL = "all"
+        self.ARTIFACT_LEVELS = [self.ARTIFACTS_NONE, self.ARTIFACTS_FINAL, self.ARTIFACTS_ALL]
+        self.CACHE_FOLDER = os.path.join("outputs", ".cache")
+        self.CACHE_MAX_SIZE = 512 * 1024 * 1024
+        self.CACHE_VERSION = 2
+        self.CAR_WIDTH_SIM = 2.0
+        self.COMMONROAD_VERSION = "2020a"
+        self.COMMONROAD_TIME_STEP = 0.1
+        self.FORMAT_JSON = "json"
+        self.FORMAT_COMMONROAD = "commonroad"
+        self.FORMAT_COLUMNAR = "columnar"
+        self.OUTPUT_FORMATS = [self.FORMAT_JSON, self.FORMAT_COMMONROAD, self.FORMAT_COLUMNAR]
         self.CRISCE_IMPACT_MODEL = {
             "front_left": [
                 "headlight_L", "hood", "fender_L", "bumper_F", "bumperbar_F", "suspension_F", "body_wagon"
@@ -0,0 +1,123 @@
+import os
+import queue
+import threading
+import contextlib
+import logging as logger
+import numpy as np
+import cv2
+from modules.constant import CONST
+
+
+class ArtifactWriter():
+    """
+    Writes the debug images (artifacts) of the extraction stages according to an artifact policy:
+        CONST.ARTIFACTS_NONE  - nothing is written
+        CONST.ARTIFACTS_FINAL - only the final image of each stage is written
+        CONST.ARTIFACTS_ALL   - every intermediate image is written
+    When asynchronous, the encoding and the disk I/O happen on a background thread fed by a bounded queue.
+    The image is copied when queued, so the caller is free to keep drawing on it. An image which cannot be written
+    does not stop the thread, the errors are logged by close.
+
+    The encoded images can be recorded (see recording) and written again later with replay, which is how the stage
+    cache restores the images of a stage it loads.
+    """
+
+    def __init__(self, level=CONST.ARTIFACTS_ALL, asynchronous=True, max_queue=16):
+        assert level in CONST.ARTIFACT_LEVELS, f'Unknown artifact level {level}'
+        self.level = level
+        self.asynchronous = asynchronous
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.thread = None
+        self.errors = []
+        self.recorded = None
+
+    def enabled(self, final=False):
+        """ Return whether an image of the given kind is written under the current policy """
+        if self.level == CONST.ARTIFACTS_ALL:
+            return True
+        return final and self.level == CONST.ARTIFACTS_FINAL
+
+    def write(self, path, image, final=False):
+        if not self.enabled(final):
+            return
+        if not self.asynchronous:
+            self.imwrite(path, image, self.recorded)
+            return
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.consume, name="ArtifactWriter", daemon=True)
+            self.thread.start()
+        # Blocks when the queue is full, which bounds the memory held by pending images
+        self.queue.put((path, np.array(image, copy=True), self.recorded))
+
+    def imwrite(self, path, image, record=None):
+        """ Encode the image after the extension of path and write it, appending (path, bytes) to record """
+        try:
+            ok, encoded = cv2.imencode(os.path.splitext(path)[1], image)
+            if not ok:
+                self.errors.append(f'Cannot write {path}')
+                return
+            data = encoded.tobytes()
+            with open(path, "wb") as f:
+                f.write(data)
+        except Exception as ex:
+            self.errors.append(f'Cannot write {path}: {ex!r}')
+            return
+        if record is not None:
+            record.append((path, data))
+
+    @contextlib.contextmanager
+    def recording(self):
+        """
+        Record the images written in the block
+
+        Yields:
+            the list of (path, encoded image) written, complete when the block exits
+        """
+        previous, self.recorded = self.recorded, list()
+        images = self.recorded
+        try:
+            yield images
+        finally:
+            if self.thread is not None:
+                self.queue.join()
+            self.recorded = previous
+
+    def replay(self, images):
+        """ Write the images of recording again, their folders are created by the stages and may be missing """
+        for path, data in images:
+            try:
+                if os.path.dirname(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(data)
+            except Exception as ex:
+                self.errors.append(f'Cannot write {path}: {ex!r}')
+
+    def consume(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self.imwrite(*item)
+            except Exception as ex:
+                # Whatever happens, the thread keeps consuming or write and close would wait forever
+                self.errors.append(f'Cannot write {item[0]}: {ex!r}')
+            finally:
+                self.queue.task_done()
+
+    def close(self):
+        """ Wait until every queued image is written and stop the background thread """
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        for error in self.errors:
+            logger.warning(error)
+        self.errors = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
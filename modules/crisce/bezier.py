@@ -0,0 +1,99 @@
+"""
+Vectorized Bezier curves.
+
+A Bezier curve of degree n sampled at t_0..t_m is the product B @ P of the (m+1, n+1) Bernstein basis matrix
+B[j, i] = comb(n, i) * t_j^i * (1 - t_j)^(n - i) with the (n+1, d) control points P. The basis of the uniform
+samples only depends on (degree, n_points) and is cached. The k-th derivative of a Bezier curve is the Bezier
+curve of degree n - k of the derivative control points, so derivatives and curvature reuse the cached bases.
+"""
+from functools import lru_cache
+import numpy as np
+import scipy.special
+
+
+def bernstein_matrix(degree, t):
+    """
+    Bernstein basis matrix of a degree
+
+    Args:
+        degree: degree of the curve
+        t: parameters in [0, 1]
+
+    Returns:
+        the (len(t), degree + 1) basis matrix
+    """
+    t = np.asarray(t, dtype=np.float64).reshape(-1, 1)
+    i = np.arange(degree + 1)
+    return scipy.special.comb(degree, i) * t ** i * (1 - t) ** (degree - i)
+
+
+@lru_cache(maxsize=128)
+def bernstein_basis(degree, n_points):
+    """
+    Cached and read-only Bernstein basis matrix of n_points uniform samples of t in [0, 1]
+    """
+    basis = bernstein_matrix(degree, np.linspace(0, 1, n_points))
+    basis.setflags(write=False)
+    return basis
+
+
+def derivatives_control_points(control_points, n_derivatives):
+    """
+    Control points of the successive derivatives of a Bezier curve
+
+    Returns:
+        a list with the control points of the curve followed by the ones of its n_derivatives derivatives
+    """
+    w = [np.asarray(control_points, dtype=np.float64)]
+    for _ in range(n_derivatives):
+        n = len(w[-1])
+        w.append((n - 1) * np.diff(w[-1], axis=0))
+    return w
+
+
+def evaluate(control_points, n_points=100, n_derivatives=0, t=None):
+    """
+    Evaluate a Bezier curve and its derivatives
+
+    Args:
+        control_points: (n + 1, d) control points
+        n_points: number of uniform samples of t in [0, 1]
+        n_derivatives: number of derivatives to evaluate
+        t: explicit parameters in [0, 1], which replace the uniform samples
+
+    Returns:
+        a list with the (n_points, d) points of the curve followed by its n_derivatives derivatives
+    """
+    results = []
+    for w in derivatives_control_points(control_points, n_derivatives):
+        degree = len(w) - 1
+        if degree < 0:
+            # The derivative of a curve of degree lower than its order
+            w = np.zeros((1, np.shape(control_points)[1]))
+            degree = 0
+        basis = bernstein_basis(degree, n_points) if t is None else bernstein_matrix(degree, t)
+        results.append(basis @ w)
+    return results
+
+
+def bezier_path(control_points, n_points=100):
+    """
+    Points of a Bezier curve at n_points uniform samples of t in [0, 1]
+    """
+    return evaluate(control_points, n_points)[0]
+
+
+def curvature(control_points, n_points=100, t=None):
+    """
+    Signed curvature of a planar Bezier curve at n_points uniform samples of t in [0, 1] (or at t)
+    """
+    _, dt, ddt = evaluate(control_points, n_points, n_derivatives=2, t=t)
+    return curvature_from_derivatives(dt, ddt)
+
+
+def curvature_from_derivatives(dt, ddt):
+    """
+    Signed curvature of a planar curve from its (m, 2) first and second derivatives
+    """
+    dt, ddt = np.atleast_2d(dt), np.atleast_2d(ddt)
+    return (dt[:, 0] * ddt[:, 1] - dt[:, 1] * ddt[:, 0]) / (dt[:, 0] ** 2 + dt[:, 1] ** 2) ** (3 / 2)
@@ -1,38 +1,35 @@
 import copy
 import itertools
-import seaborn as sns
 import glob
 import os
 import math
-import matplotlib.pyplot as plt
-import matplotlib.image as mpimg
-import imutils
 import numpy as np
 from .pre_processing import Pre_Processing
+from .artifacts import ArtifactWriter
+from ..trace import Tracer
 import cv2
-import scipy.special
 import time
-import matplotlib
 
 
 vehicle_info = "vehicle_info"
 
 class Car():
 
-    def __init__(self):
+    def __init__(self, artifacts=None, tracer=None):
         self.car_length, self.car_width, self.center_of_vehicles = list(), list(), list()
-        self.vehicles = dict()
-        self.vehicles["red"]    = dict()
-        self.vehicles["blue"]   = dict()
         self.pre_process    = Pre_Processing()
+        self.vehicles = {vehicle_color: dict() for vehicle_color in self.pre_process.vehicle_colors}
         self.car_length     = None
         self.car_width      = None
         self.car_length_sim = None
         self.height         = None
         self.width          = None
         self.show_image     = None
+        self.headless       = False
         self.output_folder  = None
         self.process_number = None
+        self.artifacts      = artifacts if artifacts is not None else ArtifactWriter(asynchronous=False)
+        self.tracer         = tracer if tracer is not None else Tracer(enabled=False)
         
     def getCarDimensions(self):
         """ Return car length and car width"""
@@ -98,6 +95,7 @@ class Car():
         """
         c_length, c_width, center_of_vehicles = list(), list(), list()
         vehicle_info = "vehicle_info"
+        visualize = self.artifacts.enabled() or self.show_image
         
         t0 = time.time()
         # print("\n-------  Vehicle Extraction Pipeline    ------")
@@ -131,9 +129,10 @@ class Car():
 
                     box = cv2.boxPoints(rect)
                     box = np.int0(box)
-                    img = cv2.polylines(image.copy(), [box], True, (0,255,0), 2)
-                    
-                    temp_img = cv2.rectangle(image.copy(), (x,y), (x + width, y + height), (0,204,255), 2)
+                    # The bounding boxes are drawn for the AABB_OBB image only
+                    if visualize:
+                        img = cv2.polylines(image.copy(), [box], True, (0,255,0), 2)
+                        temp_img = cv2.rectangle(image.copy(), (x,y), (x + width, y + height), (0,204,255), 2)
                     # temp_img = cv2.line(image.copy(), tuple([box[1][0], box[1][1]]), tuple([box[2][0], box[2][1]]), (128,128,128), 3)
                     # cv2.circle(img, tuple([int(rect[0][0]), int(rect[0][1])]), 5, (204, 0, 204), -1)
 
@@ -165,18 +164,19 @@ class Car():
 
                     """ Corner Points and Nodes of Vehicles """
                     # cv2.rectangle(img, (x, y),(x + width, y + height), (255, 255, 0), -1)
-                    cv2.circle(img, tuple([int(vehicle_nodes[0][0]), int(vehicle_nodes[0][1])]), 5, (255, 255, 0), -1)  ## Light Sky blue   , Node 0
-                    cv2.circle(img, tuple([int(vehicle_nodes[1][0]), int(vehicle_nodes[1][1])]), 5, (127, 0, 255), -1)  ## Lipstic Pink     , Node 1
-                    cv2.circle(img, tuple([int(vehicle_nodes[2][0]), int(vehicle_nodes[2][1])]), 5, (255, 51, 153), -1) ## Purple color     , Node 2
-                    cv2.circle(img, tuple([int(vehicle_nodes[3][0]), int(vehicle_nodes[3][1])]), 5, (255, 0, 0), -1)    ## Dark Blue        , Node 3
-                    cv2.circle(img, tuple([int(vehicle_nodes[4][0]), int(vehicle_nodes[4][1])]), 5, (50, 255, 255), -1) ## Yellow           , Node 4 (Mid_0_1)
-                    cv2.circle(img, tuple([int(vehicle_nodes[5][0]), int(vehicle_nodes[5][1])]), 5, (50, 255, 255), -1) ## Yellow           , Node 5 (Mid_1_2)
-                    cv2.circle(img, tuple([int(vehicle_nodes[6][0]), int(vehicle_nodes[6][1])]), 5, (50, 255, 255), -1) ## Yellow           , Node 6 (Mid_2_3)
-                    cv2.circle(img, tuple([int(vehicle_nodes[7][0]), int(vehicle_nodes[7][1])]), 5, (50, 255, 255), -1) ## Yellow           , Node 7 (Mid_3_4)
-                    cv2.circle(img, tuple([int(vehicle_nodes[8][0]), int(vehicle_nodes[8][1])]), 5, (0, 255, 0), -1)    ## Green            , Node 8 (Mid_4_1)
-                    cv2.circle(img, tuple([int(vehicle_nodes[9][0]), int(vehicle_nodes[9][1])]), 5, (0, 255, 0), -1)    ## Green            , Node 9 (Mid_4_2)
-                    cv2.circle(img, tuple([int(vehicle_nodes[10][0]), int(vehicle_nodes[10][1])]), 5, (0, 255, 0), -1)  ## Green            , Node 10 (Mid_7_3)
-                    cv2.circle(img, tuple([int(vehicle_nodes[11][0]), int(vehicle_nodes[11][1])]), 5, (0, 255, 0), -1)  ## Green            , Node 11 (Mid_7_4)
+                    if visualize:
+                        cv2.circle(img, tuple([int(vehicle_nodes[0][0]), int(vehicle_nodes[0][1])]), 5, (255, 255, 0), -1)  ## Light Sky blue   , Node 0
+                        cv2.circle(img, tuple([int(vehicle_nodes[1][0]), int(vehicle_nodes[1][1])]), 5, (127, 0, 255), -1)  ## Lipstic Pink     , Node 1
+                        cv2.circle(img, tuple([int(vehicle_nodes[2][0]), int(vehicle_nodes[2][1])]), 5, (255, 51, 153), -1) ## Purple color     , Node 2
+                        cv2.circle(img, tuple([int(vehicle_nodes[3][0]), int(vehicle_nodes[3][1])]), 5, (255, 0, 0), -1)    ## Dark Blue        , Node 3
+                        cv2.circle(img, tuple([int(vehicle_nodes[4][0]), int(vehicle_nodes[4][1])]), 5, (50, 255, 255), -1) ## Yellow           , Node 4 (Mid_0_1)
+                        cv2.circle(img, tuple([int(vehicle_nodes[5][0]), int(vehicle_nodes[5][1])]), 5, (50, 255, 255), -1) ## Yellow           , Node 5 (Mid_1_2)
+                        cv2.circle(img, tuple([int(vehicle_nodes[6][0]), int(vehicle_nodes[6][1])]), 5, (50, 255, 255), -1) ## Yellow           , Node 6 (Mid_2_3)
+                        cv2.circle(img, tuple([int(vehicle_nodes[7][0]), int(vehicle_nodes[7][1])]), 5, (50, 255, 255), -1) ## Yellow           , Node 7 (Mid_3_4)
+                        cv2.circle(img, tuple([int(vehicle_nodes[8][0]), int(vehicle_nodes[8][1])]), 5, (0, 255, 0), -1)    ## Green            , Node 8 (Mid_4_1)
+                        cv2.circle(img, tuple([int(vehicle_nodes[9][0]), int(vehicle_nodes[9][1])]), 5, (0, 255, 0), -1)    ## Green            , Node 9 (Mid_4_2)
+                        cv2.circle(img, tuple([int(vehicle_nodes[10][0]), int(vehicle_nodes[10][1])]), 5, (0, 255, 0), -1)  ## Green            , Node 10 (Mid_7_3)
+                        cv2.circle(img, tuple([int(vehicle_nodes[11][0]), int(vehicle_nodes[11][1])]), 5, (0, 255, 0), -1)  ## Green            , Node 11 (Mid_7_4)
 
                     count_id += 1     
                     
@@ -208,49 +208,49 @@ class Car():
         # print("car_length = ", self.car_length)
         # print("car_width  = ", self.car_width)
         
-        if self.show_image:
-            self.pre_process.showImage("Axis Aligned Bounding Boxes Vs Oriented Bounding Boxes", np.hstack([temp_img, img]), time=800)
-
-        cv2.imwrite(self.output_folder + "{}_AABB_OBB.jpg".format(self.process_number), np.hstack([temp_img, img]))
+        if visualize:
+            aabb_obb = np.hstack([temp_img, img])
+            if self.show_image:
+                self.pre_process.showImage("Axis Aligned Bounding Boxes Vs Oriented Bounding Boxes", aabb_obb, time=800)
+            self.artifacts.write(self.output_folder + "{}_AABB_OBB.jpg".format(self.process_number), aabb_obb)
         self.process_number += 1
         time_efficiency["calc_vehicle_nodes"] = t1-t0
         # print("total time taken", t1-t0)
 
 
+    def closestNodes(self, nodes_1, nodes_2):
+        """
+        Closest pair of nodes between two stacks of nodes, as [distance, node_1, node_2]. Equally distant pairs
+        are ordered by their nodes, as the minimum of the list of all [distance, node_1, node_2] would be.
+        """
+        differences = (nodes_1[:, np.newaxis, :] - nodes_2[np.newaxis, :, :]).astype(np.float64)
+        distances = np.sqrt(differences[:, :, 0] ** 2 + differences[:, :, 1] ** 2)
+        rows, cols = np.nonzero(distances == distances.min())
+        first = np.lexsort((nodes_2[cols, 1], nodes_2[cols, 0], nodes_1[rows, 1], nodes_1[rows, 0]))[0]
+        i, j = rows[first], cols[first]
+        return [float(distances[i, j]), nodes_1[i].tolist(), nodes_2[j].tolist()]
+
     def extractingCrashPoint(self, image, time_efficiency):
-        """ Distance calculation between vehicles nodes and extracting the crash point """
-        
+        """
+        Distance calculation between vehicles nodes and extracting the crash point. The nodes of all the snapshots
+        of a vehicle are stacked in one array per color, and the closest nodes of two vehicles of different colors
+        give the crash point. A sketch with a single vehicle color falls back to the snapshots of that color.
+        """
         t0 = time.time()
-        nodes_of_vehicles = [self.vehicles[vehicle_color]["vehicle_info"][str(v_id)]["vehicle_nodes"] 
-                            for vehicle_color in self.vehicles for v_id in self.vehicles[vehicle_color]["vehicle_info"]]
-        
-        crash_ed_cal = list()
-
-        for vehicle1_nodes, vehicle2_nodes in itertools.combinations(nodes_of_vehicles, 2):
-
-            point_dist = list()
-            crash_img = image.copy()
-            for point_1 in vehicle1_nodes:
-                cv2.circle(crash_img, tuple(point_1), radius=3,
-                        color=(0, 255, 0), thickness=-1)
-                for point_2 in vehicle2_nodes:
-                    cv2.circle(crash_img, tuple(point_2), radius=3,
-                            color=(255, 0, 0), thickness=-1)
-                    crash_ed = cv2.norm(np.array(point_1) -
-                                        np.array(point_2), cv2.NORM_L2)
-                    # print("crash_ed", crash_ed)
-                    point_dist.append([crash_ed, point_1, point_2])
-                    # print("point_dist", point_dist)
-                #     cv2.imshow("crash point analyzation", crash_img)
-                # cv2.waitKey(50)
-            # cv2.destroyAllWindows()
-            # cv2.imshow("crash point analyzation", crash_img)
-            # cv2.waitKey(0)
-            crash_ed_cal.append(min(point_dist))
-
-        # print("crash euclidean distance calculation for the two vehicles", crash_ed_cal)
-
-        min_dist = min(crash_ed_cal)
+        stacks = dict()
+        for vehicle_color in self.vehicles:
+            snapshots = [self.vehicles[vehicle_color]["vehicle_info"][str(v_id)]["vehicle_nodes"]
+                         for v_id in self.vehicles[vehicle_color]["vehicle_info"]]
+            if len(snapshots) > 0:
+                stacks[vehicle_color] = [np.array(nodes, dtype=np.int64) for nodes in snapshots]
+
+        if len(stacks) > 1:
+            pairs = [(np.concatenate(stacks[color_1]), np.concatenate(stacks[color_2]))
+                     for color_1, color_2 in itertools.combinations(stacks, 2)]
+        else:
+            pairs = list(itertools.combinations([nodes for color in stacks for nodes in stacks[color]], 2))
+
+        min_dist = min(self.closestNodes(nodes_1, nodes_2) for nodes_1, nodes_2 in pairs)
         crash_point = [(int(round(min_dist[1][0])) + int(round(min_dist[2][0]))) // 2,
                        (int(round(min_dist[1][1])) + int(round(min_dist[2][1]))) // 2]
 
@@ -260,73 +260,92 @@ class Car():
             self.vehicles[vehicle_color]["crash_point"]["dist_to_vehicle"]  = min_dist[0]
         
         t1 = time.time()
-        
-        cv2.circle(crash_img, tuple(crash_point), 8, (0, 128, 255), -1)
-        # print("crash point = ", tuple(crash_point))
-        cv2.imwrite(self.output_folder + "{}_crash_point_visualization.jpg".format(self.process_number), crash_img)
+
+        if self.artifacts.enabled() or self.show_image:
+            crash_img = self.drawCrashPoint(image, stacks, crash_point)
+            self.artifacts.write(self.output_folder + "{}_crash_point_visualization.jpg".format(self.process_number), crash_img)
+            if self.show_image:
+                self.pre_process.showImage("crash point visualization", crash_img, time=800)
         self.process_number += 1
 
-        if self.show_image:
-            self.pre_process.showImage("crash point visualization", crash_img, time=800)
-        
         time_efficiency["calc_crash_pt"] = t1-t0
         # print("total time taken", t1-t0)
 
         return crash_point
 
+    def drawCrashPoint(self, image, stacks, crash_point):
+        """ Visual report of the crash point: the vehicle nodes, one color per vehicle, and the crash point """
+        crash_img = image.copy()
+        node_colors = [(0, 255, 0), (255, 0, 0), (0, 0, 255), (255, 0, 255)]
+        for k, vehicle_color in enumerate(stacks):
+            for nodes in stacks[vehicle_color]:
+                for node in nodes.tolist():
+                    cv2.circle(crash_img, tuple(node), radius=3, color=node_colors[k % len(node_colors)], thickness=-1)
+        cv2.circle(crash_img, tuple(crash_point), 8, (0, 128, 255), -1)
+        return crash_img
+
+    def triangleInRoi(self, image, box_points, buffers):
+        """
+        Center of the triangle drawn inside the box of a vehicle snapshot, in image coordinates.
+
+        The box is masked out of the image, inverted, blurred and thresholded so that the dark triangle is the
+        largest contour. Outside the box the blurred image is white, so the work is done on the bounding
+        rectangle of the box grown by the 1 pixel blur radius plus 1 pixel of white border, which makes the
+        blur and the contours identical to the ones of the whole image. The intermediate images are views of
+        the preallocated buffers.
+        """
+        height, width = image.shape[:2]
+        box_points = np.array(box_points, dtype=np.int32)
+        x, y, w, h = cv2.boundingRect(box_points)
+        x0, y0 = max(x - 2, 0), max(y - 2, 0)
+        x1, y1 = min(x + w + 2, width), min(y + h + 2, height)
+        if x1 <= x0 or y1 <= y0:
+            x0, y0, x1, y1 = 0, 0, width, height
+        h, w = y1 - y0, x1 - x0
+
+        def buffer(name, shape):
+            size = int(np.prod(shape))
+            if name not in buffers or buffers[name].size < size:
+                buffers[name] = np.empty(size, dtype=np.uint8)
+            return buffers[name][:size].reshape(shape)
+
+        mask = buffer("mask", (h, w))
+        mask.fill(0)
+        cv2.fillPoly(mask, np.array([box_points - (x0, y0)]), 255)
+        crop = np.ascontiguousarray(image[y0:y1, x0:x1])
+        # A masked operation leaves the destination unchanged outside the mask
+        roi = buffer("roi", crop.shape)
+        roi.fill(0)
+        roi = cv2.bitwise_and(crop, crop, dst=roi, mask=mask)
+        roi = cv2.bitwise_not(roi, dst=roi)
+        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY, dst=buffer("gray", (h, w)))
+        blur = cv2.blur(gray, (3, 3), dst=buffer("blur", (h, w)))
+        _, thresh = cv2.threshold(blur, 15, 255, cv2.THRESH_BINARY, dst=buffer("thresh", (h, w)))
+        thresh = cv2.bitwise_not(thresh, dst=thresh)
+        cnts, hierarchy = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE, offset=(x0, y0))
+        cnt = max(cnts, key=cv2.contourArea)
+        rect = cv2.minAreaRect(cnt)
+        return (int(rect[0][0]), int(rect[0][1]))
+
     def extractTriangle(self, image, time_efficiency):
         """
         Triangle Extraction
         """
         t0 = time.time()
+        buffers = dict()
+        test_image = image
         for vehicle_color in self.vehicles:
             for vehicle_id in self.vehicles[vehicle_color]['vehicle_info']:
-                test = np.zeros_like(image) 
-                test_image = image #.copy()
-                x, y, w, h = self.vehicles[vehicle_color]['vehicle_info'][vehicle_id]["bounding_rect"]
                 box_points = self.vehicles[vehicle_color]['vehicle_info'][vehicle_id]["vehicle_nodes"][:4]
-                # ROI = image[y:y+h, x:x+w]
-                roi = cv2.fillPoly(test, np.array([box_points]), (255, 255, 255))
-                roi = cv2.bitwise_and(test_image, test_image, mask=roi[:,:,0])
-                # cv2.imshow("ROI", roi)
-                roi = cv2.bitwise_not(roi)
-                gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-                blur = cv2.blur(gray, (3, 3), 0)
-                # cv2.threshold(blur, 10, 255, cv2.THRESH_BINARY)
-                _, thresh = cv2.threshold(blur, 15, 255, cv2.THRESH_BINARY)
-                thresh = cv2.bitwise_not(thresh)
-                # if self.show_image:
-                    # cv2.imshow("gray", gray)
-                    # cv2.imshow("blur", blur)
-                    # cv2.imshow("thresh", thresh)
-                    # cv2.imshow("after applying NOT ", thresh)
-                    # cv2.waitKey(400)
-
-                # # kernel = np.zeros((4,4), np.uint8)        
-                # # dilate = cv2.dilate(thresh, kernel)
-                # # dilate = cv2.bitwise_not(dilate)
-                # # rect_kernel = cv2.getStructuringElement( cv2.MORPH_RECT,(5,5))
-                # # dilate = cv2.dilate(thresh, rect_kernel )
-                cnts, hierarchy = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
-                cnt = max(cnts, key=cv2.contourArea)
-                # print("number of selected contours", len(cnts))
-                # print("")
-                # print("contour shape ", cnt.shape)
-                # # peri = cv2.arcLength(contour, True)
-                # # approx = cv2.approxPolyDP(contour, 0.04 * peri, True)
-                # # # if the shape is a triangle, it will have 3 vertices
-                # # print("len(approx)", len(approx))
-                # # if len(approx) == 3:
-                # #     print("triangle")
-                rect = cv2.minAreaRect(cnt)
-                # print("mid values", tuple([int(rect[0][0]), int(rect[0][1])]))
-                # cv2.circle(img, tuple(self.vehicles[vehicle_color]["crash_point"]["coordinates"]), 5, (0, 128, 255), -1)
-                cv2.circle(test_image, (int(rect[0][0]), int(rect[0][1])), 2, (255, 128, 0), -1 )
-                self.vehicles[vehicle_color]['vehicle_info'][vehicle_id]["triangle_position"] = tuple([int(rect[0][0]), int(rect[0][1])])
+                triangle_position = self.triangleInRoi(test_image, box_points, buffers)
+                # The mark is drawn on the image itself, so the next snapshots see it as before
+                cv2.circle(test_image, triangle_position, 2, (255, 128, 0), -1 )
+                self.vehicles[vehicle_color]['vehicle_info'][vehicle_id]["triangle_position"] = triangle_position
                 
         t1 = time.time()
-        cv2.destroyAllWindows()
-        cv2.imwrite(self.output_folder + "{}_triangle_extraction.jpg".format(self.process_number), test_image)
+        if not self.headless:
+            cv2.destroyAllWindows()
+        self.artifacts.write(self.output_folder + "{}_triangle_extraction.jpg".format(self.process_number), test_image)
         self.process_number += 1
         
         time_efficiency["tri_ext"] = t1-t0
@@ -385,7 +404,7 @@ class Car():
         if self.show_image:
             self.pre_process.showImage("Angles For Vehicles", image, time=800)
 
-        cv2.imwrite(self.output_folder + "{}_angles_for_vehicles.jpg".format(self.process_number), image)
+        self.artifacts.write(self.output_folder + "{}_angles_for_vehicles.jpg".format(self.process_number), image)
         self.process_number += 1
         
         time_efficiency["angle_cal"] = t1-t0
@@ -400,10 +419,72 @@ class Car():
             # print("vehicle number =", v_id)
             self.vehicles[v_color]["vehicle_info"][str(v_id)] = vehicle_dist_pivot[int(v_id)][2]
 
+    def frameReference(self, h, w):
+        """
+        Sides of the image frame as (axis, value, length): the pixels of a side have the coordinate value on the
+        axis, and 0 .. length - 1 on the other one. TOP is (x, 0) and BOTTOM (x, h) for x in [0, w), LEFT is
+        (0, y) and RIGHT (w, y) for y in [0, h).
+        """
+        return {"TOP": (1, 0, w),
+                "BOTTOM": (1, h, w),
+                "LEFT": (0, 0, h),
+                "RIGHT": (0, w, h)}
+
+    def sideAngles(self, front_point, side, positions):
+        """ Orientation angles (as the angles of the vehicles) from the front point to the pixels of a side """
+        axis, value, length = side
+        side_value = np.empty((len(positions), 2), dtype=np.int64)
+        side_value[:, axis] = value
+        side_value[:, 1 - axis] = positions
+        dx = side_value[:, 0] - front_point[0]
+        dy = side_value[:, 1] - front_point[1]
+        projected_angles = np.arctan2(dy, dx) * 180 / np.pi
+        rounded_angles = np.round(projected_angles)
+        return np.where(projected_angles < 0, -rounded_angles, -rounded_angles + 360)
+
+    def sideCandidates(self, front_point, side, orientation):
+        """
+        Pixels of a side which can have the given (rounded) orientation angle, without sampling the whole side.
+
+        The angle from the front point moves monotonically along a side, so the pixels having an orientation form
+        an interval. It starts at an end of the side or where one of the two rays bounding the raw angles rounded
+        to that orientation crosses the side. Those positions and their neighbours, plus the foot of the
+        perpendicular from the front point, are the candidates.
+        """
+        axis, value, length = side
+        if 0 < orientation < 180:
+            bounds = [-orientation - 0.5, -orientation + 0.5]
+        elif orientation == 0:
+            bounds = [-0.5, 0.0]
+        elif orientation == 180:
+            bounds = [179.5, -179.5]
+        elif 180 < orientation < 360:
+            bounds = [360 - orientation - 0.5, 360 - orientation + 0.5]
+        elif orientation == 360:
+            bounds = [0.0, 0.5]
+        else:
+            bounds = []
+
+        theta = np.radians(np.array(bounds, dtype=np.float64))
+        direction = np.stack([np.cos(theta), np.sin(theta)])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ray_length = (value - front_point[axis]) / direction[axis]
+            crossings = front_point[1 - axis] + ray_length * direction[1 - axis]
+        crossings = crossings[np.isfinite(crossings) & (ray_length > 0)]
+        positions = np.concatenate([[0, length - 1, front_point[1 - axis]], np.clip(crossings, -2, length + 1)])
+        positions = (np.floor(positions)[:, np.newaxis] + np.arange(-1, 3)).ravel()
+        return np.unique(np.clip(positions, 0, length - 1)).astype(np.int64)
+
     def extractVehicleProjectedSide(self, v_color, side):
+        """
+        Count the vehicles oriented towards a side of the frame, i.e. the vehicles whose angle is the angle from
+        their front point to a pixel of the side.
+
+        Args:
+            side: (name, (axis, value, length)) of frameReference
+        """
         orient_count = 0
-        side_name   = side[0]
-        side_value = np.array(side[1])
+        side_name, side_value = side
         oriented_vehicles = list()
         
         for v_id in self.vehicles[v_color]["vehicle_info"]:
@@ -415,14 +496,10 @@ class Car():
             nodes_near_triangle = self.pointNearNodes(points_along_width, triangle_position)
             nodes_near_triangle = nodes_near_triangle[:, 1:]
             front_point = nodes_near_triangle[0]
-            dx = side_value[:, 0] - front_point[0]
-            dy = side_value[:, 1] - front_point[1]
-            projected_angles    = np.arctan2(dy, dx)
-            projected_angles    = projected_angles * 180 / np.pi
-            side_results = [-round(angle) if angle < 0 else (-round(angle) + 360) for angle in projected_angles ]
-            # print(side_results)
-            # print("vehicle's angle exist on the projected side", side_name, "= ", round(veh_angle) in side_results)
-            if round(veh_angle) in side_results:
+            orientation = round(veh_angle)
+            side_results = self.sideAngles(front_point, side_value, self.sideCandidates(front_point, side_value, orientation))
+            # print("vehicle's angle exist on the projected side", side_name, "= ", orientation in side_results)
+            if np.any(side_results == orientation):
                 # print("V{} is oriented towards the projected side = {}".format(v_id, side_name))
                 oriented_vehicles.append(v_id)
                 orient_count += 1
@@ -497,26 +574,9 @@ class Car():
         """ Extracting the sequence of movements of vehicles and aligning them from start to crash point and beyond """
         
         h, w = image.shape[:2]
-        range_w = list(range(0, w))
-        range_h = list(range(0, h))
 
         ## The frame of the image is splitted into section and used to create a point of reference to calculate the sequence of movement
-        h_top = [0] * len(range_w)
-        TOP = list(zip(range_w, h_top))
-
-        h_bottom = [h] * len(range_w)
-        BOTTOM = list(zip(range_w, h_bottom))
-
-        w_left = [0] * len(range_h)
-        LEFT = list(zip(w_left, range_h))
-
-        w_right = [w] * len(range_h)
-        RIGHT = list(zip(w_right, range_h))
-
-        enviro_frame = {"TOP": TOP,
-                        "BOTTOM": BOTTOM,
-                        "LEFT": LEFT,
-                        "RIGHT": RIGHT}
+        enviro_frame = self.frameReference(h, w)
 
         t0 = time.time()
         
@@ -576,7 +636,7 @@ class Car():
         # cv2.imshow("Sequence of Movements", image)
         # cv2.waitKey(0)
         # cv2.destroyAllWindows()
-        cv2.imwrite(self.output_folder + "{}_sequence_of_movements.jpg".format(self.process_number), image)
+        self.artifacts.write(self.output_folder + "{}_sequence_of_movements.jpg".format(self.process_number), image)
         self.process_number += 1
         
         time_efficiency["seq_movement"] = t1-t0
@@ -708,8 +768,9 @@ class Car():
         if self.show_image:
             self.pre_process.showImage("vehicle sides", image, time=800)
         
-        cv2.destroyAllWindows()
-        cv2.imwrite(self.output_folder + "{}_twelve_point_model_sides.jpg".format(self.process_number), image)
+        if not self.headless:
+            cv2.destroyAllWindows()
+        self.artifacts.write(self.output_folder + "{}_twelve_point_model_sides.jpg".format(self.process_number), image)
         self.process_number += 1
         
         time_efficiency["oriented_nodes"] = t1-t0
@@ -808,7 +869,7 @@ class Car():
         if self.show_image:
             self.pre_process.showImage("impact point on the vehicles", impact_image, time=800)
 
-        cv2.imwrite(self.output_folder + "{}_crash_point_on_vehicles.jpg".format(self.process_number), impact_image)
+        self.artifacts.write(self.output_folder + "{}_crash_point_on_vehicles.jpg".format(self.process_number), impact_image, final=True)
         self.process_number += 1
         
         time_efficiency["skt_veh_impact"] = t1-t0
@@ -819,12 +880,13 @@ class Car():
         self.pre_process.red_car_boundary = red_boundary
         self.pre_process.blue_car_boundary = blue_boundary
 
-    def extractVehicleInformation(self, image_path, time_efficiency, show_image, output_folder, external, external_impact_points, crash_impact_locations, car_length_sim):
+    def extractVehicleInformation(self, image_path, time_efficiency, show_image, output_folder, external, external_impact_points, crash_impact_locations, car_length_sim, headless=False):
         image = self.pre_process.readImage(image_path=image_path)
         print("Image Dimensions", image.shape[:2])
         self.height, self.width = image.shape[:2]
         self.car_length_sim = car_length_sim
         self.show_image     = show_image        
+        self.headless       = headless
         self.output_folder  = os.path.join(output_folder, "car/")
         if not os.path.exists(self.output_folder):
             os.makedirs(self.output_folder)
@@ -838,65 +900,49 @@ class Car():
         
         """ Get Mask for the Image dimension  """
         mask = self.pre_process.getMask(image=image)
-        self.pre_process.showImage('image original', image, time=800)
-        
-        """ Transform image HSV colorspace and threshold the image"""
-        hsv = self.pre_process.changeColorSpace(image, cv2.COLOR_BGR2HSV)
-        mask_r, mask_b = self.pre_process.getMaskWithRange(image=hsv)
-        result_r = self.pre_process.bitwiseAndOperation(image=image, mask=mask_r)
-        result_b = self.pre_process.bitwiseAndOperation(image=image, mask=mask_b)
-        mask_result_r = np.hstack([cv2.merge([mask_r, mask_r, mask_r]), result_r])
-        mask_result_b = np.hstack([cv2.merge([mask_b, mask_b, mask_b]), result_b])
-        blend_masks_r_b = self.pre_process.bitwiseOrOperation(mask_b, mask_r)
-        blend_masks_res = self.pre_process.bitwiseOrOperation(result_b, result_r)
-        
-        """ Blurring the masks of the red and blue cars """
-        mask_r_blur = self.pre_process.blurImage(mask_r, (5, 5), 0)  # (5, 5)
-        mask_b_blur = self.pre_process.blurImage(mask_b, (3, 3), 0)  # (3, 3)
-
-        """ Morphological Operations """
-        opening_r = self.pre_process.applyMorphologicalOperation(
-            image=mask_r_blur, kernel_window=(5, 5), morph_operation=cv2.MORPH_OPEN)
-        opening_b = self.pre_process.applyMorphologicalOperation(
-            image=mask_b_blur, kernel_window=(5, 5), morph_operation=cv2.MORPH_OPEN)
+        if not self.headless:
+            self.pre_process.showImage('image original', image, time=800)
+        
+        """ Transform image HSV colorspace, threshold, blur and open the masks of all the vehicle colors """
+        with self.tracer.span("segmentation"):
+            masks, segments = self.pre_process.segmentVehicles(image, kernel_window=(5, 5), morph_operation=cv2.MORPH_OPEN)
 
         time_efficiency["preprocess"] = 0.0
         
         """ Print or show images on screen"""
-        # self.pre_process.showImage('mask and result for red car', mask_result_r)
-        # self.pre_process.showImage('mask and result for blue car', mask_result_b)
-        # self.pre_process.showImage("masks blue and red car", blend_masks_r_b)
-        # self.pre_process.showImage('result blue and red car', blend_masks_res)
-        # self.pre_process.showImage("Opening Operation on Red and Blue Cars", np.hstack([opening_b, opening_r]))
-
-        """ Plot Images"""
-        # self.pre_process.plotFigure(image=mask_result_r, cmap="brg", title="Red Car")
-        # self.pre_process.plotFigure(image=mask_result_b, cmap="brg", title="Blue Car")
-        # self.pre_process.plotFigure(image=blend_masks_r_b, cmap="brg", title="masks blue and red car")
-        # self.pre_process.plotFigure(image=blend_masks_res, cmap="brg", title="result blue and red car")
-        # self.pre_process.plotFigure(image=np.hstack([opening_b, opening_r]), cmap="brg", title="Opening Operation on Red and Blue Cars")
-        
+        # self.pre_process.showImage("Opening Operation on Red and Blue Cars", np.hstack(list(segments.values())[::-1]))
+
         """ Saving the figure"""
-        cv2.imwrite(self.output_folder + "{}_mask_result_r.jpg".format(self.process_number), mask_result_r)
-        cv2.imwrite(self.output_folder + "{}_mask_result_b.jpg".format(self.process_number), mask_result_b)
-        self.process_number += 1
-        cv2.imwrite(self.output_folder + "{}_blend_masks_r_b.jpg".format(self.process_number), blend_masks_r_b)
-        cv2.imwrite(self.output_folder + "{}_blend_masks_res.jpg".format(self.process_number), blend_masks_res)
-        self.process_number += 1
-        cv2.imwrite(self.output_folder + "{}_opening_morph.jpg".format(self.process_number), np.hstack([opening_b, opening_r]))
-        self.process_number += 1
-        
-        
-        self.vehicles["red"]["mask"] = opening_r
-        self.vehicles["blue"]["mask"] = opening_b
-        
-        self.extractVehicleContoursFromMask()
-        self.geometricOperationOnVehicle(image.copy(), time_efficiency)
-        crash_point = self.extractingCrashPoint(image.copy(), time_efficiency)
-        self.extractTriangle(image.copy(), time_efficiency)
-        self.extractingAnglesForVehicles(image.copy(), time_efficiency)
-        self.generateSequenceOfMovements(image.copy(), time_efficiency)
-        self.extractCrashImpactNodes(image.copy(), time_efficiency)
-        self.extractCrashPointOnVehicle(image.copy(), time_efficiency, external, external_impact_points, crash_impact_locations)
+        if self.artifacts.enabled():
+            results = {color: self.pre_process.bitwiseAndOperation(image=image, mask=masks[color]) for color in masks}
+            for color in masks:
+                mask_result = np.hstack([cv2.merge([masks[color]] * 3), results[color]])
+                self.artifacts.write(self.output_folder + "{}_mask_result_{}.jpg".format(self.process_number, color[0]), mask_result)
+            blend_masks = np.bitwise_or.reduce(list(masks.values()))
+            blend_results = np.bitwise_or.reduce(list(results.values()))
+            self.artifacts.write(self.output_folder + "{}_blend_masks_r_b.jpg".format(self.process_number + 1), blend_masks)
+            self.artifacts.write(self.output_folder + "{}_blend_masks_res.jpg".format(self.process_number + 1), blend_results)
+            self.artifacts.write(self.output_folder + "{}_opening_morph.jpg".format(self.process_number + 2), np.hstack(list(segments.values())[::-1]))
+        self.process_number += 3
+        
+        for vehicle_color in segments:
+            self.vehicles[vehicle_color]["mask"] = segments[vehicle_color]
+        
+        with self.tracer.span("contours"):
+            self.extractVehicleContoursFromMask()
+        with self.tracer.span("geometry"):
+            self.geometricOperationOnVehicle(image.copy(), time_efficiency)
+        with self.tracer.span("crash_point"):
+            crash_point = self.extractingCrashPoint(image.copy(), time_efficiency)
+        with self.tracer.span("triangles"):
+            self.extractTriangle(image.copy(), time_efficiency)
+        with self.tracer.span("angles"):
+            self.extractingAnglesForVehicles(image.copy(), time_efficiency)
+        with self.tracer.span("sequence_of_movements"):
+            self.generateSequenceOfMovements(image.copy(), time_efficiency)
+        with self.tracer.span("impact_nodes"):
+            self.extractCrashImpactNodes(image.copy(), time_efficiency)
+        with self.tracer.span("impact_point"):
+            self.extractCrashPointOnVehicle(image.copy(), time_efficiency, external, external_impact_points, crash_impact_locations)
         
         return self.vehicles, time_efficiency
@@ -3,14 +3,11 @@ from .car import Car
 from modules.constant import CONST
 import os
 import numpy as np
-import pandas as pd
-from scipy.interpolate import splev, splprep
 from numpy import repeat, array, sqrt, inf, cross, dot
 from numpy.ma import arange
 from shapely.geometry import LineString, Point
 from shapely.affinity import translate, rotate
 from math import degrees, atan2, copysign
-from descartes import PolygonPatch
 
 # Constants
 rounding_precision = 3
@@ -47,6 +44,7 @@ def interpolate(road_nodes, sampling_unit=interpolation_distance):
     """
         Interpolate the road points using cubic splines and ensure we handle 4F tuples for compatibility
     """
+    from scipy.interpolate import splev, splprep
     old_x_vals = [t[0] for t in road_nodes]
     old_y_vals = [t[1] for t in road_nodes]
 
@@ -168,6 +166,7 @@ def interpolate(road_nodes, sampling_unit=interpolation_distance):
     """
         Interpolate the road points using cubic splines and ensure we handle 4F tuples for compatibility
     """
+    from scipy.interpolate import splev, splprep
     old_x_vals = [t[0] for t in road_nodes]
     old_y_vals = [t[1] for t in road_nodes]
 
@@ -244,6 +243,7 @@ def _generate_lane_marking(road_nodes, side, distance=3.9):
 
 
 def extract_data_from_scenario(dir_path, dataset_name=None, output_to=None):
+    import pandas as pd
     file = f'{dir_path}/sketch.jpeg'
     road = f'{dir_path}/road.jpeg'
 
@@ -297,6 +297,7 @@ def extract_data_from_scenario(dir_path, dataset_name=None, output_to=None):
 
 
 def visualize_crisce_sketch(ax, width, points):
+    from descartes import PolygonPatch
     road_width = width
     road_poly = LineString([(t[0], t[1]) for t in points]).buffer(road_width / 2, cap_style=2, join_style=2)
     road_patch = PolygonPatch(road_poly, fc='gray', ec='dimgray')
@@ -309,6 +310,7 @@ def visualize_crisce_sketch(ax, width, points):
 
 
 def visualize_crisce_simlanes(ax, widths, points_list):
+    from descartes import PolygonPatch
     for i, item in enumerate(widths):
         road_width = widths[i]
         try:
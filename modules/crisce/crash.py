@@ -2,6 +2,7 @@ from pre_processing import Pre_Processing
 from roads import Roads
 from car import Car
 from kinematics import Kinematics
+from trajectory import script_dicts
 import copy
 import itertools
 import seaborn as sns
@@ -500,11 +501,11 @@ class Simulation():
         t0 = time.time()
         if(len(self.vehicles["red"]["snapshots"]) > 1):
             vehicle_red.ai_set_mode('manual')
-            vehicle_red.ai_set_script(vehicles["red"]["trajectories"]["script_trajectory"], cling=False)
+            vehicle_red.ai_set_script(script_dicts(vehicles["red"]["trajectories"]["script_trajectory"]), cling=False)
 
         if(len(self.vehicles["blue"]["snapshots"]) > 1):
             vehicle_blue.ai_set_mode('manual')
-            vehicle_blue.ai_set_script(vehicles["blue"]["trajectories"]["script_trajectory"], cling=False)
+            vehicle_blue.ai_set_script(script_dicts(vehicles["blue"]["trajectories"]["script_trajectory"]), cling=False)
 
         self.bng.set_steps_per_second(120) # 80, 100, 120, 150 
         self.bng.pause()
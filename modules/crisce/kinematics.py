@@ -1,33 +1,27 @@
 from .pre_processing import Pre_Processing
+from .artifacts import ArtifactWriter
+from ..trace import Tracer
 from .roads import Roads
 from .car import Car
 from shapely.geometry import MultiLineString, Polygon
 import copy
 import itertools
-import seaborn as sns
-import pandas as pd
 import time
 import glob
 import os
 import math
-import matplotlib.pyplot as plt
-import matplotlib.image as mpimg
-import imutils
 import numpy as np
 import cv2
 
-from .PythonRobotics.PathPlanning.BezierPath.bezier_path import calc_4points_bezier_path, calc_bezier_path, \
-    bernstein_poly, bezier, bezier_derivatives_control_points, curvature, plot_arrow
-from .PythonRobotics.PathPlanning.CubicSpline.cubic_spline_planner import Spline2D
-from .PythonRobotics.PathPlanning.BSplinePath.bspline_path import approximate_b_spline_path, interpolate_b_spline_path
-import scipy.interpolate as scipy_interpolate
+from . import bezier
+from .trajectory import Trajectory
 
 show_animation = True
 
 
 class Kinematics():
 
-    def __init__(self):
+    def __init__(self, artifacts=None, reporter=None, tracer=None):
         self.time_efficiency = None
         self.pre_process = Pre_Processing()
         self.vehicles = None
@@ -36,6 +30,9 @@ class Kinematics():
         self.show_image = None
         self.output_folder = None
         self.process_number = None
+        self.artifacts = artifacts if artifacts is not None else ArtifactWriter(asynchronous=False)
+        self.reporter = reporter
+        self.tracer = tracer if tracer is not None else Tracer(enabled=False)
 
     def selectionVehicleSnapshots(self):
         t0 = time.time()
@@ -241,7 +238,7 @@ class Kinematics():
 
             """ Access the distorted ordered waypoints in numpy array type"""
             # self.vehicles[vehicle_color]["distorted_ordered_waypoints"] = result
-            cv2.imwrite(self.output_folder + "{}_distorted_control_points.jpg".format(self.process_number), image)
+            self.artifacts.write(self.output_folder + "{}_distorted_control_points.jpg".format(self.process_number), image)
             self.process_number += 1
 
         t1 = time.time()
@@ -256,56 +253,18 @@ class Kinematics():
         """ Bezier Curve Trajectory Spline 2D Trajectory"""
         control_points = np.array(self.vehicles[vehicle_color]["ordered_waypoints"])
         snapshots = self.vehicles[vehicle_color]["snapshots"]
-        plt.figure(figsize=(17, 7))
+        file_path = self.output_folder + '{}_{}_vehicle_bezier_curve.jpg'.format(self.process_number, vehicle_color)
 
         if (len(snapshots) > 1):
-            path = calc_bezier_path(control_points, n_points)
-
-            # Display the tangent, normal and radius of cruvature at a given point
-            t = 0.86  # Number in [0, 1]
-            x_target, y_target = bezier(t, control_points)
-            derivatives_cp = bezier_derivatives_control_points(control_points, 2)
-            point = bezier(t, control_points)
-            dt = bezier(t, derivatives_cp[1])
-            ddt = bezier(t, derivatives_cp[2])
-            # Radius of curvature
-            radius = 1 / curvature(dt[0], dt[1], ddt[0], ddt[1])
-            # Normalize derivative
-            dt /= np.linalg.norm(dt, 2)
-            dt = dt * 8
-            tangent = np.array([point, point + dt])
-            normal = np.array([point, point + [- dt[1], dt[0]]])
-            curvature_center = point + np.array([- dt[1], dt[0]]) * radius
-            circle = plt.Circle(tuple(curvature_center),
-                                radius,
-                                color=(0, 0.8, 0.8), fill=False, linewidth=1)
-
-            # if show_animation:
-            #     plt.plot(path.T[0], path.T[1], label="Bezier Path")
-            #     plt.plot(control_points.T[0], control_points.T[1],'--o', label="Control Points")
-            #     plt.plot(x_target, y_target)
-            #     plt.plot(tangent[:, 0], tangent[:, 1], label="Tangent")
-            #     plt.plot(normal[:, 0], normal[:, 1], label="Normal")
-            #     # ax.add_artist(circle)
-            #     #     plot_arrow(float(control_points[0][0]), float(control_points[0][1]), start_yaw)
-            #     #     plot_arrow(float(control_points[-1][0]), float(control_points[-1][1]), end_yaw)
+            path = bezier.bezier_path(control_points, n_points)
+            if self.reporter is not None:
+                # Display the tangent, normal and radius of cruvature at a given point
+                self.reporter.plotBezierPath(file_path, control_points, path, t=0.86)
         else:
-            # plt.plot(control_points[-1][0], control_points[-1][1], label="Stationary Point")
             control_points = self.vehicles[vehicle_color]["snapshots"][0]["center_of_car"]
-            plt.plot(control_points[0], control_points[1], '--o', label="Stationary Point")
-            # print(control_points.T)
-
             path = np.array([control_points[0], control_points[1]]).reshape(1, -1)
-
-        # plt.legend()
-        # plt.axis("equal")
-        # plt.grid(True)
-        # plt.gca().invert_yaxis()
-        # # fig1 = plt.gcf()
-        # plt.savefig(self.output_folder + '{}_{}_vehicle_bezier_curve.jpg'.format(self.process_number, vehicle_color), dpi=150)
-        # self.process_number += 1
-        # # plt.show()
-        # plt.close()
+            if self.reporter is not None:
+                self.reporter.plotStationaryPoint(file_path, control_points)
 
         return path
 
@@ -313,40 +272,21 @@ class Kinematics():
         """ Calculating the B-Spline Trajectory """
         waypoints = np.array(self.vehicles[vehicle_color]["ordered_waypoints"])
         snapshots = self.vehicles[vehicle_color]["snapshots"]
-        plt.figure(figsize=(17, 8))
+        file_path = self.output_folder + '{}_{}_vehicle_bezier_spline.jpg'.format(self.process_number, vehicle_color)
 
         if (len(snapshots) > 1):
-            # way_point_x = [-1.0, 3.0, 4.0, 2.0, 1.0]
-            # way_point_y = [0.0, -3.0, 1.0, 1.0, 3.0]
+            from .PythonRobotics.PathPlanning.BSplinePath.bspline_path import approximate_b_spline_path
             x = waypoints[:, 0].tolist()
             y = waypoints[:, 1].tolist()
-            # n_course_point = 200  # sampling number
             rax, ray = approximate_b_spline_path(x, y, n_course_point)
-            rix, riy = interpolate_b_spline_path(x, y, n_course_point)
-
-            # # show results
-            # # fig = plt.figure(figsize=(20,10))
-            # # ax1, ax2 = fig.subplots(nrows=1, ncols=2, sharex=True, sharey=True)
-
-            # plt.plot(x, y, '-og', label="way points")
-            # plt.plot(rax, ray, '-r', label="Approximated B-Spline path")
-            # # plt.plot(rix, riy, '-b', label="Interpolated B-Spline path")
-            # # path = (list(zip(rax, ray)), list(zip(rix, riy)))
-            path = list(zip(rax, ray))
+            path = np.column_stack([rax, ray])
+            if self.reporter is not None:
+                self.reporter.plotBSpline(file_path, waypoints, path)
         else:
             waypoints = self.vehicles[vehicle_color]["snapshots"][0]["center_of_car"]
-            # plt.plot(waypoints[0], waypoints[1], '-og', label="Stationary Point")
             path = np.array([waypoints[0], waypoints[1]]).reshape(1, -1)
-
-        # plt.grid(True)
-        # plt.legend()
-        # plt.gca().invert_yaxis()
-        # plt.axis("equal")
-        # # plt.savefig('{}_vehicle_bezier_spline.jpg'.format(vehicle_color), dpi=150)
-        # plt.savefig(self.output_folder + '{}_{}_vehicle_bezier_spline.jpg'.format(self.process_number, vehicle_color), dpi=150)
-        # self.process_number += 1
-
-        # plt.close()
+            if self.reporter is not None:
+                self.reporter.plotStationaryPoint(file_path, waypoints)
 
         return path
 
@@ -356,8 +296,10 @@ class Kinematics():
 
         waypoints = np.array(self.vehicles[vehicle_color]["ordered_waypoints"])
         snapshots = self.vehicles[vehicle_color]["snapshots"]
+        file_path = self.output_folder + '{}_{}_vehicle_cubic_spline.jpg'.format(self.process_number, vehicle_color)
 
         if (len(snapshots) > 1):
+            from .PythonRobotics.PathPlanning.CubicSpline.cubic_spline_planner import Spline2D
 
             x = waypoints[:, 0].tolist()  # [::-1]
             y = waypoints[:, 1].tolist()  # [::-1]
@@ -373,62 +315,17 @@ class Kinematics():
                 ryaw.append(sp.calc_yaw(i_s))
                 rk.append(sp.calc_curvature(i_s))
 
-            # plt.subplots(1)
-            plt.figure(figsize=(17, 7))
-            plt.plot(x, y, "xb", label="input")
-            plt.plot(rx, ry, "-r", label="spline")
-            plt.grid(True)
-            plt.axis("equal")
-            plt.xlabel("x[m]")
-            plt.ylabel("y[m]")
-            plt.legend()
-            plt.gca().invert_yaxis()
-            # fig1 = plt.gcf()
-            # fig1.savefig('cubic_spline.jpg', dpi=150)
-            # plt.savefig(self.output_folder + '{}_{}_vehicle_cubic_spline_traj.jpg'.format(self.process_number, vehicle_color), dpi=150)
-            plt.close()
-
-            # plt.subplots(1)
-            plt.figure(figsize=(17, 7))
-            plt.plot(s, [np.rad2deg(iyaw) for iyaw in ryaw], "-r", label="yaw")
-            plt.grid(True)
-            plt.legend()
-            plt.xlabel("line length[m]")
-            plt.ylabel("yaw angle[deg]")
-            # plt.savefig(self.output_folder + '{}_{}_vehicle_cubic_spline_yaw.jpg'.format(self.process_number, vehicle_color), dpi=150)
-            plt.close()
-
-            # plt.subplots(1)
-            plt.figure(figsize=(17, 7))
-            plt.plot(s, rk, "-r", label="curvature")
-            plt.grid(True)
-            plt.legend()
-            plt.xlabel("line length[m]")
-            plt.ylabel("curvature [1/m]")
-            plt.close()
-
-            path = (rx, ry, ryaw, rk)
-            path = list(zip(rx, ry))
+            path = np.column_stack([rx, ry])
+            if self.reporter is not None:
+                self.reporter.plotCubicSpline(file_path, waypoints, path, s, ryaw, rk)
 
         else:
-            plt.figure(figsize=(17, 7))
-            # path = [[waypoints.T[0][1], waypoints.T[1][1]]]
-            # plt.plot(waypoints.T[0][1], waypoints.T[1][1], '-or', label="Stationary Point")
             waypoints = self.vehicles[vehicle_color]["snapshots"][0]["center_of_car"]
-            plt.plot(waypoints[0], waypoints[1], '-or', label="Stationary Point")
             path = np.array([waypoints[0], waypoints[1]]).reshape(1, -1)
-
-            # plt.grid(True)
-            # plt.legend()
-            # plt.savefig(self.output_folder + '{}_{}_vehicle_cubic_spline.jpg'.format(self.process_number, vehicle_color), dpi=150)
-            # # print(path)
-            # # fig1 = plt.gcf()
-            # # fig1.savefig('cubic_spline_stationary.jpg' , dpi=150)
-            plt.close()
+            if self.reporter is not None:
+                self.reporter.plotStationaryPoint(file_path, waypoints)
 
         self.process_number += 1
-        # _ = plt.set_axis_off()
-        # plt.show()
 
         return path
 
@@ -508,7 +405,7 @@ class Kinematics():
                 pty = int(round(pt[1]))
                 cv2.circle(image, (ptx, pty), 3, (0, 255, 0), -1)
             # self.pre_process.showImage("trajectory of vehicle", image)
-            cv2.imwrite(self.output_folder + '{}_original_trajectory.jpg'.format(self.process_number), image)
+            self.artifacts.write(self.output_folder + '{}_original_trajectory.jpg'.format(self.process_number), image)
 
             distortionMapping = lambda x, r: x * r
             aspect_ratio = self.vehicles[vehicle_color]["dimensions"]["car_length_sim"] / \
@@ -524,7 +421,7 @@ class Kinematics():
             # self.pre_process.showImage("distorted and mapped trajectory of vehicle", image)
             self.vehicles[vehicle_color]["trajectories"]["distorted_trajectory"] = result
             # # print("\n Wapoints in the points in the distort trajectory", vehicle_color, " = ",   len(result))
-            cv2.imwrite(self.output_folder + '{}_distorted_trajectory.jpg'.format(self.process_number), image)
+            self.artifacts.write(self.output_folder + '{}_distorted_trajectory.jpg'.format(self.process_number), image, final=True)
             self.process_number += 1
 
         if self.show_image:
@@ -552,12 +449,9 @@ class Kinematics():
             trajectory = self.vehicles[vehicle_color]["trajectories"]["simulation_trajectory"]
             snapshots = self.vehicles[vehicle_color]["snapshots"]
             if (len(snapshots) > 1):
-                npts = len(trajectory)  # or  trajectory.shape[0]
-                x = trajectory[:, 0]
-                y = trajectory[:, 1]
-                arc = np.sqrt((x[1] - x[0]) ** 2 + (y[1] - y[0]) ** 2)
-                for k in range(1, npts):
-                    arc = arc + np.sqrt((x[k] - x[k - 1]) ** 2 + (y[k] - y[k - 1]) ** 2)
+                trajectory = Trajectory(trajectory)
+                ### The first segment is counted twice, the time stamps and the delays are calibrated on this length
+                arc = trajectory.segments[0] + trajectory.length
             else:
                 ### For stationary point
                 arc = 1
@@ -631,7 +525,6 @@ class Kinematics():
 
         start_time = 0  # 0.4
         for vehicle_color in self.vehicles:
-            script = []
             ref_color = ["red", "blue"]
             ref_color.remove(vehicle_color)
             ref_color = ref_color[0]
@@ -641,7 +534,7 @@ class Kinematics():
             ref_arc_len = self.vehicles[ref_color]["kinematics"]["arc_length"]
             prim_veh_total_time = self.vehicles[vehicle_color]["kinematics"]["veh_traj_total_time"]
             ref_veh_total_time = self.vehicles[ref_color]["kinematics"]["veh_traj_total_time"]
-            time_stamp = self.vehicles[vehicle_color]["kinematics"]["time_stamp"]
+            time_step = self.vehicles[vehicle_color]["kinematics"]["time_stamp"]
 
             # delay       = max(prim_veh_total_time, ref_veh_total_time) - min(prim_veh_total_time, ref_veh_total_time)
             delay = abs(min(prim_veh_total_time, ref_veh_total_time) - max(prim_veh_total_time, ref_veh_total_time))
@@ -684,27 +577,16 @@ class Kinematics():
             # # print("delay between last waypoint and crash point  =", delay_last_point)
             # # print("prim_arc_len > ref_arc_len = ", prim_arc_len > ref_arc_len)
 
-            delay_by_color = 0
-            for i, traj_point in enumerate(distorted_trajectory):
-                if prim_arc_len > ref_arc_len:
-                    node = {
-                        'x': traj_point[0],
-                        'y': traj_point[1],
-                        'z': 0,
-                        "t": i * time_stamp + start_time,
-                    }
-                else:
-                    node = {
-                        'x': traj_point[0],
-                        'y': traj_point[1],
-                        'z': 0,
-                        "t": i * (time_stamp) + start_time + delay  # + diff_arc_len_time, #+ delay_last_point,
-                    }
-                    delay_by_color = delay
-
-                script.append(node)
+            trajectory = Trajectory(distorted_trajectory)
+            if prim_arc_len > ref_arc_len:
+                timestamps = trajectory.steps(time_step, start_time)
+                delay_by_color = 0
+            else:
+                timestamps = trajectory.steps(time_step, start_time + delay)
+                delay_by_color = delay
 
-            self.vehicles[vehicle_color]["trajectories"]["script_trajectory"] = script
+            ### A structured array of SCRIPT_DTYPE, see Vehicle.script for the nodes of the BeamNG AI script
+            self.vehicles[vehicle_color]["trajectories"]["script_trajectory"] = trajectory.script(timestamps)
             self.vehicles[vehicle_color]["trajectories"]["delay"] = delay_by_color
             # # print("Vehicle first control point = ", script[0])
 
@@ -749,16 +631,18 @@ class Kinematics():
 
         self.process_number = 0
 
-        self.selectionVehicleSnapshots()
-        self.selectNumberOfWaypoints()
-        self.vehicleDistortedControlPoints(image.copy())
+        with self.tracer.span("snapshots"):
+            self.selectionVehicleSnapshots()
+            self.selectNumberOfWaypoints()
+            self.vehicleDistortedControlPoints(image.copy())
 
         #### -------- Bezier Curve Trajectories ------------ #######
         t0 = time.time()
-        self.vehicles["red"]["trajectories"]["computed"]["bezier_curve"] = self.calBezierPath(vehicle_color="red",
-                                                                                              n_points=90)  # 120, 81
-        self.vehicles["blue"]["trajectories"]["computed"]["bezier_curve"] = self.calBezierPath(vehicle_color="blue",
-                                                                                               n_points=90)  # 120
+        with self.tracer.span("bezier"):
+            self.vehicles["red"]["trajectories"]["computed"]["bezier_curve"] = self.calBezierPath(vehicle_color="red",
+                                                                                                  n_points=90)  # 120, 81
+            self.vehicles["blue"]["trajectories"]["computed"]["bezier_curve"] = self.calBezierPath(vehicle_color="blue",
+                                                                                                   n_points=90)  # 120
         t1 = time.time()
         self.time_efficiency["compute_bezier"] = t1 - t0
         # # print("compute_bezier time = ", t1-t0)
@@ -799,13 +683,15 @@ class Kinematics():
         # # print(" shape of the red vehicle trajectory is =  ",  self.vehicles["red"]["trajectories"]["original_trajectory"].shape)
         # # print(" shape of the blue vehicle trajectory is =  ", self.vehicles["blue"]["trajectories"]["original_trajectory"].shape)
 
-        self.trajectoryDistortionMapping(image.copy())
+        with self.tracer.span("distortion_mapping"):
+            self.trajectoryDistortionMapping(image.copy())
 
-        self.adjustTrajectoryToSimulation()
-        self.calculateTrajectoryArcLength()
-        self.calTimeStampsForTrajectory()
-        self.convertingToScriptFormat()
-        self.computeDebugTrajectories()
+        with self.tracer.span("simulation_trajectory"):
+            self.adjustTrajectoryToSimulation()
+            self.calculateTrajectoryArcLength()
+            self.calTimeStampsForTrajectory()
+            self.convertingToScriptFormat()
+            self.computeDebugTrajectories()
 
         return self.vehicles, self.time_efficiency
 
@@ -1,7 +1,4 @@
-import matplotlib.pyplot as plt
-import matplotlib.image as mpimg
 import numpy as np
-import imutils
 import cv2
 
 
@@ -12,11 +9,35 @@ RED_CAR_BOUNDARY = np.array([[0, 190, 210],
 BLUE_CAR_BOUNDARY = np.array([[85, 30, 40],
                             [160, 255, 255]])
 
+### HSV boundary and blur kernel of the mask of every vehicle color
+VEHICLE_COLORS = {"red": {"boundary": RED_CAR_BOUNDARY, "blur": (5, 5)},
+                  "blue": {"boundary": BLUE_CAR_BOUNDARY, "blur": (3, 3)}}
+
 class Pre_Processing():
     
-    def __init__(self, red_car_boundary=RED_CAR_BOUNDARY, blue_car_boundary=BLUE_CAR_BOUNDARY):
-        self.red_car_boundary = red_car_boundary
-        self.blue_car_boundary = blue_car_boundary
+    def __init__(self, red_car_boundary=None, blue_car_boundary=None, vehicle_colors=None):
+        vehicle_colors = VEHICLE_COLORS if vehicle_colors is None else vehicle_colors
+        self.vehicle_colors = {color: dict(setting) for color, setting in vehicle_colors.items()}
+        if red_car_boundary is not None:
+            self.red_car_boundary = red_car_boundary
+        if blue_car_boundary is not None:
+            self.blue_car_boundary = blue_car_boundary
+
+    @property
+    def red_car_boundary(self):
+        return self.vehicle_colors["red"]["boundary"]
+
+    @red_car_boundary.setter
+    def red_car_boundary(self, boundary):
+        self.vehicle_colors.setdefault("red", dict(VEHICLE_COLORS["red"]))["boundary"] = boundary
+
+    @property
+    def blue_car_boundary(self):
+        return self.vehicle_colors["blue"]["boundary"]
+
+    @blue_car_boundary.setter
+    def blue_car_boundary(self, boundary):
+        self.vehicle_colors.setdefault("blue", dict(VEHICLE_COLORS["blue"]))["boundary"] = boundary
 
 
     def readImage(self, image_path):
@@ -36,6 +57,7 @@ class Pre_Processing():
         return image
 
     def resize(self, image):
+        import imutils
         if image.shape[0] >= 1000:
             image = imutils.resize(image=image, height=960)
         elif image.shape[1] >= 500:
@@ -58,6 +80,31 @@ class Pre_Processing():
             image, self.blue_car_boundary[0], self.blue_car_boundary[1])
         return (mask_red, mask_blue)
 
+    def getColorMasks(self, image):
+        """
+        Input: hsv(or hsl) image
+        Output: dict of the mask of every vehicle color, the ranges may overlap
+        """
+        return {color: cv2.inRange(image, setting["boundary"][0], setting["boundary"][1])
+                for color, setting in self.vehicle_colors.items()}
+
+    def segmentVehicles(self, image, kernel_window=(5, 5), morph_operation=cv2.MORPH_OPEN):
+        """
+        Color segmentation of all the vehicles in one stage: a single HSV conversion, then the range mask of
+        every vehicle color, blurred with the kernel of its color and cleaned with one shared morphological kernel
+
+        Input: BGR image, kernel_window, morph_operation
+        Output: tuple of dicts by vehicle color, the range masks and the segmented masks
+        """
+        hsv = self.changeColorSpace(image, cv2.COLOR_BGR2HSV)
+        masks = self.getColorMasks(hsv)
+        kernel = np.ones(kernel_window, np.uint8)
+        segments = dict()
+        for color, setting in self.vehicle_colors.items():
+            blur = self.blurImage(masks[color], setting["blur"], 0)
+            segments[color] = cv2.morphologyEx(blur, morph_operation, kernel)
+        return masks, segments
+
     def bitwiseAndOperation(self, image, mask):
         result = cv2.bitwise_and(image, image, mask=mask)
         return result
@@ -116,6 +163,7 @@ class Pre_Processing():
         """ Plotting the image 
         Input: image, cmap, title, figsize
         """
+        import matplotlib.pyplot as plt
         fig = plt.figure(figsize=figsize)
         ax1 = fig.subplots(1, sharey=True, sharex=True)
         # plt.imshow(gray, cmap='gray')
@@ -132,6 +180,7 @@ class Pre_Processing():
         cv2.destroyAllWindows()
         
     def saveFigure(self, image_name, dpi=300):
+        import matplotlib.pyplot as plt
         plt.savefig(image_name + '.jpg', dpi=dpi)
         
 
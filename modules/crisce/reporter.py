@@ -0,0 +1,83 @@
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.patches import Circle
+from . import bezier
+
+
+class TrajectoryReporter():
+    """
+    Opt-in plots of the trajectories computed by Kinematics. Every plot is drawn on its own Figure, which is not
+    registered with pyplot, saved and released, so no figure outlives the call.
+    """
+
+    def __init__(self, figsize=(17, 7), dpi=150):
+        self.figsize = figsize
+        self.dpi = dpi
+
+    def save(self, fig, ax, file_path, invert_yaxis=True):
+        ax.grid(True)
+        if ax.get_legend_handles_labels()[0]:
+            ax.legend()
+        if invert_yaxis:
+            ax.invert_yaxis()
+        fig.savefig(file_path, dpi=self.dpi)
+        fig.clear()
+
+    def plotStationaryPoint(self, file_path, point):
+        fig = Figure(figsize=self.figsize)
+        ax = fig.add_subplot()
+        ax.plot(point[0], point[1], '--o', label="Stationary Point")
+        self.save(fig, ax, file_path)
+
+    def plotBezierPath(self, file_path, control_points, path, t=0.86):
+        """ Bezier curve with its control points, and its tangent, normal and osculating circle at t """
+        fig = Figure(figsize=self.figsize)
+        ax = fig.add_subplot()
+        ax.plot(path[:, 0], path[:, 1], label="Bezier Path")
+        ax.plot(control_points[:, 0], control_points[:, 1], '--o', label="Control Points")
+
+        point, dt, ddt = [v[0] for v in bezier.evaluate(control_points, n_derivatives=2, t=[t])]
+        radius = 1 / bezier.curvature_from_derivatives(dt, ddt)[0]
+        dt = dt / np.linalg.norm(dt, 2) * 8
+        normal = np.array([-dt[1], dt[0]])
+        tangent = np.array([point, point + dt])
+        normals = np.array([point, point + normal])
+        ax.plot(tangent[:, 0], tangent[:, 1], label="Tangent")
+        ax.plot(normals[:, 0], normals[:, 1], label="Normal")
+        if np.isfinite(radius):
+            ax.add_patch(Circle(tuple(point + normal * radius), radius, color=(0, 0.8, 0.8), fill=False,
+                                linewidth=1))
+        ax.axis("equal")
+        self.save(fig, ax, file_path)
+
+    def plotBSpline(self, file_path, waypoints, path):
+        fig = Figure(figsize=self.figsize)
+        ax = fig.add_subplot()
+        ax.plot(waypoints[:, 0], waypoints[:, 1], '-og', label="way points")
+        ax.plot(path[:, 0], path[:, 1], '-r', label="Approximated B-Spline path")
+        ax.axis("equal")
+        self.save(fig, ax, file_path)
+
+    def plotCubicSpline(self, file_path, waypoints, path, s, yaw, curvature):
+        """ Cubic spline path, and its yaw angle and curvature along the line length """
+        fig = Figure(figsize=(self.figsize[0], self.figsize[1] * 3))
+        ax_path, ax_yaw, ax_curvature = fig.subplots(3, 1)
+        ax_path.plot(waypoints[:, 0], waypoints[:, 1], "xb", label="input")
+        ax_path.plot(path[:, 0], path[:, 1], "-r", label="spline")
+        ax_path.axis("equal")
+        ax_path.set_xlabel("x[m]")
+        ax_path.set_ylabel("y[m]")
+        ax_path.invert_yaxis()
+        ax_path.grid(True)
+        ax_path.legend()
+
+        ax_yaw.plot(s, np.rad2deg(yaw), "-r", label="yaw")
+        ax_yaw.set_xlabel("line length[m]")
+        ax_yaw.set_ylabel("yaw angle[deg]")
+        ax_yaw.grid(True)
+        ax_yaw.legend()
+
+        ax_curvature.plot(s, curvature, "-r", label="curvature")
+        ax_curvature.set_xlabel("line length[m]")
+        ax_curvature.set_ylabel("curvature [1/m]")
+        self.save(fig, ax_curvature, file_path, invert_yaxis=False)
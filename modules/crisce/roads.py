@@ -1,17 +1,16 @@
 import copy
 import itertools
-import seaborn as sns
 import glob
 import os
 import math
-import matplotlib.pyplot as plt
-import matplotlib.image as mpimg
-import imutils
 import numpy as np
 import time
 from .pre_processing import Pre_Processing
+from .artifacts import ArtifactWriter
+from ..trace import Tracer
 # from .roadway import categorize_roadway
 import cv2
+from scipy.spatial import cKDTree
 
 
 ROAD_CURVE_OR_STRAIGHT = 0
@@ -19,7 +18,7 @@ ROAD_INTERSECTION = 1
 
 class Roads():
     
-    def __init__(self):
+    def __init__(self, artifacts=None, tracer=None):
         self.road_parm      = True
         self.pre_process    = Pre_Processing()
         self.height         = None
@@ -27,6 +26,8 @@ class Roads():
         self.show_image     = None
         self.output_folder  = None
         self.process_number = None
+        self.artifacts      = artifacts if artifacts is not None else ArtifactWriter(asynchronous=False)
+        self.tracer         = tracer if tracer is not None else Tracer(enabled=False)
         self.roads          = dict()
         self.road_type      = -1
         
@@ -54,7 +55,7 @@ class Roads():
         if self.show_image:
             self.pre_process.showImage("Contours Visualization", image, time=500)
         
-        cv2.imwrite(self.output_folder + "{}_Contour_Viz_image.jpg".format(self.process_number), image)
+        self.artifacts.write(self.output_folder + "{}_Contour_Viz_image.jpg".format(self.process_number), image)
         self.process_number += 1
             
         # print(" large contours = {},   small contours = {} ".format(len(large_contours), len(small_contours)))
@@ -122,12 +123,29 @@ class Roads():
         for point in adjusted_midpoints_of_lane:
             cv2.circle(image, tuple([int(point[0]), int(point[1])]), 3, (0, 255, 0), -1)
         
-        cv2.imwrite(self.output_folder + "{}_midpoints_of_lane.jpg".format(self.process_number), image)
+        self.artifacts.write(self.output_folder + "{}_midpoints_of_lane.jpg".format(self.process_number), image)
         self.process_number += 1
 
         return width_of_lane, length_of_lane, adjusted_midpoints_of_lane
 
 
+    def nearestPointPairs(self, points_1, points_2):
+        """
+        Nearest point of points_2 for every point of points_1, computed with a single (n1, n2) distance matrix.
+        Returns a list of [distance, point_1, point_2] in the order of points_1. Among equally distant points,
+        the smallest point_2 (by x, then by y) is kept, as min() does on the [distance, point_1, point_2] lists.
+        """
+        points_1 = np.asarray(points_1)
+        points_2 = np.asarray(points_2)
+        # Sort points_2 lexicographically so that argmin returns the smallest point among the ties
+        points_2 = points_2[np.lexsort((points_2[:, 1], points_2[:, 0]))]
+        diff = points_2[np.newaxis, :, :].astype(np.float64) - points_1[:, np.newaxis, :]
+        distances = np.sqrt(diff[:, :, 0] * diff[:, :, 0] + diff[:, :, 1] * diff[:, :, 1])
+        nearest = np.argmin(distances, axis=1)
+        min_distances = distances[np.arange(len(points_1)), nearest]
+        return [[dist, point_1, point_2] for dist, point_1, point_2 in zip(min_distances.tolist(), points_1.tolist(),
+                                                                           points_2[nearest].tolist())]
+
     def midpointOfFourWayAndTSection(self, canvas, large_contours):
         # print("\n")
         # print("----- Extracting the Midpoints of the Lane -----")
@@ -145,18 +163,7 @@ class Roads():
             # print("lane_1", lane_1.shape)
             # print("lane_2", lane_2.shape)
 
-            for point_lane_1 in lane_1[0::15, :]:
-                temp_list = list()
-                for point_lane_2 in lane_2[0::15, :]:
-
-                    #  dist = cv2.norm(pts - dst, cv2.NORM_L2)
-                    euclidean_distance = math.sqrt(
-                                        math.pow((point_lane_2[0] - point_lane_1[0]), 2) +
-                                        math.pow((point_lane_2[1] - point_lane_1[1]), 2))
-
-                    temp_list.append([euclidean_distance, point_lane_1.tolist(), point_lane_2.tolist()])
-
-                ed_bet_two_lanes.append(min(temp_list))
+            ed_bet_two_lanes = self.nearestPointPairs(lane_1[0::15, :], lane_2[0::15, :])
 
             min_ed_point = min(ed_bet_two_lanes)
             min_euc_dist_bet_lane.append(min_ed_point)
@@ -237,7 +244,7 @@ class Roads():
         # cv2.waitKey(0)
         # cv2.destroyAllWindows()
         
-        cv2.imwrite(self.output_folder + "{}_midpoints_of_lane.jpg".format(self.process_number), canvas)
+        self.artifacts.write(self.output_folder + "{}_midpoints_of_lane.jpg".format(self.process_number), canvas)
         self.process_number += 1
         
         number_of_lanes = len(large_contours)
@@ -259,71 +266,54 @@ class Roads():
 
 
     def removeRedundantMidpointsOfLane(self, midpoint_of_lane, sample_size):
-        ## Removing the points that are near to each other neareast neighbours in the vicnity of 10 euclidean points
+        """
+        Removing the points that are near to each other: every midpoint whose nearest neighbour is within
+        sample_size - 2 is replaced by the middle of the two points, until a pass merges no point anymore.
+        The last midpoint is only kept when it is far enough from the one before it.
+
+        Complexity: a pass removes the duplicates with a hash set in O(n) and finds the nearest neighbour of every
+        midpoint with a KD-tree in O(n log n), instead of O(n^2) list lookups and an O(n log n) sort per midpoint.
+        Among equally near neighbours, the one returned by the KD-tree is merged.
+        """
+        threshold = sample_size - 2
         while(1):
-            adjusted_midpoints_of_lane = list()
+            ## Removing Duplicate Lane Midpoints, lists and tuples with the same values are distinct as with ==
             final_road_points = list()
-            adjust = False
-        
-            ## Removing Duplicate Lane Midpoints
+            seen = set()
             for pt in midpoint_of_lane:
-                if pt not in final_road_points:
+                key = (isinstance(pt, tuple), tuple(pt))
+                if key not in seen:
+                    seen.add(key)
                     final_road_points.append(pt)
 
-            # print("Redundant midpoints of lane are removed")
-            check_redundancy = list()
-            for i, point in enumerate(final_road_points):
-                # print("neighbouring midepoint are removed as well")
-                if (i != len(final_road_points) - 1):
-                    # if (not adjust):
-                    ref_point = np.array(final_road_points[i])
-                    road_points = np.array(final_road_points)
-                    # index = np.where(road_points, ref_point)
-                    # road_points = np.delete(road_points, index)
-                    
-                    edist = np.sqrt(( (road_points[:, 0] - ref_point[0]) ** 2 + (road_points[:, 1] - ref_point[1]) ** 2))
-                    edist = edist.reshape(edist.shape[0], -1)
-                    road_points = road_points.reshape(road_points.shape[0], -1)
-                    edist_road_points = np.hstack([edist, road_points])
-                    # print("edist_last_points", edist_last_points)
-                    # furthest_point =  edist_road_points[edist_last_points[:,0].argsort()][-1]
-                    nearest_point =  edist_road_points[edist_road_points[:,0].argsort()][1]
-                    nearest_point_dist = nearest_point.tolist()[0]
-                    nearest_point_value = nearest_point.tolist()[1:]
-                    # # dist = cv2.norm(np.array(point - road_points), cv2.NORM_L2)
-                    # print("nearest_point = ", nearest_point)
-                    # print("nearest_point = ", nearest_point_value)
-                    current_point = ref_point.tolist()
-                    
-                    if nearest_point_dist <= (sample_size - 2) :  # 10 , 15
-                        point = [(current_point[0] + nearest_point_value[0]) / 2,
-                                    (current_point[1] + nearest_point_value[1]) / 2]
-                        adjusted_midpoints_of_lane.append(point)
-                        # print("midpoint_of_lane[i] = {} and midpoint_of_lane[i+1] = {} adjusted to be point = {}".format(final_road_points[i], final_road_points[i+1],  mid_value))
-                        check_redundancy.append(1)
-                        # adjust = True
-                    else:
-                        adjusted_midpoints_of_lane.append(point)
-                        check_redundancy.append(0)
-                        # print("midpoint_of_lane[i] = {}".format(final_road_points[i]))
-                    # else:
-                    #     None
-                    #     # adjust = False
-                else:
-                    ### The lane has reached its end point adding the last point if its greater at distance from second last point
-                    dist = cv2.norm(np.array(final_road_points[i]) - np.array(final_road_points[i-1]), cv2.NORM_L2)
-                    if (dist > (sample_size - 2)):
-                        adjusted_midpoints_of_lane.append(point)
-                    # break
-                    # print("The lane has reached its endpoint ")
+            if len(final_road_points) < 2:
+                ## A single midpoint is compared with itself as the last point of the lane and dropped
+                return list()
+
+            road_points = np.array(final_road_points, dtype=np.float64)
+            _, neighbours = cKDTree(road_points).query(road_points, k=2)
+            ## The nearest neighbour other than the point itself
+            indices = np.arange(len(road_points))
+            nearest = np.where(neighbours[:, 0] == indices, neighbours[:, 1], neighbours[:, 0])
+            nearest_points = road_points[nearest]
+            edist = np.sqrt((road_points[:, 0] - nearest_points[:, 0]) ** 2 +
+                            (road_points[:, 1] - nearest_points[:, 1]) ** 2)
+            check_redundancy = edist[:-1] <= threshold
+            merged_points = ((road_points + nearest_points) / 2).tolist()
+
+            adjusted_midpoints_of_lane = [merged_points[i] if redundant else final_road_points[i]
+                                          for i, redundant in enumerate(check_redundancy)]
+
+            ### The lane has reached its end point adding the last point if its greater at distance from second last point
+            dist = np.sqrt(np.sum((road_points[-1] - road_points[-2]) ** 2))
+            if (dist > threshold):
+                adjusted_midpoints_of_lane.append(final_road_points[-1])
+
             midpoint_of_lane = adjusted_midpoints_of_lane
-            # print("check redundancy = ", check_redundancy)
-            if sum(check_redundancy) < 1:
+            if not check_redundancy.any():
                 break
 
         return midpoint_of_lane
-        
-        
 
     def orderedMidpointsOfTheLanes(self, final_midpoints_lanes, ordered_canvas):
         """
@@ -379,7 +369,7 @@ class Roads():
             #     cv2.waitKey(20)
             # cv2.destroyAllWindows()
         
-        cv2.imwrite(self.output_folder + "{}_midpoints_in_order.jpg".format(self.process_number), ordered_canvas)
+        self.artifacts.write(self.output_folder + "{}_midpoints_in_order.jpg".format(self.process_number), ordered_canvas)
         self.process_number += 1
 
         return final_ordered_midpoint
@@ -532,7 +522,7 @@ class Roads():
                 pty = round(pt[1])
                 cv2.circle(road_image, (ptx, pty), 2, (255,0,0), -1)
                 
-            cv2.imwrite(self.output_folder + "{}_distortion_mapping.jpg".format(self.process_number), road_image)
+            self.artifacts.write(self.output_folder + "{}_distortion_mapping.jpg".format(self.process_number), road_image)
             self.process_number += 1
             
             return result.tolist()
@@ -549,7 +539,7 @@ class Roads():
                     pty = round(pt[1])
                     cv2.circle(road_image, (ptx, pty), 2, (255,0,0), -1)
                     
-            cv2.imwrite(self.output_folder + "{}_distortion_mapping.jpg".format(self.process_number), road_image)
+            self.artifacts.write(self.output_folder + "{}_distortion_mapping.jpg".format(self.process_number), road_image)
             self.process_number += 1
             
             return new_lane_contours
@@ -628,20 +618,21 @@ class Roads():
         # self.pre_process.plotFigure(morph_img, cmap="brg", title="Morphological Close Operation ")
 
         """ Saving the figure"""
-        cv2.imwrite(self.output_folder + "{}_gray_image.jpg".format(self.process_number), gray)
+        self.artifacts.write(self.output_folder + "{}_gray_image.jpg".format(self.process_number), gray)
         self.process_number += 1
-        cv2.imwrite(self.output_folder + "{}_blur_image.jpg".format(self.process_number), blur)
+        self.artifacts.write(self.output_folder + "{}_blur_image.jpg".format(self.process_number), blur)
         self.process_number += 1
-        cv2.imwrite(self.output_folder + "{}_threshold_image.jpg".format(self.process_number), thresh)
+        self.artifacts.write(self.output_folder + "{}_threshold_image.jpg".format(self.process_number), thresh)
         self.process_number += 1
-        cv2.imwrite(self.output_folder + "{}_dilate_image.jpg".format(self.process_number), dilate_image)
+        self.artifacts.write(self.output_folder + "{}_dilate_image.jpg".format(self.process_number), dilate_image)
         self.process_number += 1
-        cv2.imwrite(self.output_folder + "{}_erode_image.jpg".format(self.process_number), erode_image)
+        self.artifacts.write(self.output_folder + "{}_erode_image.jpg".format(self.process_number), erode_image)
         self.process_number += 1
 
         road_image = image.copy()
 
-        small_contours, large_contours = self.extractContours(morph_img, road_image, car_length, car_width)
+        with self.tracer.span("contours"):
+            small_contours, large_contours = self.extractContours(morph_img, road_image, car_length, car_width)
         canvas = cv2.merge((morph_img, morph_img, morph_img))
         canvas = canvas.copy()
         canvas = cv2.bitwise_not(canvas)
@@ -756,7 +747,7 @@ class Roads():
                     # self.pre_process.showImage("canvas 3", road_image)
                     # cv2.waitKey(10)
                     count += 1
-                cv2.imwrite(self.output_folder + "{}_extrapolated_ordered_midpoint.jpg".format(self.process_number),
+                self.artifacts.write(self.output_folder + "{}_extrapolated_ordered_midpoint.jpg".format(self.process_number),
                             road_image)
                 self.process_number += 1
                 # cv2.destroyAllWindows()
@@ -781,7 +772,7 @@ class Roads():
 
         if self.show_image:
             self.pre_process.showImage("Final Road with Distortion and Mapping", road_image, time=1000)
-        cv2.imwrite(self.output_folder + "{}_final_result.jpg".format(self.process_number), road_image)
+        self.artifacts.write(self.output_folder + "{}_final_result.jpg".format(self.process_number), road_image, final=True)
         self.process_number += 1
         # self.pre_process.plotFigure(road_image, cmap="brg", title="Final Road with Distortion and Mapping")
         # self.pre_process.saveFigure('road_distorted.jpg', dpi=300)
@@ -0,0 +1,74 @@
+import numpy as np
+from typing import List, Union
+
+# Fields of the nodes of a script, a node of the BeamNG AI script
+SCRIPT_DTYPE = np.dtype([("x", np.float64), ("y", np.float64), ("z", np.float64), ("t", np.float64)])
+
+
+def script_dicts(nodes: np.array) -> List[dict]:
+    """ The nodes of a script as the {'x', 'y', 'z', 't'} dicts of the BeamNG AI script """
+    names = SCRIPT_DTYPE.names
+    return [dict(zip(names, row)) for row in nodes.view(np.float64).reshape(len(nodes), len(names)).tolist()]
+
+
+class Trajectory:
+    """
+    A planar polyline whose cumulative arc length is computed once, with np.diff, np.hypot and np.cumsum. Positions
+    are looked up by distance or by time with np.interp, for all the samples at once, and the time stamps of a speed
+    profile are one array as well.
+    """
+
+    def __init__(self, points: np.array):
+        points = np.asarray(points, dtype=np.float64)
+        # An empty trajectory has no columns to infer, its script is empty
+        self.points = points.reshape(len(points), -1)[:, :2] if len(points) > 0 else np.empty((0, 2))
+        self.segments = np.hypot(*np.diff(self.points, axis=0).T)
+        self.distances = np.concatenate([[0.0], np.cumsum(self.segments)])[:len(self.points)]
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def length(self) -> float:
+        return float(self.distances[-1]) if len(self.distances) > 0 else 0.0
+
+    def at_distance(self, distances: np.array) -> np.array:
+        """ (n, 2) positions at the distances along the trajectory, linearly interpolated """
+        return np.stack([np.interp(distances, self.distances, self.points[:, 0]),
+                         np.interp(distances, self.distances, self.points[:, 1])], axis=1)
+
+    def resample(self, spacing: float) -> "Trajectory":
+        """ The trajectory with points evenly spaced by at most spacing, its end points are kept """
+        if self.length == 0:
+            return Trajectory(self.points[:1])
+        n = int(np.ceil(self.length / spacing)) + 1
+        return Trajectory(self.at_distance(np.linspace(0, self.length, n)))
+
+    def timestamps(self, speed: Union[float, np.array], start: float = 0.0) -> np.array:
+        """
+        Time stamps of the points driven at a speed profile
+
+        Args:
+            speed: a constant speed, or the speed at every point (a variable profile, the speed is taken as constant
+                   on a segment, the mean of its end points)
+            start: the time stamp of the first point
+        """
+        speed = np.asarray(speed, dtype=np.float64)
+        if speed.ndim > 0:
+            speed = (speed[1:] + speed[:-1]) / 2
+        return start + np.concatenate([[0.0], np.cumsum(self.segments / speed)])[:len(self.points)]
+
+    def steps(self, time_step: float, start: float = 0.0) -> np.array:
+        """ Time stamps of the points one time step apart """
+        return np.arange(len(self.points)) * time_step + start
+
+    def at_time(self, times: np.array, timestamps: np.array) -> np.array:
+        """ (n, 2) positions at the times, for the time stamps of the points """
+        return np.stack([np.interp(times, timestamps, self.points[:, 0]),
+                         np.interp(times, timestamps, self.points[:, 1])], axis=1)
+
+    def script(self, timestamps: np.array, z: float = 0) -> np.array:
+        """ The nodes of the BeamNG AI script of the points, a structured array of SCRIPT_DTYPE """
+        nodes = np.empty(len(self.points), dtype=SCRIPT_DTYPE)
+        nodes["x"], nodes["y"], nodes["z"], nodes["t"] = self.points[:, 0], self.points[:, 1], z, timestamps
+        return nodes
@@ -1,9 +1,16 @@
-import matplotlib.colors as colors
-from shapely.geometry import Point
+import math
+import numpy as np
+from modules.common import as_records, read_only
+from .trajectory import SCRIPT_DTYPE, script_dicts
 
 
 class Vehicle:
+    # The fields of obj_dict, in the order of data.json
+    FIELDS = ["script", "debug_script", "pos", "rot", "color", "color_code", "spheres", "speed", "delay"]
+    __slots__ = ("_nodes", "debug_script", "pos", "rot", "color", "color_code", "spheres", "speed", "delay")
+
     def __init__(self, script, pos, rot, color, color_code, debug_script, spheres, delay=0):
+        import matplotlib.colors as colors
         self.script = script
         self.debug_script = debug_script
         self.pos = pos
@@ -14,15 +21,32 @@ class Vehicle:
         self.speed = 0
         self.delay = delay
 
-    def obj_dict(obj):
-        return obj.__dict__
+    @property
+    def script(self):
+        """ The nodes as the {'x', 'y', 'z', 't'} dicts of the BeamNG AI script, built on demand """
+        return script_dicts(self._nodes)
 
-    def set_speed(self):
-        first, last = self.script[0], self.script[-1]
+    @script.setter
+    def script(self, script):
+        """ A list of {'x', 'y', 'z', 't'} dicts, or a structured array of SCRIPT_DTYPE """
+        if not isinstance(script, np.ndarray):
+            script = [(p['x'], p['y'], p['z'], p['t']) for p in script]
+        self._nodes, _ = as_records(script, SCRIPT_DTYPE)
 
-        p1 = Point(first['x'], first['y'])
-        p2 = Point(last['x'], last['y'])
+    @property
+    def nodes(self) -> np.array:
+        """ Read-only structured array of the script """
+        return read_only(self._nodes)
 
-        delta_t = last['t'] - first['t']
-        distance = p1.distance(p2)
+    def obj_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def set_speed(self):
+        first, last = self._nodes[0], self._nodes[-1]
+        delta_t = float(last['t'] - first['t'])
+        if delta_t <= 0:
+            # A stationary vehicle, its script has a single node
+            self.speed = 0.0
+            return
+        distance = math.hypot(float(last['x'] - first['x']), float(last['y'] - first['y']))
         self.speed = distance / delta_t  # m/s
@@ -1,11 +1,45 @@
 import json
 from typing import List
 import pathlib
+import numpy as np
 from modules.models.bng_segment import BngSegement
+from modules.models.stripe import Stripe
 from modules.crisce.vehicle import Vehicle
+from modules.commonroad import CommonRoadWriter
+from modules.columnar import write_columnar
 from modules.common import intersect
 from shapely.geometry import LineString
 
+try:
+    import orjson
+except ImportError:
+    # The standard library writes the same document, only slower
+    orjson = None
+
+
+def encode(value) -> bytes:
+    """ JSON of a value, with orjson when it is installed """
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value).encode()
+
+
+def encode_stripe(stripe: Stripe) -> bytes:
+    """ JSON of a Stripe, orjson encodes the points from their array without building lists """
+    if orjson is not None:
+        return encode({"points": np.ascontiguousarray(stripe.array), "num": stripe.num, "pattern": stripe.pattern})
+    return encode(stripe.to_dict())
+
+
+def write_array(outfile, values, encoder=encode):
+    """ Write a JSON array, encoding its values one by one """
+    outfile.write(b"[")
+    for i, value in enumerate(values):
+        if i > 0:
+            outfile.write(b", ")
+        outfile.write(encoder(value))
+    outfile.write(b"]")
+
 
 class DataHandler:
     def __init__(self, vehicles: List[Vehicle], roads: List[BngSegement], sketch_name: str, rot_deg: int):
@@ -14,22 +48,24 @@ class DataHandler:
         self.sketch_name = sketch_name
         self.rot_deg = rot_deg
 
-    def vehicles2json(self):
-        print("Number of vehicles: ", len(self.vehicles))
-
+    def crash_point(self):
         list_lst = []
         intersection = []
         for v in self.vehicles:
-            coords = [(p['x'], p['y']) for p in v.script]
+            nodes = v.nodes
+            coords = np.stack([nodes['x'], nodes['y']], axis=1)
             if len(coords) == 1:
-                intersection = coords
+                intersection = [tuple(coords[0].tolist())]
                 break
             list_lst.append(LineString(coords))
 
         if len(intersection) == 0:
             intersection = intersect(list_lst)
+        return intersection
 
-        return [v.obj_dict() for v in self.vehicles], intersection
+    def vehicles2json(self):
+        print("Number of vehicles: ", len(self.vehicles))
+        return [v.obj_dict() for v in self.vehicles], self.crash_point()
 
     def roads2json(self):
         print("Number of roads: ", len(self.roads))
@@ -37,33 +73,55 @@ class DataHandler:
         roads = []
         for i, road in enumerate(self.roads):
             i = {
-                "left": road.left.__dict__,
-                "center": road.center.__dict__,
-                "right": road.right.__dict__,
-                "marks": [m.__dict__ for m in road.marks],
+                "left": road.left.to_dict(),
+                "center": road.center.to_dict(),
+                "right": road.right.to_dict(),
+                "marks": [m.to_dict() for m in road.marks],
                 "width": road.width,
             }
             roads.append(i)
 
         return roads
 
-    def to_json(self):
-        vehicles, crash_point = self.vehicles2json()
-        roads = self.roads2json()
-
-        data = {
-            "name": self.sketch_name,
-            "roads": roads,
-            "vehicles": vehicles,
-            "crash_point": crash_point,
-            "rot_deg": self.rot_deg
-        }
+    def write_json(self, outfile):
+        """
+        Stream the document of to_json to a binary file. Every stripe and vehicle is encoded on its own, so the
+        memory needed does not grow with the number of roads and vehicles.
+        """
+        outfile.write(b'{"name": ' + encode(self.sketch_name) + b', "roads": [')
+        for i, road in enumerate(self.roads):
+            if i > 0:
+                outfile.write(b", ")
+            outfile.write(b'{')
+            for key in ["left", "center", "right"]:
+                outfile.write(encode(key) + b": " + encode_stripe(getattr(road, key)) + b", ")
+            outfile.write(b'"marks": ')
+            write_array(outfile, road.marks, encoder=encode_stripe)
+            outfile.write(b', "width": ' + encode(road.width) + b'}')
+        outfile.write(b'], "vehicles": ')
+        write_array(outfile, (v.obj_dict() for v in self.vehicles))
+        outfile.write(b', "crash_point": ' + encode(self.crash_point()) + b', "rot_deg": ' + encode(self.rot_deg) +
+                      b'}')
 
-        # Using a JSON string
-        json_string = json.dumps(data)
+    def to_json(self):
+        print("Number of vehicles: ", len(self.vehicles))
+        print("Number of roads: ", len(self.roads))
 
         # Create a folder and filename
         pathlib.Path(f'outputs/{self.sketch_name}/').mkdir(parents=True, exist_ok=True)
-        with open(f'outputs/{self.sketch_name}/data.json', 'w') as outfile:
-            outfile.write(json_string)
+        with open(f'outputs/{self.sketch_name}/data.json', 'wb') as outfile:
+            self.write_json(outfile)
         print(f'Output is written to outputs/{self.sketch_name}/ !')
+
+    def to_columnar(self, dtype=np.float64):
+        """ Write the scenario to outputs/<sketch_name>/data/ in the columnar format of modules.columnar """
+        write_columnar(f'outputs/{self.sketch_name}/data', self.sketch_name, self.roads, self.vehicles,
+                       self.crash_point(), self.rot_deg, dtype=dtype)
+        print(f'Columnar output is written to outputs/{self.sketch_name}/data/ !')
+
+    def to_commonroad(self, writer: CommonRoadWriter = None):
+        """ Write the scenario to outputs/<sketch_name>/commonroad.xml in the CommonRoad format """
+        writer = CommonRoadWriter() if writer is None else writer
+        pathlib.Path(f'outputs/{self.sketch_name}/').mkdir(parents=True, exist_ok=True)
+        writer.write(f'outputs/{self.sketch_name}/commonroad.xml', self.sketch_name, self.roads, self.vehicles)
+        print(f'CommonRoad scenario is written to outputs/{self.sketch_name}/commonroad.xml !')
@@ -1,6 +1,5 @@
 from typing import List
 
-from descartes import PolygonPatch
 from shapely.geometry import LineString
 
 from .line import Line
@@ -12,20 +11,19 @@ class BngSegement:
     def __init__(self, left: Line, right: Line, center: Line, marks: List[Line],
                  width: float, ratio: float):
 
-        self.left = Stripe(generate(left.ls, ratio, 0.1), left.num, left.pattern)
-        self.right = Stripe(generate(right.ls, ratio, 0.1), right.num, right.pattern)
-        self.center = Stripe(generate(center.ls, ratio, ratio * width))
-        self.marks = [Stripe(generate(m.ls, ratio, 0.1), m.num, m.pattern) for m in marks]
+        self.left = Stripe(generate(left, ratio, 0.1), left.num, left.pattern)
+        self.right = Stripe(generate(right, ratio, 0.1), right.num, right.pattern)
+        self.center = Stripe(generate(center, ratio, ratio * width))
+        self.marks = [Stripe(generate(m, ratio, 0.1), m.num, m.pattern) for m in marks]
         self.width = ratio * width
 
     def visualize(self, ax, show_center: bool = True):
-        poly = LineString([(t[0], t[1]) for t in self.center.points]).buffer(self.width / 2, cap_style=2, join_style=2)
+        from descartes import PolygonPatch
+        poly = LineString(self.center.array[:, :2]).buffer(self.width / 2, cap_style=2, join_style=2)
         patch = PolygonPatch(poly, fc='gray', ec='gray')
         ax.add_patch(patch)
         if show_center:
-            xs = [point[0] for point in self.center.points]
-            ys = [point[1] for point in self.center.points]
-            ax.plot(xs, ys, color='coral')
+            ax.plot(self.center.nodes["x"], self.center.nodes["y"], color='coral')
         render_stripe(ax, self.left, "blue")
         render_stripe(ax, self.right, "blue")
         for m in self.marks:
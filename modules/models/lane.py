@@ -1,6 +1,5 @@
+import numpy as np
 from .line import Line
-from modules.common import midpoint
-from shapely.geometry import LineString, Point
 
 
 class Lane:
@@ -8,13 +7,12 @@ class Lane:
         self.left = left
         self.right = right
 
-        mps = []
-        for l, r in zip(list(left.ls.coords), list(right.ls.coords)):
-            point_left = Point(l[0], l[1])
-            point_right = Point(r[0], r[1])
-            mps.append(midpoint(point_left, point_right))
-            self.width = point_left.distance(point_right)
-        self.mid = Line(ls=LineString(mps))
+        n = min(len(left.coords), len(right.coords))
+        lefts, rights = left.coords[:n], right.coords[:n]
+        if n > 0:
+            difference = rights[-1] - lefts[-1]
+            self.width = float(np.sqrt(difference[0] * difference[0] + difference[1] * difference[1]))
+        self.mid = Line(ls=None).with_coords((lefts + rights) / 2)
 
     def __str__(self):
         return str(self.__class__) + ": " + str(self.__dict__)
@@ -1,14 +1,18 @@
-from .stripe import Stripe
+import numpy as np
+from .stripe import Stripe, STRIPE_DTYPE
 
 
-def generate(lst, r, width):
-    coords = list(lst.coords)
-    return [(p[0] * r, p[1] * r, 0, width) for p in coords]
+def generate(line, r, width):
+    """
+    Points (x, y, z, width) of a stripe from a Line scaled by r, as a structured array of STRIPE_DTYPE
+    """
+    coords = np.asarray(line.scale(r), dtype=np.float64).reshape(-1, 2)
+    points = np.empty(len(coords), dtype=STRIPE_DTYPE)
+    points["x"], points["y"], points["z"], points["width"] = coords[:, 0], coords[:, 1], 0, width
+    return points
 
 
 def render_stripe(ax, line: Stripe, color: str):
-    xs = [point[0] for point in line.points]
-    ys = [point[1] for point in line.points]
-    ax.plot(xs, ys, color=color,
+    ax.plot(line.nodes["x"], line.nodes["y"], color=color,
             linewidth=3 if line.num == "double" else 1,
             linestyle=(0, (5, 2)) if line.pattern == "dashed" else "solid")
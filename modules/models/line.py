@@ -1,9 +1,16 @@
 from math import trunc
+import numpy as np
 from shapely.geometry import LineString
 from modules.constant import CONST
 
 
 class Line:
+    """
+    A lane line. Its geometry is kept both as a LineString (ls) and as a read-only (n, 2) array of coordinates
+    (coords), each one built lazily from the other. Transformations such as flip return a new Line backed by a
+    new array, without copying the shapely geometry.
+    """
+
     def __init__(self, marks: dict = None, ls: LineString = None, thickness: int = 4):
         if marks is not None:
             keys = list(marks.keys())
@@ -29,8 +36,53 @@ class Line:
             # print(total, len(keys))
             # print(total / len(keys), threshold, self.pattern)
             # print("======")
+        self._coords = None
         self.ls = ls
 
+    @property
+    def ls(self):
+        if self._ls is None and self._coords is not None:
+            self._ls = LineString(self._coords)
+        return self._ls
+
+    @ls.setter
+    def ls(self, ls):
+        self._ls = ls
+        self._coords = None
+
+    @property
+    def coords(self):
+        """ Read-only (n, 2) array of the coordinates of the line """
+        if self._coords is None and self._ls is not None:
+            coords = np.array(self._ls.coords, dtype=np.float64)[:, :2]
+            coords.setflags(write=False)
+            self._coords = coords
+        return self._coords
+
+    def with_coords(self, coords: np.array):
+        """
+        A new line with the same marks and the given coordinates
+        """
+        line = Line.__new__(Line)
+        line.__dict__.update(self.__dict__)
+        coords = np.asarray(coords, dtype=np.float64)
+        coords.setflags(write=False)
+        line._ls, line._coords = None, coords
+        return line
+
+    def flip(self, height: float):
+        """
+        The line mirrored vertically in an image of the given height, i.e. (x, height - y)
+        """
+        coords = self.coords
+        return self.with_coords(np.stack([coords[:, 0], height - coords[:, 1]], axis=1))
+
+    def scale(self, ratio: float):
+        """
+        The coordinates multiplied by ratio, as a new array
+        """
+        return self.coords * ratio
+
     def get_peak(self):
         length = len(self.keys)
         return self.keys[trunc(length / 2)]
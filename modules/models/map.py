@@ -2,7 +2,6 @@ from typing import List
 
 from .segment import Segment
 from .lane import Lane
-import matplotlib.pyplot as plt
 import json
 from math import floor
 from shapely.geometry import LineString
@@ -17,6 +16,7 @@ class Map:
         self.image = image
 
     def draw(self, include_image: bool = False):
+        import matplotlib.pyplot as plt
         i = 1
         for road in self.roads:
             for lane in road.lanes:
@@ -1,12 +1,10 @@
-import copy
 import numpy as np
-import matplotlib.pyplot as plt
 from .lane import Lane
 from .line import Line
 from .bng_segment import BngSegement
 from typing import List
-from shapely.geometry import Polygon, LineString, Point
-from modules.common import pairs, translate_ls_to_new_origin, midpoint
+from shapely.geometry import Polygon, LineString
+from modules.common import pairs, translate_ls_to_new_origin
 
 
 class Segment:
@@ -28,17 +26,15 @@ class Segment:
         self.lines: [Line] = []
 
     def flip(self, height: float, debug: bool = False):
+        """
+        Lines of the segment mirrored vertically in an image of the given height. The lines of the segment are
+        not modified, and the flipped ones only hold new coordinate arrays.
+        """
         assert len(self.lines) > 0
-        lines = copy.deepcopy(self.lines)
-        flipped_lines = copy.deepcopy(lines)
-
-        for i, line in enumerate(lines):
-            target = lines[i]
-            ps = [(p[0], height - p[1]) for p in list(target.ls.coords)]
-            flip = LineString(ps)
-            flipped_lines[i].ls = flip
+        flipped_lines = [line.flip(height) for line in self.lines]
 
         if debug:
+            import matplotlib.pyplot as plt
             plt.clf()
             fig, ax = plt.subplots(1, 1, figsize=(8, 8))
             self.visualize(ax, flipped_lines, "Segment with original Lane Lines")
@@ -47,20 +43,14 @@ class Segment:
         return flipped_lines
 
     def get_bng_segment(self, lines: List[Line], ratio: float, debug: bool = False):
-        lines = copy.deepcopy(lines)
-        first, last = lines[0], lines[-1]
-        left = copy.deepcopy(first)
-        right = copy.deepcopy(last)
-        assert len(list(left.ls.coords)) == len(list(right.ls.coords))
+        # The lines are only read, so the first and last lines are used as they are
+        left, right = lines[0], lines[-1]
+        assert len(left.coords) == len(right.coords)
 
-        mps, width = [], 0
-        for l, r in zip(list(left.ls.coords), list(right.ls.coords)):
-            point_left = Point(l[0], l[1])
-            point_right = Point(r[0], r[1])
-            mps.append(midpoint(point_left, point_right))
-            if point_right.distance(point_left) > width:
-                width = point_right.distance(point_left)
-        center = Line(ls=LineString(mps))
+        differences = right.coords - left.coords
+        distances = np.sqrt(differences[:, 0] * differences[:, 0] + differences[:, 1] * differences[:, 1])
+        width = max(0, float(np.max(distances)))
+        center = Line(ls=None).with_coords((left.coords + right.coords) / 2)
 
         marks = []
         if len(lines) > 2:
@@ -71,6 +61,7 @@ class Segment:
         bs = BngSegement(left, right, center, marks, width, ratio)
 
         if debug:
+            import matplotlib.pyplot as plt
             plt.clf()
             fig, ax = plt.subplots(1, 1, figsize=(8, 8))
             ax = bs.visualize(ax)
@@ -90,9 +81,7 @@ class Segment:
     @staticmethod
     def visualize(ax, lines, title: str = "Segment with original Lane Lines"):
         for line in lines:
-            xs = [p[0] for p in list(line.ls.coords)]
-            ys = [p[1] for p in list(line.ls.coords)]
-            ax.plot(xs, ys,
+            ax.plot(line.coords[:, 0], line.coords[:, 1],
                     linewidth=3 if line.num == "double" else 1,
                     linestyle=(0, (5, 2)) if line.pattern == "dashed" else "solid")
         ax.title.set_text(title)
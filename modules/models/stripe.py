@@ -1,11 +1,47 @@
+import numpy as np
 from typing import List
+from modules.common import as_records, as_table, read_only
+
+# Fields of the points of a stripe, a node of a BeamNG road
+STRIPE_DTYPE = np.dtype([("x", np.float64), ("y", np.float64), ("z", np.float64), ("width", np.float64)])
 
 
 class Stripe:
+    """
+    A road line of BeamNG. Its points are kept in a structured array of STRIPE_DTYPE, the (x, y, z, width) tuples of
+    the BeamNG road API are only built by the points property. Points clipped by Slash have no z nor width, columns
+    is then 2 and the missing fields are NaN.
+    """
+    __slots__ = ("_nodes", "columns", "num", "pattern")
+
     def __init__(self, points: List, num: int = -1, pattern: str = '-1'):
         self.points = points
         self.num = num
         self.pattern = pattern
 
+    @property
+    def points(self) -> List[tuple]:
+        return list(map(tuple, self.array.tolist()))
+
+    @points.setter
+    def points(self, points):
+        self._nodes, self.columns = as_records(points, STRIPE_DTYPE)
+
+    @property
+    def nodes(self) -> np.array:
+        """ Read-only structured array of the points """
+        return read_only(self._nodes)
+
+    @property
+    def array(self) -> np.array:
+        """ Read-only (n, columns) array of the points """
+        return read_only(as_table(self._nodes)[:, :self.columns])
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def to_dict(self) -> dict:
+        return {"points": self.array.tolist(), "num": self.num, "pattern": self.pattern}
+
     def __str__(self):
-        return str(self.__class__) + ": " + str(self.__dict__)
\ No newline at end of file
+        return str(self.__class__) + ": " + str(self.to_dict())
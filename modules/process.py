@@ -1,23 +1,21 @@
 import os
 import sys
 import cv2
+import csv
 import json
-import copy
 import click
 import pickle
 import platform
 import warnings
 import numpy as np
-import pandas as pd
 import logging as logger
-import matplotlib.pyplot as plt
 
 from pathlib import Path
 from typing import List
-from modules.crisce.pre_processing import Pre_Processing
 from modules.crisce.roads import Roads
 from modules.crisce.car import Car
 from modules.crisce.kinematics import Kinematics
+from modules.crisce.artifacts import ArtifactWriter
 from modules.crisce.common import visualize_crisce_sketch, visualize_crisce_simlanes
 from modules.crisce import extract_data_from_scenario, Vehicle
 
@@ -25,16 +23,113 @@ from modules.roadlane import categorize_roadlane, refine_roadlanes
 from modules.analyzer import Analyzer
 from modules.arrow import ArrowAnalyzer
 from modules.common import pairs
+from modules.batch import case_name
+from modules.cache import StageCache
+from modules.trace import Tracer
 from modules.constant import CONST
 from modules.models import Segment, BngSegement
 from modules.wipe import Slash
+from modules.commonroad import CommonRoadReader
 from modules import DataHandler
 
+# Modules implementing each cached stage, whose source is part of the cache key of the stage
+VEHICLES_CODE = ["modules.crisce.car", "modules.crisce.pre_processing"]
+ROADS_CODE = ["modules.crisce.roads", "modules.crisce.pre_processing"]
+KINEMATICS_CODE = ["modules.crisce.kinematics", "modules.crisce.bezier", "modules.crisce.trajectory",
+                   "modules.crisce.car", "modules.crisce.roads", "modules.crisce.pre_processing"]
+ARROW_CODE = ["modules.arrow.analyzer", "modules.arrow.lib", "modules.arrow.dbscan", "modules.arrow.contour",
+              "modules.common"]
 
 warnings.filterwarnings('ignore')
 
 
-def run(accident_sketch: str):
+def render_vehicle_trajectory(ax, vehicles):
+    for v in vehicles:
+        c = 'r' if v.color == "red" else 'b'
+        ax.plot(v.nodes['x'], v.nodes['y'], c=c, marker="x")
+    return ax
+
+
+def render_figure(sketch_name, diff, image, roads, segments, vhs):
+    """
+    Render the summary figure of a case: the road sketch, the CRISCE roads, the analyzed lane lines and
+    the final roads together with the vehicle trajectories
+
+    Returns:
+        the matplotlib figure, which is owned by the caller
+    """
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(2, 3, figsize=(20, 12))
+    fig.suptitle(f'Case: {sketch_name} - Arrow: {diff}', fontsize=40)
+    ax[0][0].imshow(image, cmap="gray", origin="lower")
+    # ax[0][0] = visualize_crisce_sketch(ax[0][0], roads["sketch_lane_width"][0], roads["large_lane_midpoints"])
+    ax[0][0].title.set_text("Road Sketch")
+    ax[0][0].set_aspect("equal")
+
+    ax[0][1] = visualize_crisce_simlanes(ax[0][1], roads["scaled_lane_width"], roads["simulation_lane_midpoints"])
+    ax[0][1].title.set_text("CRISCE Road")
+    ax[0][1].set_aspect("equal")
+
+    ax[0][2] = visualize_crisce_simlanes(ax[0][2], roads["scaled_lane_width"], roads["simulation_lane_midpoints"])
+    ax[0][2].title.set_text("CRISCE Road with Vehicle Trajectory")
+    ax[0][2].set_aspect("equal")
+
+    for segment in segments:
+        ax[1][0] = segment.visualize(ax[1][0], segment.lines)
+    ax[1][0].set_aspect("equal")
+
+    for segment in segments:
+        sm: Segment = segment
+        flipped_lines = sm.flip(image.shape[0])
+        ax[1][1] = sm.visualize(ax[1][1], flipped_lines, "Rotate the coordinates")
+    ax[1][1].set_aspect("equal")
+
+    for segment in segments:
+        bng_segment: BngSegement = segment.bng_segment
+        ax[1][2] = bng_segment.visualize(ax[1][2], show_center=False)
+    ax[1][2].set_aspect("equal")
+    ax[1][2].title.set_text("Final Road with Lane Marking")
+
+    ax[0][0] = render_vehicle_trajectory(ax[0][0], vhs)
+    ax[0][2] = render_vehicle_trajectory(ax[0][2], vhs)
+    ax[1][0] = render_vehicle_trajectory(ax[1][0], vhs)
+    ax[1][1] = render_vehicle_trajectory(ax[1][1], vhs)
+    ax[1][2] = render_vehicle_trajectory(ax[1][2], vhs)
+    return fig
+
+
+def run(accident_sketch: str, headless: bool = False, figure: bool = True, artifacts: str = CONST.ARTIFACTS_ALL,
+        trajectory_plots: bool = False, cache: bool = True, trace: bool = True, formats=(CONST.FORMAT_JSON,),
+        road_map: str = None):
+    """
+    Generate the simulation data of an accident sketch
+
+    Args:
+        accident_sketch: the folder of the accident sketch
+        headless: do not display anything and render with a non-interactive backend
+        figure: render the summary figure (outputs/<case>/viz.png)
+        artifacts: which debug images of the extraction stages are written: none, final or all
+        trajectory_plots: plot the trajectories planned for each vehicle to the output folder of the accident sketch
+        cache: load the outputs of the unchanged stages from the stage cache (CONST.CACHE_FOLDER). The debug
+               images of a loaded stage are written from the cache, the trajectories are planned again when
+               trajectory_plots is set.
+        trace: write the spans of the stages to outputs/<case>/trace.json in the Chrome trace format
+        formats: the output formats of the scenario, json (outputs/<case>/data.json) and/or commonroad
+                 (outputs/<case>/commonroad.xml) and/or columnar (outputs/<case>/data/, see modules.columnar)
+        road_map: a CommonRoad scenario or map whose lanelets are used as the roads instead of the ones extracted
+                  from the road sketch. The summary figure, which shows the road sketch, is not rendered.
+
+    Returns:
+        the span records of the stages, with their wall time, CPU time and peak RSS
+    """
+    if headless:
+        # Selecting the backend does not import pyplot, which is only loaded to render the figure
+        import matplotlib
+        matplotlib.use("Agg")
+    artifact_writer = ArtifactWriter(level=artifacts)
+    stage_cache = StageCache(enabled=cache)
+    tracer = Tracer()
+
     try:
         sketch = os.path.join(accident_sketch, "sketch.jpeg")
         if not os.path.exists(sketch):
@@ -55,14 +150,14 @@ def run(accident_sketch: str):
         sketch_type_external = True
         RED_CAR_BOUNDARY = np.array([[0, 190, 215],  # red external crash sketches
                                      [179, 255, 255]])
-        external_csv = os.path.join(accident_sketch, "external.csv")
-        df = pd.read_csv(external_csv)
-        external_impact_points = dict()
-        for i in df.index:
-            color = str.lower(df.vehicle_color[i])
-            impact = str.lower(df.impact_point[i])
-            external_impact_points[color] = dict()
-            external_impact_points[color] = impact
+        with tracer.span("setup"):
+            external_csv = os.path.join(accident_sketch, "external.csv")
+            external_impact_points = dict()
+            with open(external_csv, newline="") as f:
+                for row in csv.DictReader(f):
+                    color = str.lower(row["vehicle_color"])
+                    impact = str.lower(row["impact_point"])
+                    external_impact_points[color] = impact
 
         output_folder = os.path.join(accident_sketch, "output")
         if not os.path.exists(output_folder):
@@ -77,59 +172,84 @@ def run(accident_sketch: str):
 
         logger.info(f"Generation of simulation starts")
 
-        car = Car()
-        roads = Roads()
-        kinematics = Kinematics()
-        pre_process = Pre_Processing()
+        car = Car(artifacts=artifact_writer, tracer=tracer)
+        roads = Roads(artifacts=artifact_writer, tracer=tracer)
+        reporter = None
+        if trajectory_plots:
+            from modules.crisce.reporter import TrajectoryReporter
+            reporter = TrajectoryReporter()
+        kinematics = Kinematics(artifacts=artifact_writer, reporter=reporter, tracer=tracer)
 
         sketch_image_path = sketch
         road_image_path = road
         road_arrow_image_path = road_arrow
 
-        #### ------ Read Sketch Image ------ #######
-
-        image = pre_process.readImage(sketch_image_path)
-
         car.setColorBoundary(red_boundary=RED_CAR_BOUNDARY, blue_boundary=BLUE_CAR_BOUNDARY)
 
         # Step 1: Extract vehicles' information
-        vehicles, time_efficiency = car.extractVehicleInformation(image_path=sketch_image_path, time_efficiency=dict(),
-                                                                  show_image=show_image, output_folder=output_folder,
-                                                                  external=sketch_type_external,
-                                                                  external_impact_points=external_impact_points,
-                                                                  crash_impact_locations=CONST.CRISCE_IMPACT_MODEL,
-                                                                  car_length_sim=CONST.CAR_LENGTH_SIM)
-
-        car_length, car_width = car.getCarDimensions()
-        height, width = car.getImageDimensions()
+        def extract_vehicles():
+            vehicles, time_efficiency = car.extractVehicleInformation(image_path=sketch_image_path,
+                                                                      time_efficiency=dict(),
+                                                                      show_image=show_image,
+                                                                      output_folder=output_folder,
+                                                                      external=sketch_type_external,
+                                                                      external_impact_points=external_impact_points,
+                                                                      crash_impact_locations=CONST.CRISCE_IMPACT_MODEL,
+                                                                      car_length_sim=CONST.CAR_LENGTH_SIM,
+                                                                      headless=headless)
+            return vehicles, time_efficiency, car.getCarDimensions(), car.getImageDimensions()
+
+        with tracer.span("vehicles") as span:
+            vehicles_key = stage_cache.key("vehicles", files=[sketch_image_path, external_csv], code=VEHICLES_CODE,
+                                           vehicle_colors=car.pre_process.vehicle_colors,
+                                           impact_model=CONST.CRISCE_IMPACT_MODEL, car_length_sim=CONST.CAR_LENGTH_SIM,
+                                           artifacts=artifacts, output_folder=output_folder)
+            (vehicles, time_efficiency, (car_length, car_width), (height, width)), hit = \
+                stage_cache.fetch(vehicles_key, extract_vehicles, artifact_writer)
+            logger.info(f"Vehicles {'loaded from the cache' if hit else 'extracted'}")
+            span["cached"] = hit
 
         # Step 2: Extract roads' information. Note: We need the size of the vehicles to rescale the roads
-        roads, lane_nodes, road_lanes, a_ratio = roads.extractRoadInformation(image_path=road_image_path,
-                                                                              time_efficiency=time_efficiency,
-                                                                              show_image=show_image,
-                                                                              output_folder=output_folder,
-                                                                              car_length=car_length,
-                                                                              car_width=car_width,
-                                                                              car_length_sim=CONST.CAR_LENGTH_SIM)
+        def extract_roads():
+            return roads.extractRoadInformation(image_path=road_image_path, time_efficiency=time_efficiency,
+                                                show_image=show_image, output_folder=output_folder,
+                                                car_length=car_length, car_width=car_width,
+                                                car_length_sim=CONST.CAR_LENGTH_SIM)
+
+        if road_map is None:
+            with tracer.span("roads") as span:
+                roads_key = stage_cache.key("roads", files=[road_image_path], code=ROADS_CODE, car_length=car_length,
+                                            car_width=car_width, car_length_sim=CONST.CAR_LENGTH_SIM,
+                                            artifacts=artifacts, output_folder=output_folder)
+                (roads, lane_nodes, road_lanes, a_ratio), hit = stage_cache.fetch(roads_key, extract_roads,
+                                                                                   artifact_writer)
+                logger.info(f"Roads {'loaded from the cache' if hit else 'extracted'}")
+                span["cached"] = hit
 
         # Step 3: Plan the trajectories
         # TODO Add parameter to decide whih planner to use
-        vehicles, time_efficiency = kinematics.extractKinematicsInformation(image_path=sketch_image_path,
-                                                                            vehicles=vehicles,
-                                                                            time_efficiency=time_efficiency,
-                                                                            output_folder=output_folder,
-                                                                            show_image=show_image)
+        def plan_trajectories():
+            return kinematics.extractKinematicsInformation(image_path=sketch_image_path, vehicles=vehicles,
+                                                           time_efficiency=time_efficiency,
+                                                           output_folder=output_folder, show_image=show_image)
+
+        with tracer.span("kinematics") as span:
+            if trajectory_plots:
+                # The plots are drawn while planning, they cannot be written from the cache
+                (vehicles, time_efficiency), hit = plan_trajectories(), False
+            else:
+                kinematics_key = stage_cache.key("kinematics", depends=[vehicles_key], code=KINEMATICS_CODE,
+                                                 artifacts=artifacts, output_folder=output_folder)
+                (vehicles, time_efficiency), hit = stage_cache.fetch(kinematics_key, plan_trajectories,
+                                                                     artifact_writer)
+            logger.info(f"Trajectories {'loaded from the cache' if hit else 'planned'}")
+            span["cached"] = hit
 
         print("==================================================")
         print("==================================================")
         print("OUTPUT FOLDER")
 
-        try:
-            SKETCH_NAME = sketch.split('/')[2]
-        except Exception as ex:
-            SKETCH_NAME = ""
-        if platform.system() == CONST.WINDOWS:
-            SKETCH_NAME = sketch.split('\\')[2]
+        SKETCH_NAME = case_name(accident_sketch)
 
         OUTPUT_PATH = f'outputs/{SKETCH_NAME}'
         if not os.path.exists(OUTPUT_PATH):
@@ -138,31 +258,32 @@ def run(accident_sketch: str):
         print("==================================================")
         print("==================================================")
         print("EXTRACT VEHICLES INFORMATION")
-        vhs = []
-        for color in vehicles:
-            color_code = CONST.RED_RGBA
-            if color == "blue":
-                color_code = CONST.BLUE_RGBA
-            vehicle = vehicles[color]
-            angle = vehicle["vehicle_info"]["0"]["angle_of_car"]
-            orig_pos = vehicle["snapshots"][0]["center_of_car"]
-            distorted_height = height * CONST.CAR_LENGTH_SIM / car_length
-            x = orig_pos[0] * CONST.CAR_LENGTH_SIM / car_length
-            y = distorted_height - (orig_pos[1] * CONST.CAR_LENGTH_SIM / car_length)
-            vh = Vehicle(
-                script=vehicle["trajectories"]["script_trajectory"],
-                pos=(round(x, 1), round(y, 1), 0),
-                rot=(0, 0, -angle - 90),
-                color=color,
-                color_code=color_code,
-                debug_script=vehicle["trajectories"]["debug_trajectory"],
-                spheres=vehicle["trajectories"]["spheres"],
-                delay=vehicle["trajectories"]["delay"]
-            )
-            vh.set_speed()
-            vhs.append(vh)
-            # print(vh.color)
-            # print(vh.script)
+        with tracer.span("vehicle_export"):
+            vhs = []
+            for color in vehicles:
+                color_code = CONST.RED_RGBA
+                if color == "blue":
+                    color_code = CONST.BLUE_RGBA
+                vehicle = vehicles[color]
+                angle = vehicle["vehicle_info"]["0"]["angle_of_car"]
+                orig_pos = vehicle["snapshots"][0]["center_of_car"]
+                distorted_height = height * CONST.CAR_LENGTH_SIM / car_length
+                x = orig_pos[0] * CONST.CAR_LENGTH_SIM / car_length
+                y = distorted_height - (orig_pos[1] * CONST.CAR_LENGTH_SIM / car_length)
+                vh = Vehicle(
+                    script=vehicle["trajectories"]["script_trajectory"],
+                    pos=(round(x, 1), round(y, 1), 0),
+                    rot=(0, 0, -angle - 90),
+                    color=color,
+                    color_code=color_code,
+                    debug_script=vehicle["trajectories"]["debug_trajectory"],
+                    spheres=vehicle["trajectories"]["spheres"],
+                    delay=vehicle["trajectories"]["delay"]
+                )
+                vh.set_speed()
+                vhs.append(vh)
+                # print(vh.color)
+                # print(vh.script)
 
         print("==================================================")
         print("==================================================\n\n")
@@ -171,105 +292,96 @@ def run(accident_sketch: str):
         print("==================================================")
         print("EXTRACT ARROW INFORMATION")
 
-        diff = 0
         # Extract arrow direction
         kernel = np.ones((2, 2))
-        if os.path.exists(road_arrow_image_path):
-            img = cv2.imread(road_arrow_image_path)
-        else:
-            img = cv2.imread(road_image_path)
+        arrow_image_path = road_arrow_image_path if os.path.exists(road_arrow_image_path) else road_image_path
+
+        def extract_arrow():
+            diff, cm = ArrowAnalyzer(kernel=kernel, img=cv2.imread(arrow_image_path)).run()
+            return diff
 
-        diff, cm = ArrowAnalyzer(kernel=kernel, img=img).run()
+        with tracer.span("arrow") as span:
+            arrow_key = stage_cache.key("arrow", files=[arrow_image_path], code=ARROW_CODE, kernel=kernel)
+            diff, hit = stage_cache.fetch(arrow_key, extract_arrow)
+            logger.info(f"Arrow {'loaded from the cache' if hit else 'extracted'}")
+            span["cached"] = hit
 
         print("==================================================")
         print("==================================================\n\n")
 
-        if road_lanes["road_type"] > 0:
-            road_lanes = refine_roadlanes(copy.deepcopy(road_lanes))
-
-        lane_factory = categorize_roadlane(copy.deepcopy(road_lanes))
-        (image, baselines, segments) = lane_factory.run()
-        for i, segment in enumerate(segments):
-            analyzer = Analyzer(image=image, lanelines=baselines, segment=segment)
-            lane_dict = analyzer.search_laneline(num_points=12)
-            segment.lines = analyzer.categorize_laneline(lane_dict)
-            flipped_lines = segment.flip(image.shape[0])
-            segment.get_bng_segment(flipped_lines, a_ratio)
-            # analyzer.visualize(title=SKETCH_NAME, is_save=True)
-
-        def render_vehicle_trajectory(ax, vehicles):
-            for v in vehicles:
-                xs = [p['x'] for p in v.script]
-                ys = [p['y'] for p in v.script]
-                c = 'r' if v.color == "red" else 'b'
-                ax.plot(xs, ys, c=c, marker="x")
-            return ax
+        if road_map is not None:
+            with tracer.span("road_map"):
+                # The lanelets are in meters with the y axis up already, the lines are neither flipped nor scaled
+                segments = CommonRoadReader(road_map).segments()
+                for segment in segments:
+                    segment.get_bng_segment(segment.lines, 1.0)
+                logger.info(f"Roads loaded from the CommonRoad map {road_map}")
+        else:
+            with tracer.span("lane_analysis"):
+                if road_lanes["road_type"] > 0:
+                    road_lanes = refine_roadlanes(road_lanes)
+
+                lane_factory = categorize_roadlane(road_lanes)
+                (image, baselines, segments) = lane_factory.run()
+                for i, segment in enumerate(segments):
+                    analyzer = Analyzer(image=image, lanelines=baselines, segment=segment)
+                    with tracer.span("search_laneline", segment=i):
+                        lane_dict = analyzer.search_laneline(num_points=12)
+                    with tracer.span("categorize_laneline", segment=i):
+                        segment.lines = analyzer.categorize_laneline(lane_dict)
+                    with tracer.span("bng_segment", segment=i):
+                        flipped_lines = segment.flip(image.shape[0])
+                        segment.get_bng_segment(flipped_lines, a_ratio)
+                    # analyzer.visualize(title=SKETCH_NAME, is_save=True)
 
-        print("==================================================")
-        print("==================================================")
-        print("==================================================")
-        print("==================================================")
-        plt.clf()
-        fig, ax = plt.subplots(2, 3, figsize=(20, 12))
-        fig.suptitle(f'Case: {SKETCH_NAME} - Arrow: {diff}', fontsize=40)
-        ax[0][0].imshow(image, cmap="gray", origin="lower")
-        # ax[0][0] = visualize_crisce_sketch(ax[0][0], roads["sketch_lane_width"][0], roads["large_lane_midpoints"])
-        ax[0][0].title.set_text("Road Sketch")
-        ax[0][0].set_aspect("equal")
-
-        ax[0][1] = visualize_crisce_simlanes(ax[0][1], roads["scaled_lane_width"], roads["simulation_lane_midpoints"])
-        ax[0][1].title.set_text("CRISCE Road")
-        ax[0][1].set_aspect("equal")
-
-        ax[0][2] = visualize_crisce_simlanes(ax[0][2], roads["scaled_lane_width"], roads["simulation_lane_midpoints"])
-        ax[0][2].title.set_text("CRISCE Road with Vehicle Trajectory")
-        ax[0][2].set_aspect("equal")
-
-        for segment in segments:
-            ax[1][0] = segment.visualize(ax[1][0], segment.lines)
-        ax[1][0].set_aspect("equal")
-
-        for segment in segments:
-            sm: Segment = segment
-            flipped_lines = sm.flip(image.shape[0])
-            ax[1][1] = sm.visualize(ax[1][1], flipped_lines, "Rotate the coordinates")
-        ax[1][1].set_aspect("equal")
 
         # Remove overlapping lines
-        original_lines = {}
-        for i, segment in enumerate(segments):
-            sm: Segment = segment
-            original_lines[i] = sm.bng_segment.get_lines()
-        try:
-            slash = Slash(original_lines)
-            modified_lines = slash.simplify()
-        except Exception as e:
-            print("Overlapping Remove Exception")
-            modified_lines = original_lines
-
-        for i, segment in enumerate(segments):
-            bng_segment: BngSegement = segment.bng_segment
-            bng_segment.set_lines(modified_lines[i])
-            ax[1][2] = bng_segment.visualize(ax[1][2], show_center=False)
-        ax[1][2].set_aspect("equal")
-        ax[1][2].title.set_text("Final Road with Lane Marking")
-
-        ax[0][0] = render_vehicle_trajectory(ax[0][0], vhs)
-        ax[0][2] = render_vehicle_trajectory(ax[0][2], vhs)
-        ax[1][0] = render_vehicle_trajectory(ax[1][0], vhs)
-        ax[1][1] = render_vehicle_trajectory(ax[1][1], vhs)
-        ax[1][2] = render_vehicle_trajectory(ax[1][2], vhs)
-        plt.show()
+        with tracer.span("slash"):
+            original_lines = {}
+            for i, segment in enumerate(segments):
+                sm: Segment = segment
+                original_lines[i] = sm.bng_segment.get_lines()
+            try:
+                slash = Slash(original_lines)
+                modified_lines = slash.simplify()
+            except Exception as e:
+                print("Overlapping Remove Exception")
+                modified_lines = original_lines
+
+            for i, segment in enumerate(segments):
+                bng_segment: BngSegement = segment.bng_segment
+                bng_segment.set_lines(modified_lines[i])
+
+        fig = None
+        with tracer.span("figure"):
+            if figure and road_map is None:
+                fig = render_figure(SKETCH_NAME, diff, image, roads, segments, vhs)
+                if not headless:
+                    import matplotlib.pyplot as plt
+                    plt.show()
         print("==================================================")
         print("==================================================")
 
         print("Data Export Handler")
-        dh = DataHandler(sketch_name=SKETCH_NAME,
-                         vehicles=vhs,
-                         roads=[sm.bng_segment for sm in segments],
-                         rot_deg=diff)
-        dh.to_json()
-
-        fig.savefig(f'outputs/{SKETCH_NAME}/viz.png', bbox_inches="tight")
+        with tracer.span("data_handler"):
+            dh = DataHandler(sketch_name=SKETCH_NAME,
+                             vehicles=vhs,
+                             roads=[sm.bng_segment for sm in segments],
+                             rot_deg=diff)
+            if CONST.FORMAT_JSON in formats:
+                dh.to_json()
+            if CONST.FORMAT_COMMONROAD in formats:
+                dh.to_commonroad()
+            if CONST.FORMAT_COLUMNAR in formats:
+                dh.to_columnar()
+
+        with tracer.span("save_figure"):
+            if fig is not None:
+                fig.savefig(f'outputs/{SKETCH_NAME}/viz.png', bbox_inches="tight")
     finally:
-        pass
+        artifact_writer.close()
+        if headless and "matplotlib.pyplot" in sys.modules:
+            sys.modules["matplotlib.pyplot"].close("all")
+        if trace:
+            tracer.write(os.path.join("outputs", case_name(accident_sketch), "trace.json"))
+    return tracer.records()
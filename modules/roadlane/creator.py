@@ -73,6 +73,11 @@ class ParallelCreator(RoadwayCreator):
 
 
 def refine_roadlanes(roadway_data):
+    """
+    Turn the roads into a single parallel road when every road is parallel to the next one. The given roadway
+    data is not modified, the refined one is a shallow copy.
+    """
+    roadway_data = dict(roadway_data)
     i, lst_dicts = 0, list()
     for road in roadway_data["roads"]:
         lst_dicts.append({
@@ -0,0 +1,118 @@
+import os
+import sys
+import json
+import time
+import contextlib
+from typing import List
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+
+def max_rss():
+    """
+    Peak resident set size of the process in bytes, None when the platform does not report it
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class Tracer():
+    """
+    Records nested spans of the pipeline stages with their wall time, CPU time and peak resident set size.
+    A span is opened with the span context manager, spans opened inside it are its children. The peak RSS is the
+    high-water mark of the whole process at the end of the span, rss_growth is how much the span raised it.
+    A disabled tracer records nothing, so the stages can always be instrumented.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self.spans = list()
+        self.stack = list()
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        """
+        Record the block as a span
+
+        Args:
+            name: the name of the span
+            args: attributes of the span, the yielded dict, which the block may update (e.g. a cache hit)
+        """
+        if not self.enabled:
+            yield args
+            return
+        path = "/".join([s["path"] for s in self.stack[-1:]] + [name])
+        record = {"name": name, "path": path, "depth": len(self.stack), "args": args}
+        self.stack.append(record)
+        start_wall, start_cpu, start_rss = time.perf_counter(), time.process_time(), max_rss()
+        try:
+            yield args
+        except BaseException as ex:
+            args["error"] = type(ex).__name__
+            raise
+        finally:
+            end_rss = max_rss()
+            self.stack.pop()
+            record["start"] = start_wall - self.origin
+            record["wall_time"] = time.perf_counter() - start_wall
+            record["cpu_time"] = time.process_time() - start_cpu
+            record["max_rss"] = end_rss
+            record["rss_growth"] = None if end_rss is None else end_rss - start_rss
+            self.spans.append(record)
+
+    def records(self) -> List[dict]:
+        """ The finished spans in the order they started """
+        return sorted(self.spans, key=lambda s: (s["start"], s["depth"]))
+
+    def chrome_trace(self) -> dict:
+        """
+        The spans in the Chrome trace event format (chrome://tracing, Perfetto) as complete events, the span
+        records are kept under "spans"
+        """
+        pid = os.getpid()
+        events = list()
+        for span in self.records():
+            args = dict(span["args"], path=span["path"], cpu_time=span["cpu_time"], max_rss=span["max_rss"],
+                        rss_growth=span["rss_growth"])
+            events.append({"name": span["name"], "cat": span["path"].split("/")[0], "ph": "X", "pid": pid, "tid": 0,
+                           "ts": span["start"] * 1e6, "dur": span["wall_time"] * 1e6, "args": args})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "spans": self.records()}
+
+    def write(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as outfile:
+            json.dump(self.chrome_trace(), outfile, indent=1, default=str)
+
+
+def aggregate(traces: List[List[dict]]) -> dict:
+    """
+    Aggregate the spans of many runs by span path
+
+    Args:
+        traces: the span records of every run
+    Returns:
+        dict of path to the number of spans, the total, mean and max wall and CPU times and the max peak RSS
+    """
+    stages = dict()
+    for spans in traces:
+        for span in spans:
+            stage = stages.setdefault(span["path"], {"count": 0, "wall_time": [], "cpu_time": [], "max_rss": None})
+            stage["count"] += 1
+            stage["wall_time"].append(span["wall_time"])
+            stage["cpu_time"].append(span["cpu_time"])
+            if span["max_rss"] is not None:
+                stage["max_rss"] = max(span["max_rss"], stage["max_rss"] or 0)
+    for stage in stages.values():
+        for measure in ["wall_time", "cpu_time"]:
+            values = stage[measure]
+            stage[measure] = {"total": sum(values), "mean": sum(values) / len(values), "max": max(values)}
+    return stages
@@ -1,7 +1,9 @@
+import warnings
 from math import hypot
 from typing import List
 from shapely.geometry import Polygon, LineString, Point, MultiLineString
-import matplotlib.pyplot as plt
+from shapely.geometry.base import BaseGeometry
+from shapely.strtree import STRtree
 
 
 def get_poly(lines):
@@ -47,6 +49,7 @@ def transform(lines: List, poly: Polygon):
         try:
             lines[i] = list(lines[i].coords)
         except Exception as ex:
+            import matplotlib.pyplot as plt
             fig, ax = plt.subplots()
             xs = [p[0] for p in lines[i].geoms[0].coords]
             ys = [p[1] for p in lines[i].geoms[0].coords]
@@ -66,3 +69,52 @@ def collapse(sm: dict, poly: Polygon):
 
 def length(ls):
     return sum(hypot(x1 - x2, y1 - y2) for (x1, y1), (x2, y2) in zip(ls, ls[1:]))
+
+
+def as_linestring(line: List):
+    return LineString([[p[0], p[1]] for p in line])
+
+
+def clip(ls: LineString, poly: Polygon, prepared, unchanged: List):
+    """
+    Remove the part of a line inside a polygon, as transform does, without copying the line.
+
+    Args:
+        ls (LineString): the line.
+        poly (Polygon): the polygon.
+        prepared (PreparedGeometry): the prepared polygon, which answers the intersection test.
+        unchanged (List): the 2-D coordinates of the line, returned as they are when it does not intersect.
+    Returns:
+        the 2-D coordinates of the longest remaining part of the line.
+    """
+    if not prepared.intersects(ls):
+        return unchanged
+    rest = ls.difference(ls.intersection(poly))
+    if type(rest) == MultiLineString:
+        longest_lst, max_points = None, 0
+        for lst in rest.geoms:
+            if len(lst.coords) > max_points:
+                max_points = len(lst.coords)
+                longest_lst = lst
+        rest = longest_lst
+    assert type(rest) == LineString
+    return list(rest.coords)
+
+
+def build_tree(geoms: List):
+    """
+    STRtree of geometries, and a query returning the indices of the geometries whose bounding box intersects
+    the one of a geometry. Shapely < 2 returns the geometries themselves, Shapely 2 their indices.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        tree = STRtree(geoms)
+    indices = {id(g): i for i, g in enumerate(geoms)}
+
+    def query(geom):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            found = tree.query(geom)
+        return sorted(indices[id(g)] if isinstance(g, BaseGeometry) else int(g) for g in found)
+
+    return query
@@ -1,8 +1,6 @@
-import copy
-from itertools import combinations
-import matplotlib.pyplot as plt
+from shapely.prepared import prep
 from .visualization import draw
-from .common import get_poly, collapse, length
+from .common import get_poly, length, as_linestring, clip, build_tree
 
 
 class Slash:
@@ -10,6 +8,7 @@ class Slash:
         self.sm = sm
 
     def visualize(self):
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots()
         for k in self.sm.keys():
             def viz(ax, sm):
@@ -24,50 +23,74 @@ class Slash:
         plt.show()
 
     def simplify(self, is_visual: bool = False):
+        """
+        Remove the overlapping parts of the lines of every segment. Each line of a segment is clipped by the
+        polygon of every other segment, and the shortest clipped line is kept.
+
+        The polygons and lines are built once. An STRtree finds the segments whose polygons have intersecting
+        bounding boxes, and only those are clipped, against prepared polygons. Any other segment leaves the lines
+        unchanged (as 2-D coordinates), so one unchanged candidate stands for a run of them.
+        """
         if is_visual:
             self.visualize()
 
         sm = self.sm
+        keys = list(sm.keys())
+        if len(keys) < 2:
+            # A single segment has nothing to overlap with
+            return self.sm
+
+        polys = [get_poly(sm[k]) for k in keys]
+        prepared = [prep(p) for p in polys]
+        query = build_tree(polys)
+        lines, unchanged = {}, {}
+        for k in keys:
+            lines[k] = {side: as_linestring(sm[k][side]) for side in ['l', 'r']}
+            lines[k]['m'] = [as_linestring(m) for m in sm[k]['m']]
+            unchanged[k] = {side: list(lines[k][side].coords) for side in ['l', 'r']}
+            unchanged[k]['m'] = [list(m.coords) for m in lines[k]['m']]
+
+        def clip_segment(k, j):
+            tm = {side: clip(lines[k][side], polys[j], prepared[j], unchanged[k][side]) for side in ['l', 'r']}
+            tm['m'] = [clip(m, polys[j], prepared[j], u) for m, u in zip(lines[k]['m'], unchanged[k]['m'])]
+            return tm
+
+        def has_others(i, start, stop):
+            """ Whether a segment other than i lies strictly between the indices start and stop """
+            return stop - start - 1 - (1 if start < i < stop else 0) > 0
+
+        simplified = {}
+        for i, k in enumerate(keys):
+            # Candidates in the order of the other segments
+            candidates, previous = [], -1
+            for j in query(polys[i]):
+                if j == i:
+                    continue
+                if has_others(i, previous, j):
+                    candidates.append(unchanged[k])
+                candidates.append(clip_segment(k, j))
+                previous = j
+            if has_others(i, previous, len(keys)):
+                candidates.append(unchanged[k])
 
-        # Find list of pairs of segments and collect lines of them
-        dd = {}
-        for (k1, k2) in combinations(list(sm.keys()), 2):
-            l1, l2 = sm[k1], sm[k2]
-            p1 = get_poly(l1)
-            p2 = get_poly(l2)
-
-            sm1 = collapse(copy.deepcopy(sm[k1]), p2)
-            sm2 = collapse(copy.deepcopy(sm[k2]), p1)
-            if k1 in dd:
-                dd[k1].append(sm1)
-            else:
-                dd[k1] = [sm1]
-            if k2 in dd:
-                dd[k2].append(sm2)
-            else:
-                dd[k2] = [sm2]
-
-        for k in sm.keys():
             tsm = {'l': [], 'r': [], 'm': []}
-            for tm in dd[k]:
+            lengths = {'l': 0, 'r': 0, 'm': []}
+            for tm in candidates:
                 for side in ['l', 'r']:
-                    if len(tsm[side]) == 0:
-                        tsm[side] = tm[side]
-                    else:
-                        if length(tm[side]) < length(tsm[side]):
-                            tsm[side] = tm[side]
-                for i, m in enumerate(tm['m']):
-                    if len(tsm['m']) < i + 1:
+                    size = length(tm[side])
+                    if len(tsm[side]) == 0 or size < lengths[side]:
+                        tsm[side], lengths[side] = tm[side], size
+                for n, m in enumerate(tm['m']):
+                    size = length(m)
+                    if len(tsm['m']) < n + 1:
                         tsm['m'].append(m)
-                    else:
-                        if length(m) < length(tsm['m'][i]):
-                            tsm['m'][i] = m
+                        lengths['m'].append(size)
+                    elif size < lengths['m'][n]:
+                        tsm['m'][n], lengths['m'][n] = m, size
 
-            sm[k]['l'] = tsm['l']
-            sm[k]['r'] = tsm['r']
-            sm[k]['m'] = tsm['m']
+            simplified[k] = {**sm[k], 'l': tsm['l'], 'r': tsm['r'], 'm': tsm['m']}
 
-        self.sm = sm
+        self.sm = simplified
 
         if is_visual:
             self.visualize()
@@ -0,0 +1,4 @@
+"""
+Former implementations and synthetic inputs shared by the tests, which check the current code against them, and by
+the benchmarks, which time the current code against them.
+"""
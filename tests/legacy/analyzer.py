@@ -0,0 +1,89 @@
+""" Former sliding window lane search of modules.analyzer and its synthetic input """
+import numpy as np
+import cv2
+from math import ceil
+from shapely.geometry import Point, LineString
+
+from modules.analyzer import Winline
+from modules.analyzer.lib import create, find, analyze
+from modules.common import translate_ls_to_new_origin, get_dbscan_labels
+from modules.constant import CONST
+
+
+def legacy_del_oor_lines(img, ls):
+    """ Former Analyzer.del_oor_lines """
+    oor_lines = dict()
+    step, stop = 0, False
+    while stop is False:
+        window_line = translate_ls_to_new_origin(ls, Point(step, 0))
+        if list(window_line.coords)[-1][1] < 0:
+            window_line = translate_ls_to_new_origin(ls, Point(step, img.shape[0]))
+        invalid_line = False
+        for point in list(window_line.coords):
+            if point[0] < 0:
+                invalid_line = True
+                oor_lines[step] = Winline(id=step, points=list(window_line.coords))
+                step = step + 1
+                break
+        if invalid_line is False:
+            stop = True
+    return step, oor_lines
+
+
+def legacy_find_lines(img, ls, starting_x, outlier_threshold, num_points=10):
+    """ Former Analyzer.find_lines """
+    good_lines, bad_lines = dict(), dict()
+    first_x_valid, starting_color_index = -1, 0
+    x = starting_x
+    while x < img.shape[1]:
+        expected_num_points = num_points + starting_color_index
+        window_line = create(img=img, point_x=x, ls=ls, num_points=expected_num_points)
+        coords = [(ceil(p[0]), ceil(p[1])) for p in list(window_line.coords[starting_color_index:])]
+        total, points = 0, list()
+        for p in coords:
+            try:
+                total += int(img[p[1], p[0]])
+                points.append(p)
+            except IndexError:
+                pass
+        if len(points) > 1 and outlier_threshold > 0:
+            labels = get_dbscan_labels(X=points, distance=outlier_threshold)
+            points = [p for l, p in zip(labels, points) if l > -1]
+        if total > 0:
+            length, non_zeros, zeros = analyze(points=points, img=img)
+            # The former version raised ZeroDivisionError when the outlier filter removed every point
+            if length == 0 or zeros / length >= CONST.MAX_PERCENTAGE_ZEROS:
+                bad_lines[x] = Winline(id=x, points=list(window_line.coords))
+            else:
+                if first_x_valid == -1:
+                    first_x_valid = x
+                    starting_color_index = find(points=points, img=img)
+                    continue
+                good_lines[x] = Winline(id=x, points=points, total=total, zero_perc=zeros / length)
+        else:
+            bad_lines[x] = Winline(id=x, points=list(window_line.coords))
+        x = x + 1
+    return good_lines, bad_lines
+
+
+def synthetic_segment(width=400, height=300, seed=0):
+    """ A rotated road image with a solid, a dashed and a double lane line, and a slightly curved baseline """
+    rng = np.random.default_rng(seed)
+    img = np.zeros((height, width), dtype=np.uint8)
+    cv2.line(img, (60, 0), (70, height - 1), 255, 3)
+    for y in range(0, height, 40):
+        cv2.line(img, (200, y), (203, y + 20), 255, 3)
+    cv2.line(img, (330, 0), (335, height - 1), 255, 2)
+    cv2.line(img, (340, 0), (345, height - 1), 255, 2)
+    noise = rng.random(img.shape) < 0.01
+    img[noise] = 255
+    ys = np.linspace(-5, height + 5, 25)
+    xs = 30 + 8 * np.sin(ys / height * np.pi) + rng.normal(0, 0.3, len(ys))
+    return img, LineString(np.stack([xs, ys], axis=1))
+
+
+def same_lines(expected, actual):
+    if list(expected) != list(actual):
+        return False
+    return all(e.points == a.points and e.total == a.total and e.zero_perc == a.zero_perc
+               for e, a in zip(expected.values(), actual.values()))
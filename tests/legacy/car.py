@@ -0,0 +1,137 @@
+"""
+Former vehicle extraction steps of modules.crisce.car and their synthetic inputs: rotated boxes along two crossing
+paths, with the nodes of Car.edgesofTheCar, drawn as colored boxes with a white triangle on a white sketch.
+"""
+import itertools
+import numpy as np
+import cv2
+
+from modules.crisce.car import Car
+
+
+def legacy_segmentation(pre_process, image):
+    """ Former color segmentation of Car.extractVehicleInformation, with its debug images """
+    hsv = pre_process.changeColorSpace(image, cv2.COLOR_BGR2HSV)
+    mask_r, mask_b = pre_process.getMaskWithRange(image=hsv)
+    result_r = pre_process.bitwiseAndOperation(image=image, mask=mask_r)
+    result_b = pre_process.bitwiseAndOperation(image=image, mask=mask_b)
+    mask_result_r = np.hstack([cv2.merge([mask_r, mask_r, mask_r]), result_r])
+    mask_result_b = np.hstack([cv2.merge([mask_b, mask_b, mask_b]), result_b])
+    blend_masks_r_b = pre_process.bitwiseOrOperation(mask_b, mask_r)
+    blend_masks_res = pre_process.bitwiseOrOperation(result_b, result_r)
+    mask_r_blur = pre_process.blurImage(mask_r, (5, 5), 0)
+    mask_b_blur = pre_process.blurImage(mask_b, (3, 3), 0)
+    opening_r = pre_process.applyMorphologicalOperation(mask_r_blur, (5, 5), cv2.MORPH_OPEN)
+    opening_b = pre_process.applyMorphologicalOperation(mask_b_blur, (5, 5), cv2.MORPH_OPEN)
+    return {"red": mask_r, "blue": mask_b}, {"red": opening_r, "blue": opening_b}
+
+
+def legacy_closest_nodes(stacks):
+    """ Former nested loops of Car.extractingCrashPoint, over the snapshots of different colors """
+    crash_ed_cal = list()
+    for color_1, color_2 in itertools.combinations(stacks, 2):
+        for vehicle1_nodes, vehicle2_nodes in itertools.product(stacks[color_1], stacks[color_2]):
+            point_dist = list()
+            for point_1 in vehicle1_nodes:
+                for point_2 in vehicle2_nodes:
+                    crash_ed = cv2.norm(np.array(point_1) - np.array(point_2), cv2.NORM_L2)
+                    point_dist.append([crash_ed, point_1, point_2])
+            crash_ed_cal.append(min(point_dist))
+    return min(crash_ed_cal)
+
+
+def legacy_extract_triangle(vehicles, image):
+    """ Former Car.extractTriangle, on the whole image for every snapshot """
+    positions = dict()
+    for vehicle_color in vehicles:
+        for vehicle_id in vehicles[vehicle_color]['vehicle_info']:
+            test = np.zeros_like(image)
+            box_points = vehicles[vehicle_color]['vehicle_info'][vehicle_id]["vehicle_nodes"][:4]
+            roi = cv2.fillPoly(test, np.array([box_points]), (255, 255, 255))
+            roi = cv2.bitwise_and(image, image, mask=roi[:, :, 0])
+            roi = cv2.bitwise_not(roi)
+            gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+            blur = cv2.blur(gray, (3, 3), 0)
+            _, thresh = cv2.threshold(blur, 15, 255, cv2.THRESH_BINARY)
+            thresh = cv2.bitwise_not(thresh)
+            cnts, hierarchy = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+            cnt = max(cnts, key=cv2.contourArea)
+            rect = cv2.minAreaRect(cnt)
+            cv2.circle(image, (int(rect[0][0]), int(rect[0][1])), 2, (255, 128, 0), -1)
+            positions[(vehicle_color, vehicle_id)] = tuple([int(rect[0][0]), int(rect[0][1])])
+    return positions
+
+
+def legacy_projected_sides(car, v_color, h, w):
+    """ Former frame sides of Car.generateSequenceOfMovements and Car.extractVehicleProjectedSide """
+    range_w, range_h = list(range(0, w)), list(range(0, h))
+    enviro_frame = {"TOP": list(zip(range_w, [0] * len(range_w))),
+                    "BOTTOM": list(zip(range_w, [h] * len(range_w))),
+                    "LEFT": list(zip([0] * len(range_h), range_h)),
+                    "RIGHT": list(zip([w] * len(range_h), range_h))}
+    projections = list()
+    for side_name, side in enviro_frame.items():
+        side_value = np.array(side)
+        oriented_vehicles = list()
+        for v_id in car.vehicles[v_color]["vehicle_info"]:
+            veh_angle = car.vehicles[v_color]["vehicle_info"][v_id]["angle_of_car"]
+            points_along_width = np.asarray(car.vehicles[v_color]["vehicle_info"][v_id]["nodes_on_width"], np.int32)
+            triangle_position = np.asarray(car.vehicles[v_color]["vehicle_info"][v_id]["triangle_position"], np.int32)
+            front_point = car.pointNearNodes(points_along_width, triangle_position)[:, 1:][0]
+            dx = side_value[:, 0] - front_point[0]
+            dy = side_value[:, 1] - front_point[1]
+            projected_angles = np.arctan2(dy, dx) * 180 / np.pi
+            side_results = [-round(angle) if angle < 0 else (-round(angle) + 360) for angle in projected_angles]
+            if round(veh_angle) in side_results:
+                oriented_vehicles.append(v_id)
+        projections.append([len(oriented_vehicles), side_name, oriented_vehicles])
+    return projections
+
+
+def projected_sides(car, v_color, h, w):
+    projections = list()
+    for side in car.frameReference(h, w).items():
+        orient_count, oriented_vehicles = car.extractVehicleProjectedSide(v_color, side)
+        projections.append([orient_count, side[0], oriented_vehicles])
+    return projections
+
+
+def synthetic_sketch(num_snapshots, width=1000, height=1000, seed=0):
+    """ A Car whose snapshots are drawn on a white sketch, some of them crossing the image borders """
+    car = synthetic_vehicles(num_snapshots, width=width, height=height, seed=seed)
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    colors = {"red": (0, 0, 255), "blue": (255, 0, 0)}
+    for vehicle_color in car.vehicles:
+        for snapshot in car.vehicles[vehicle_color]["vehicle_info"].values():
+            box = np.array(snapshot["vehicle_nodes"][:4], dtype=np.int32)
+            cv2.fillPoly(image, [box], colors[vehicle_color])
+            front = (box[1] + box[2]) / 2
+            center = box.mean(axis=0)
+            tip = center + (front - center) * 0.6
+            side = (box[2] - box[1]) * 0.3
+            base = center - (front - center) * 0.2
+            cv2.fillPoly(image, [np.int32([tip, base + side, base - side])], (255, 255, 255))
+    return car, image
+
+
+def synthetic_vehicles(num_snapshots, width=1000, height=1000, seed=0):
+    """ Car.vehicles with num_snapshots snapshots per color """
+    rng = np.random.default_rng(seed)
+    car = Car()
+    for k, vehicle_color in enumerate(["red", "blue"]):
+        car.vehicles[vehicle_color]["vehicle_info"] = dict()
+        for i in range(num_snapshots):
+            t = i / max(1, num_snapshots - 1)
+            center = (width * (0.02 + 0.96 * t), height / 2) if k == 0 else (width / 2, height * (0.02 + 0.96 * t))
+            rect = (center, (60, 30), float(rng.uniform(0, 180)))
+            box = np.int0(cv2.boxPoints(rect))
+            nodes, nodes_on_width = car.edgesofTheCar(box, 30)
+            car.vehicles[vehicle_color]["vehicle_info"][str(i)] = {
+                "vehicle_nodes": nodes, "nodes_on_width": nodes_on_width, "center_of_car": center,
+                "triangle_position": (int(center[0]), int(center[1])), "angle_of_car": float(rng.uniform(0, 360))}
+    return car
+
+
+def stacks_of(car):
+    return {color: [car.vehicles[color]["vehicle_info"][v_id]["vehicle_nodes"]
+                    for v_id in car.vehicles[color]["vehicle_info"]] for color in car.vehicles}
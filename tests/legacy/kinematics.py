@@ -0,0 +1,56 @@
+"""
+Former script generation steps of modules.crisce.kinematics and their synthetic inputs: a red and a blue vehicle on
+noisy crossing paths, the blue one being shorter so that it is delayed.
+"""
+import numpy as np
+
+from modules.crisce.kinematics import Kinematics
+
+
+def legacy_arc_length(trajectory):
+    """ Former arc length of Kinematics.calculateTrajectoryArcLength, its first segment is counted twice """
+    npts = len(trajectory)
+    x = trajectory[:, 0]
+    y = trajectory[:, 1]
+    arc = np.sqrt((x[1] - x[0]) ** 2 + (y[1] - y[0]) ** 2)
+    for k in range(1, npts):
+        arc = arc + np.sqrt((x[k] - x[k - 1]) ** 2 + (y[k] - y[k - 1]) ** 2)
+    return arc
+
+
+def legacy_script(trajectory, time_stamp, start):
+    """ Former nodes of Kinematics.convertingToScriptFormat """
+    return [{'x': p[0], 'y': p[1], 'z': 0, "t": i * time_stamp + start} for i, p in enumerate(trajectory)]
+
+
+def synthetic_vehicles(num_points, seed=0):
+    rng = np.random.default_rng(seed)
+    vehicles = dict()
+    for color, length in [("red", 60.0), ("blue", 40.0)]:
+        path = np.linspace(0, length, num_points)
+        trajectory = np.stack([path, 25 + rng.normal(0, 0.05, num_points)], axis=1)
+        if color == "blue":
+            trajectory = trajectory[:, ::-1]
+        vehicles[color] = {"trajectories": {"simulation_trajectory": trajectory, "distorted_trajectory": trajectory},
+                           "snapshots": [None, None]}
+    return vehicles
+
+
+def plan(vehicles):
+    kinematics = Kinematics.__new__(Kinematics)
+    kinematics.vehicles = vehicles
+    kinematics.time_efficiency = dict()
+    kinematics.calculateTrajectoryArcLength()
+    kinematics.calTimeStampsForTrajectory()
+    kinematics.convertingToScriptFormat()
+    return kinematics.vehicles
+
+
+def legacy_plan(vehicles):
+    """ The former arc lengths and scripts, with the time stamps and delays computed by Kinematics """
+    scripts = dict()
+    for color, vehicle in vehicles.items():
+        trajectory, delay = vehicle["trajectories"]["simulation_trajectory"], vehicle["trajectories"]["delay"]
+        scripts[color] = (legacy_arc_length(trajectory),
+                          legacy_script(trajectory, vehicle["kinematics"]["time_stamp"], delay))
+    return scripts
@@ -0,0 +1,29 @@
+"""
+Synthetic roads of the outputs (data.json, the columnar output and commonroad.xml): roads along x whose stripes are
+built from their y offsets, with the attributes of the roads of the pipeline read by the writers.
+"""
+import numpy as np
+from types import SimpleNamespace
+
+from modules.constant import CONST
+from modules.models import Stripe
+
+
+def stripe(y, xs=range(5), num=-1, pattern='-1', width=0.1):
+    """ A stripe along x at y, a single offset or the offset of every point """
+    ys = np.broadcast_to(np.asarray(y, dtype=np.float64), (len(xs),)).tolist()
+    return Stripe([(x, y, 0, width) for x, y in zip(xs, ys)], num, pattern)
+
+
+def road(left, right, marks=(), center=None, width=7):
+    return SimpleNamespace(left=left, center=center, right=right, marks=list(marks), width=width)
+
+
+def two_lanes(xs=range(5), mark_xs=None, marks=True):
+    """
+    Two lanes along x of width 7: solid single stripes at the top (y = 7) and at the bottom (y = 0), and a dashed
+    double stripe between them (y = 3.5) unless marks is False
+    """
+    mark_xs = xs if mark_xs is None else mark_xs
+    return road(stripe(7, xs, CONST.SINGLE, CONST.SOLID), stripe(0, xs, CONST.SINGLE, CONST.SOLID),
+                [stripe(3.5, mark_xs, CONST.DOUBLE, CONST.DASHED)] if marks else [], center=stripe(3.5, xs, width=7))
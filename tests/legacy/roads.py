@@ -0,0 +1,69 @@
+""" Former road extraction helpers of modules.crisce.roads and their synthetic inputs """
+import math
+import numpy as np
+import cv2
+
+
+def legacy_nearest_point_pairs(points_1, points_2):
+    """ Former nested loops of Roads.midpointOfFourWayAndTSection """
+    ed_bet_two_lanes = list()
+    for point_lane_1 in points_1:
+        temp_list = list()
+        for point_lane_2 in points_2:
+            euclidean_distance = math.sqrt(
+                math.pow((point_lane_2[0] - point_lane_1[0]), 2) +
+                math.pow((point_lane_2[1] - point_lane_1[1]), 2))
+            temp_list.append([euclidean_distance, point_lane_1.tolist(), point_lane_2.tolist()])
+        ed_bet_two_lanes.append(min(temp_list))
+    return ed_bet_two_lanes
+
+
+def legacy_remove_redundant_midpoints(midpoint_of_lane, sample_size):
+    """ Former Roads.removeRedundantMidpointsOfLane """
+    while(1):
+        adjusted_midpoints_of_lane = list()
+        final_road_points = list()
+        for pt in midpoint_of_lane:
+            if pt not in final_road_points:
+                final_road_points.append(pt)
+
+        check_redundancy = list()
+        for i, point in enumerate(final_road_points):
+            if (i != len(final_road_points) - 1):
+                ref_point = np.array(final_road_points[i])
+                road_points = np.array(final_road_points)
+                edist = np.sqrt(((road_points[:, 0] - ref_point[0]) ** 2 + (road_points[:, 1] - ref_point[1]) ** 2))
+                edist = edist.reshape(edist.shape[0], -1)
+                road_points = road_points.reshape(road_points.shape[0], -1)
+                edist_road_points = np.hstack([edist, road_points])
+                nearest_point = edist_road_points[edist_road_points[:, 0].argsort()][1]
+                nearest_point_dist = nearest_point.tolist()[0]
+                nearest_point_value = nearest_point.tolist()[1:]
+                current_point = ref_point.tolist()
+                if nearest_point_dist <= (sample_size - 2):
+                    point = [(current_point[0] + nearest_point_value[0]) / 2,
+                             (current_point[1] + nearest_point_value[1]) / 2]
+                    adjusted_midpoints_of_lane.append(point)
+                    check_redundancy.append(1)
+                else:
+                    adjusted_midpoints_of_lane.append(point)
+                    check_redundancy.append(0)
+            else:
+                dist = cv2.norm(np.array(final_road_points[i]) - np.array(final_road_points[i - 1]), cv2.NORM_L2)
+                if (dist > (sample_size - 2)):
+                    adjusted_midpoints_of_lane.append(point)
+        midpoint_of_lane = adjusted_midpoints_of_lane
+        if sum(check_redundancy) < 1:
+            break
+
+    return midpoint_of_lane
+
+
+def synthetic_midpoints(num_points, seed=0):
+    """ Midpoints of a long curved road (a spiral), with some jitter and duplicated points """
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, 6 * np.pi, num_points)
+    radius = 100 + 40 * t
+    points = np.stack([radius * np.cos(t), radius * np.sin(t)], axis=1) + rng.normal(0, 2, size=(num_points, 2))
+    midpoints = points.tolist()
+    return midpoints + midpoints[::10]
@@ -0,0 +1,93 @@
+"""
+Synthetic accident sketches: straight, curved, T-section and 4-way roads with a red and a blue car driving towards
+each other and a direction arrow
+"""
+import os
+import numpy as np
+import cv2
+
+WIDTH, HEIGHT = 900, 600
+
+
+def draw_car(image, center, angle, color, scale):
+    """ A car of the sketch: a colored box with a white triangle pointing to its front """
+    length, width = 60 * scale, 30 * scale
+    box = np.int32(cv2.boxPoints((center, (length, width), angle)))
+    cv2.fillPoly(image, [box], color)
+    a = np.deg2rad(angle)
+    front = np.array(center) + np.array([np.cos(a), np.sin(a)]) * length * 0.3
+    tip = [front + 8 * scale * np.array([np.cos(a + da), np.sin(a + da)]) for da in [0, 2.3, -2.3]]
+    cv2.fillPoly(image, [np.int32(tip)], (255, 255, 255))
+
+
+def draw_road(kind, scale):
+    """
+    Road sketch and the poses (center, angle) of the snapshots of the red and the blue car
+
+    Returns:
+        road (np.array), red poses, blue poses
+    """
+    w, h = int(WIDTH * scale), int(HEIGHT * scale)
+    s = lambda *values: [int(v * scale) for v in values]
+    thickness = max(1, int(4 * scale))
+    road = np.full((h, w, 3), 255, np.uint8)
+    cx, cy, r = w // 2, h // 2, int(60 * scale)
+    if kind == "straight":
+        cv2.line(road, (0, cy - r), (w, cy - r), (0, 0, 0), thickness)
+        cv2.line(road, (0, cy + r), (w, cy + r), (0, 0, 0), thickness)
+        red = [((x, cy + r // 2), 0) for x in s(150, 300, 420)]
+        blue = [((x, cy - r // 2 + dy), 180) for x, dy in zip(s(750, 600, 500), s(0, 0, 25))]
+    elif kind == "curved":
+        # Concentric arcs around a center below the image
+        center, radius = (cx, int(h * 1.6)), int(h * 1.25)
+        for offset in [-r, r]:
+            cv2.ellipse(road, center, (radius + offset, radius + offset), 0, 180, 360, (0, 0, 0), thickness)
+
+        def pose(t, offset, backwards):
+            theta = np.deg2rad(180 + t)
+            point = (center[0] + (radius + offset) * np.cos(theta), center[1] + (radius + offset) * np.sin(theta))
+            return point, (t + 90 + (180 if backwards else 0)) % 360
+
+        red = [pose(t, r // 2, False) for t in [50, 65, 78]]
+        blue = [pose(t, -r // 2, True) for t in [130, 115, 102]]
+    elif kind == "t-section":
+        cv2.line(road, (0, cy - r), (w, cy - r), (0, 0, 0), thickness)
+        for sx in [-1, 1]:
+            cv2.polylines(road, [np.int32([(cx + sx * w, cy + r), (cx + sx * r, cy + r), (cx + sx * r, h)])], False,
+                          (0, 0, 0), thickness)
+        red = [((x, cy + r // 2), 0) for x in s(150, 270, 380)]
+        blue = [((cx + r // 2, y), 270) for y in [h - int(60 * scale), h - int(150 * scale), cy + int(95 * scale)]]
+    elif kind == "4-way":
+        for sx, sy in [(-1, -1), (1, -1), (-1, 1), (1, 1)]:
+            pts = [(cx + sx * r, cy + sy * h), (cx + sx * r, cy + sy * r), (cx + sx * w, cy + sy * r)]
+            cv2.polylines(road, [np.int32(pts)], False, (0, 0, 0), thickness)
+        red = [((x, cy + r // 2), 0) for x in s(150, 270, 380)]
+        blue = [((cx + r // 2, y), 270) for y in [h - int(60 * scale), h - int(150 * scale), cy + int(95 * scale)]]
+    else:
+        raise ValueError(f'Unknown road {kind}')
+    return road, red, blue
+
+
+def draw_arrow(scale):
+    """ Road image with a direction arrow pointing down, ArrowAnalyzer expects an arrow of a fixed size in pixels """
+    arrow = np.full((int(HEIGHT * scale), int(WIDTH * scale), 3), 255, np.uint8)
+    cv2.line(arrow, (100, 40), (100, 100), (0, 0, 0), 3)
+    cv2.line(arrow, (100, 115), (100, 140), (0, 0, 0), 3)
+    cv2.fillPoly(arrow, [np.int32([(80, 150), (120, 150), (100, 185)])], (0, 0, 0))
+    return arrow
+
+
+def synthetic_case(folder, kind, scale=1.0):
+    """ Write an accident sketch case: sketch.jpeg, road.jpeg, road_arrow.jpeg and external.csv """
+    os.makedirs(folder, exist_ok=True)
+    road, red, blue = draw_road(kind, scale)
+    sketch = road.copy()
+    for poses, color in [(red, (0, 0, 255)), (blue, (255, 0, 0))]:
+        for center, angle in poses:
+            draw_car(sketch, center, angle, color, scale)
+    cv2.imwrite(os.path.join(folder, "road.jpeg"), road)
+    cv2.imwrite(os.path.join(folder, "sketch.jpeg"), sketch)
+    cv2.imwrite(os.path.join(folder, "road_arrow.jpeg"), draw_arrow(scale))
+    with open(os.path.join(folder, "external.csv"), "w") as f:
+        f.write("vehicle_color,impact_point\nred,front_mid\nblue,front_mid\n")
+    return folder
@@ -0,0 +1,85 @@
+""" Former overlap removal of modules.wipe.Slash and its synthetic segments """
+import copy
+import math
+from itertools import combinations
+import numpy as np
+
+from modules.wipe.common import get_poly, collapse, length
+
+
+def legacy_simplify(sm):
+    """ Former Slash.simplify """
+    dd = {}
+    for (k1, k2) in combinations(list(sm.keys()), 2):
+        l1, l2 = sm[k1], sm[k2]
+        p1 = get_poly(l1)
+        p2 = get_poly(l2)
+
+        sm1 = collapse(copy.deepcopy(sm[k1]), p2)
+        sm2 = collapse(copy.deepcopy(sm[k2]), p1)
+        if k1 in dd:
+            dd[k1].append(sm1)
+        else:
+            dd[k1] = [sm1]
+        if k2 in dd:
+            dd[k2].append(sm2)
+        else:
+            dd[k2] = [sm2]
+
+    for k in sm.keys():
+        tsm = {'l': [], 'r': [], 'm': []}
+        for tm in dd[k]:
+            for side in ['l', 'r']:
+                if len(tsm[side]) == 0:
+                    tsm[side] = tm[side]
+                else:
+                    if length(tm[side]) < length(tsm[side]):
+                        tsm[side] = tm[side]
+            for i, m in enumerate(tm['m']):
+                if len(tsm['m']) < i + 1:
+                    tsm['m'].append(m)
+                else:
+                    if length(m) < length(tsm['m'][i]):
+                        tsm['m'][i] = m
+
+        sm[k]['l'] = tsm['l']
+        sm[k]['r'] = tsm['r']
+        sm[k]['m'] = tsm['m']
+    return sm
+
+
+def segment_lines(start, end, width, num_points=10, num_marks=1):
+    """ Lines of a straight segment in the format of BngSegement.get_lines """
+    start, end = np.asarray(start, dtype=float), np.asarray(end, dtype=float)
+    direction = (end - start) / np.linalg.norm(end - start)
+    normal = np.array([-direction[1], direction[0]])
+    ts = np.linspace(0, 1, num_points)[:, np.newaxis]
+    center = start + ts * (end - start)
+
+    def stripe(offset, stripe_width):
+        return [(x, y, 0, stripe_width) for x, y in (center + offset * normal).tolist()]
+
+    marks = [stripe(width * (i + 1) / (num_marks + 1) - width / 2, 0.1) for i in range(num_marks)]
+    return {"l": stripe(width / 2, 0.1), "r": stripe(-width / 2, 0.1), "c": stripe(0, width), "m": marks}
+
+
+def star_segments(num_legs, leg_length=200, width=20):
+    """ Segments of an intersection with num_legs legs starting slightly behind its centre """
+    segments = {}
+    for k in range(num_legs):
+        angle = 2 * math.pi * k / num_legs + 0.1
+        direction = np.array([math.cos(angle), math.sin(angle)])
+        segments[k] = segment_lines(-direction * width, direction * leg_length, width)
+    return segments
+
+
+def grid_segments(rows, cols, spacing=100, width=12):
+    """ Segments of a grid map, each road joins two neighbour crossings and overlaps them """
+    segments, k = {}, 0
+    for r in range(rows):
+        for c in range(cols):
+            origin = np.array([c * spacing, r * spacing], dtype=float)
+            for step in [np.array([spacing, 0.0]), np.array([0.0, spacing])]:
+                segments[k] = segment_lines(origin - step * 0.1, origin + step * 1.1, width)
+                k += 1
+    return segments
@@ -1,10 +1,28 @@
 import unittest
 import test_roadlane
 import test_analyzer
+import test_crisce
+import test_wipe
+import test_cache
+import test_trace
+import test_commonroad
+import test_columnar
+import test_data_handler
+import test_models
+import test_batch
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     loader = unittest.TestLoader()
     suite = test_roadlane.load_tests(loader)
     suite = test_analyzer.load_tests(suite, loader)
+    suite = test_crisce.load_tests(suite, loader)
+    suite = test_wipe.load_tests(suite, loader)
+    suite = test_cache.load_tests(suite, loader)
+    suite = test_trace.load_tests(suite, loader)
+    suite = test_commonroad.load_tests(suite, loader)
+    suite = test_columnar.load_tests(suite, loader)
+    suite = test_data_handler.load_tests(suite, loader)
+    suite = test_models.load_tests(suite, loader)
+    suite = test_batch.load_tests(suite, loader)
     runner.run(suite)
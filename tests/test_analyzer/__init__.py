@@ -1,8 +1,10 @@
 import unittest
 
 from .test_linear_analyzer import TestLinearAnalyzer
+from .test_window import TestSlidingWindow
 
 
 def load_tests(suite, loader):
     suite.addTests(loader.loadTestsFromTestCase(TestLinearAnalyzer))
+    suite.addTests(loader.loadTestsFromTestCase(TestSlidingWindow))
     return suite
\ No newline at end of file
@@ -0,0 +1,45 @@
+import unittest
+import warnings
+import numpy as np
+from sklearn.cluster import DBSCAN
+from modules.analyzer import SlidingWindow
+from modules.common import get_dbscan_labels, get_outlier_mask
+from tests.legacy.analyzer import legacy_del_oor_lines, legacy_find_lines, synthetic_segment, same_lines
+
+
+class TestSlidingWindow(unittest.TestCase):
+    def setUp(self):
+        warnings.simplefilter("ignore")
+        self.img, self.ls = synthetic_segment(160, 120, seed=3)
+
+    def test_del_oor_lines_matches_legacy(self):
+        step, oor_lines = legacy_del_oor_lines(self.img, self.ls)
+        actual_step, actual_oor_lines = SlidingWindow(self.img, self.ls).del_oor_lines()
+        self.assertEqual(actual_step, step)
+        self.assertTrue(same_lines(oor_lines, actual_oor_lines))
+
+    def test_find_lines_matches_legacy(self):
+        for outlier_threshold in [0, 5]:
+            good_lines, bad_lines = legacy_find_lines(self.img, self.ls, 0, outlier_threshold)
+            actual_good_lines, actual_bad_lines = SlidingWindow(self.img, self.ls).find_lines(0, outlier_threshold)
+            self.assertTrue(same_lines(good_lines, actual_good_lines))
+            self.assertTrue(same_lines(bad_lines, actual_bad_lines))
+
+    def test_outlier_mask_matches_dbscan(self):
+        rng = np.random.default_rng(11)
+        for dimension, min_samples in [(1, 2), (2, 2), (2, 3)]:
+            batch = rng.integers(0, 30, size=(40, 12, dimension))
+            mask = rng.random((40, 12)) > 0.2
+            noise = get_outlier_mask(batch, distance=4, min_samples=min_samples, mask=mask)
+            for points, valid, actual in zip(batch, mask, noise):
+                labels = DBSCAN(eps=4, min_samples=min_samples).fit(points[valid]).labels_
+                np.testing.assert_array_equal(actual[valid], labels == -1)
+                self.assertFalse(np.any(actual[~valid]))
+
+    def test_outlier_mask_of_1d_points(self):
+        labels = get_dbscan_labels(X=[[0], [1], [9]], distance=2)
+        np.testing.assert_array_equal(get_outlier_mask([0, 1, 9], distance=2), labels == -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
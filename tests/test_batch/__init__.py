@@ -0,0 +1,11 @@
+import unittest
+
+from .test_cases import TestCases
+from .test_run_batch import TestRunBatch, TestRunCase
+
+
+def load_tests(suite, loader):
+    suite.addTests(loader.loadTestsFromTestCase(TestCases))
+    suite.addTests(loader.loadTestsFromTestCase(TestRunBatch))
+    suite.addTests(loader.loadTestsFromTestCase(TestRunCase))
+    return suite
@@ -0,0 +1,32 @@
+import os
+import shutil
+import tempfile
+import unittest
+from modules.batch import collect_cases, run_batch
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        for case in ["a/1", "b/1", "a/2"]:
+            os.makedirs(os.path.join(self.folder, case))
+            open(os.path.join(self.folder, case, "sketch.jpeg"), "w").close()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def manifest(self, lines):
+        path = os.path.join(self.folder, "manifest.txt")
+        with open(path, "w") as f:
+            f.write("\n".join(lines))
+        return path
+
+    def test_repeated_case(self):
+        cases = collect_cases(self.manifest(["a/1", "a/2", "# a comment", "a/1", "a/../a/2"]))
+        self.assertEqual(cases, [os.path.join(self.folder, "a/1"), os.path.join(self.folder, "a/2")])
+
+    def test_same_name(self):
+        cases = collect_cases(self.manifest(["a/1", "b/1"]))
+        with self.assertRaisesRegex(ValueError, "1: "):
+            run_batch(cases, summary=os.path.join(self.folder, "summary.json"))
+        self.assertFalse(os.path.exists(os.path.join(self.folder, "summary.json")))
@@ -0,0 +1,85 @@
+import io
+import os
+import json
+import time
+import shutil
+import tempfile
+import unittest
+import contextlib
+from unittest import mock
+from modules import batch
+from modules.batch import run_batch, run_case, STATUS_SUCCESS, STATUS_FAILED, STATUS_SKIPPED, STATUS_INTERRUPTED
+
+
+class TestRunBatch(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.folder = tempfile.mkdtemp()
+        # The outputs are written to outputs/<case> of the working directory
+        os.chdir(self.folder)
+        self.cases = []
+        for name in ["done", "broken"]:
+            os.makedirs(os.path.join("cases", name))
+            # An empty file is not an image, the case fails
+            open(os.path.join("cases", name, "sketch.jpeg"), "w").close()
+            self.cases.append(os.path.join("cases", name))
+        # The output of done is newer than its sketch
+        os.makedirs(os.path.join("outputs", "done"))
+        with open(os.path.join("outputs", "done", "data.json"), "w") as f:
+            f.write("{}")
+        past = time.time() - 60
+        os.utime(os.path.join("cases", "done", "sketch.jpeg"), (past, past))
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder)
+
+    def run_batch(self, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return run_batch(self.cases, workers=1, summary="summary.json", **kwargs)
+
+    def test_resume(self):
+        report = self.run_batch()
+        self.assertEqual([case["status"] for case in report["cases"]], [STATUS_SKIPPED, STATUS_FAILED])
+        self.assertEqual((report["total"], report["success"], report["failed"], report["skipped"]), (2, 0, 1, 1))
+
+    def test_no_resume(self):
+        report = self.run_batch(resume=False)
+        self.assertEqual([case["status"] for case in report["cases"]], [STATUS_FAILED, STATUS_FAILED])
+        self.assertEqual((report["failed"], report["skipped"]), (2, 0))
+
+    def test_failure(self):
+        report = self.run_batch()
+        failure = report["cases"][1]
+        self.assertEqual(failure["name"], "broken")
+        self.assertTrue(failure["error"])
+        self.assertIn("Traceback", failure["traceback"])
+        # The summary file is the returned report
+        with open("summary.json") as f:
+            self.assertEqual(json.load(f), json.loads(json.dumps(report)))
+
+    def test_interrupted(self):
+        with mock.patch.object(batch, "as_completed", side_effect=KeyboardInterrupt):
+            report = self.run_batch()
+        self.assertEqual(report["cases"][0]["status"], STATUS_SKIPPED)
+        # The running case finishes, or is cancelled before it starts
+        self.assertIn(report["cases"][1]["status"], [STATUS_FAILED, STATUS_INTERRUPTED])
+        self.assertEqual(report["failed"] + report["interrupted"], 1)
+        self.assertTrue(os.path.exists("summary.json"))
+
+
+class TestRunCase(unittest.TestCase):
+    def test_success(self):
+        with mock.patch("modules.process.run", return_value=[]):
+            result = run_case("cases/1", {})
+        self.assertEqual((result["name"], result["status"], result["spans"]), ("1", STATUS_SUCCESS, []))
+
+    def test_failure(self):
+        with mock.patch("modules.process.run", side_effect=ValueError("no sketch")):
+            result = run_case("cases/1", {})
+        self.assertEqual((result["status"], result["error"]), (STATUS_FAILED, "ValueError: no sketch"))
+
+    def test_interrupt_is_not_captured(self):
+        with mock.patch("modules.process.run", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                run_case("cases/1", {})
@@ -0,0 +1,10 @@
+import unittest
+
+from .test_stage_cache import TestStageCache
+from .test_process import TestCachedArtifacts
+
+
+def load_tests(suite, loader):
+    suite.addTests(loader.loadTestsFromTestCase(TestStageCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestCachedArtifacts))
+    return suite
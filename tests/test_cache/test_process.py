@@ -0,0 +1,54 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import contextlib
+from modules.constant import CONST
+from tests.legacy.sketches import synthetic_case
+
+
+def images(folder):
+    """ Content of the images of a folder and its subfolders, by relative path """
+    content = dict()
+    for root, _, files in os.walk(folder):
+        for name in files:
+            with open(os.path.join(root, name), "rb") as f:
+                content[os.path.relpath(os.path.join(root, name), folder)] = f.read()
+    return content
+
+
+class TestCachedArtifacts(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.folder = tempfile.mkdtemp()
+        self.case = synthetic_case(os.path.join(self.folder, "straight"), "straight")
+        # run writes to outputs/<case> and to the stage cache of the working directory
+        os.chdir(self.folder)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder)
+
+    def run_case(self, case):
+        from modules.process import run
+        with contextlib.redirect_stdout(io.StringIO()):
+            spans = run(case, headless=True, figure=False, artifacts=CONST.ARTIFACTS_ALL, cache=True, trace=False)
+        return {span["path"]: span["args"].get("cached") for span in spans if span["path"] in ["vehicles", "roads",
+                                                                                              "kinematics"]}
+
+    def test_cache_hit_writes_the_artifacts(self):
+        self.assertEqual(self.run_case(self.case), {"vehicles": False, "roads": False, "kinematics": False})
+        output = os.path.join(self.case, "output")
+        expected = images(output)
+        self.assertGreater(len(expected), 0)
+        shutil.rmtree(output)
+        self.assertEqual(self.run_case(self.case), {"vehicles": True, "roads": True, "kinematics": True})
+        self.assertEqual(images(output), expected)
+
+    def test_copied_case_is_computed(self):
+        self.run_case(self.case)
+        copy = shutil.copytree(self.case, os.path.join(self.folder, "copy", "straight"),
+                               ignore=shutil.ignore_patterns("output"))
+        self.assertEqual(self.run_case(copy), {"vehicles": False, "roads": False, "kinematics": False})
+        self.assertEqual(images(os.path.join(copy, "output")).keys(), images(os.path.join(self.case, "output")).keys())
@@ -0,0 +1,55 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from modules.cache import StageCache
+
+
+class TestStageCache(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.image = os.path.join(self.folder, "sketch.jpeg")
+        with open(self.image, "wb") as f:
+            f.write(b"sketch")
+        self.cache = StageCache(folder=os.path.join(self.folder, "cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_fetch_computes_once(self):
+        calls = list()
+        key = self.cache.key("vehicles", files=[self.image], boundary=np.array([[0, 190, 215], [179, 255, 255]]))
+        compute = lambda: calls.append(1) or {"red": np.arange(3)}
+        value, hit = self.cache.fetch(key, compute)
+        self.assertFalse(hit)
+        value, hit = StageCache(folder=self.cache.folder).fetch(key, compute)
+        self.assertTrue(hit)
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(np.array_equal(value["red"], np.arange(3)))
+
+    def test_key_changes_with_inputs(self):
+        key = self.cache.key("roads", files=[self.image], depends=["a"], car_length=10.0)
+        self.assertEqual(key, StageCache().key("roads", files=[self.image], depends=["a"], car_length=10.0))
+        self.assertNotEqual(key, self.cache.key("arrow", files=[self.image], depends=["a"], car_length=10.0))
+        self.assertNotEqual(key, self.cache.key("roads", files=[self.image], depends=["b"], car_length=10.0))
+        self.assertNotEqual(key, self.cache.key("roads", files=[self.image], depends=["a"], car_length=11.0))
+        with open(self.image, "wb") as f:
+            f.write(b"another sketch")
+        self.assertNotEqual(key, self.cache.key("roads", files=[self.image], depends=["a"], car_length=10.0))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.cache.max_size = 2500
+        for i, key in enumerate(["a", "b", "c"]):
+            self.cache.store(key, bytes(1000))
+            os.utime(self.cache.path(key), ns=(i * 10 ** 9, i * 10 ** 9))
+        self.assertEqual(len(self.cache.entries()), 2)
+        self.cache.load("b")
+        self.cache.store("d", bytes(1000))
+        self.assertEqual(sorted(os.path.basename(p) for _, _, p in self.cache.entries()), ["b.pkl", "d.pkl"])
+
+    def test_disabled_cache(self):
+        cache = StageCache(folder=self.cache.folder, enabled=False)
+        cache.store("a", 1)
+        self.assertEqual(cache.fetch("a", lambda: 2), (2, False))
+        self.assertFalse(os.path.exists(self.cache.folder))
@@ -0,0 +1,8 @@
+import unittest
+
+from .test_columnar import TestColumnar
+
+
+def load_tests(suite, loader):
+    suite.addTests(loader.loadTestsFromTestCase(TestColumnar))
+    return suite
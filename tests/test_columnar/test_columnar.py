@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from modules.constant import CONST
+from modules.crisce.vehicle import Vehicle
+from modules.models import Stripe
+from modules.columnar import write_columnar, load_columnar, to_dict
+from tests.legacy.output import road
+
+
+class TestColumnar(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        # The right stripe is clipped, its points have no z nor width
+        self.road = road(left=Stripe([(0, 7, 0, 0.1), (10, 7, 0, 0.1)], CONST.SINGLE, CONST.SOLID),
+                         center=Stripe([(0, 3.5, 0, 7), (10, 3.5, 0, 7)]),
+                         right=Stripe([(0.5, 0), (9.5, 0)], CONST.DOUBLE, CONST.DASHED))
+        script = [{'x': 1.5, 'y': 2, 'z': 0, 't': 0}, {'x': 4, 'y': 2, 'z': 0, 't': 0.5}]
+        self.vehicle = Vehicle(script, (1.5, 2, 0), (0, 0, -90), "red", CONST.RED_RGBA, [(1.5, 2, 0), (4, 2, 0)],
+                               [(1.5, 2, 0, 0.25), (4, 2, 0, 0.25)])
+        write_columnar(self.folder, "case", [self.road], [self.vehicle], [4, 2], 90)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_memory_mapped_arrays(self):
+        header, arrays = load_columnar(self.folder)
+        self.assertIsInstance(arrays["stripes"], np.memmap)
+        self.assertEqual(arrays["stripes"].shape, (6, 4))
+        self.assertTrue(np.isnan(arrays["stripes"][4:, 2:]).all())
+        self.assertEqual(header["roads"][0]["right"], {"offset": 4, "count": 2, "columns": 2, "num": CONST.DOUBLE,
+                                                       "pattern": CONST.DASHED})
+        np.testing.assert_array_equal(arrays["scripts"], [[1.5, 2, 0, 0], [4, 2, 0, 0.5]])
+
+    def test_data_json_schema(self):
+        data = to_dict(*load_columnar(self.folder, mmap_mode=None))
+        self.assertEqual(data["name"], "case")
+        self.assertEqual(data["crash_point"], [4, 2])
+        self.assertEqual(data["rot_deg"], 90)
+        road = data["roads"][0]
+        self.assertEqual(road["left"], {"points": [[0, 7, 0, 0.1], [10, 7, 0, 0.1]], "num": CONST.SINGLE,
+                                        "pattern": CONST.SOLID})
+        self.assertEqual(road["right"]["points"], [[0.5, 0], [9.5, 0]])
+        self.assertEqual(road["marks"], [])
+        vehicle = data["vehicles"][0]
+        self.assertEqual(list(vehicle.keys()), list(self.vehicle.obj_dict().keys()))
+        self.assertEqual(vehicle["script"], self.vehicle.script)
+        self.assertEqual(vehicle["spheres"], [list(s) for s in self.vehicle.spheres])
+        self.assertEqual(vehicle["color_code"], list(self.vehicle.color_code))
@@ -0,0 +1,10 @@
+import unittest
+
+from .test_writer import TestCommonRoadWriter
+from .test_reader import TestCommonRoadReader
+
+
+def load_tests(suite, loader):
+    suite.addTests(loader.loadTestsFromTestCase(TestCommonRoadWriter))
+    suite.addTests(loader.loadTestsFromTestCase(TestCommonRoadReader))
+    return suite
@@ -0,0 +1,44 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from modules.constant import CONST
+from modules.commonroad import CommonRoadReader, CommonRoadWriter
+from tests.legacy.output import two_lanes
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "ZAM_Tutorial-1_1_T-1.xml")
+
+
+class TestCommonRoadReader(unittest.TestCase):
+    def test_sample_scenario(self):
+        reader = CommonRoadReader(SAMPLE)
+        lanelets = list(reader.lanelets())
+        self.assertEqual(reader.attributes["benchmarkID"], "ZAM_Tutorial-1_1_T-1")
+        # The lanelet referenced by the planning problem is not a lanelet of the map
+        self.assertEqual([l.id for l in lanelets], [1, 2, 3])
+        self.assertEqual(lanelets[0].left.shape, (200, 2))
+
+        segments = reader.segments()
+        self.assertEqual(len(segments), 1)
+        lines = segments[0].lines
+        # The three lanes run along x, their bounds from left (top) to right (bottom)
+        self.assertEqual([line.coords[0, 1] for line in lines], [8.75, 5.25, 1.75, -1.75])
+        self.assertEqual(len(segments[0].lanes), 3)
+        self.assertAlmostEqual(segments[0].width, 10.5)
+
+    def test_round_trip(self):
+        road = two_lanes(range(6))
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, "commonroad.xml")
+            CommonRoadWriter().write(path, "case", [road], [])
+            segments = CommonRoadReader(path).segments()
+        finally:
+            shutil.rmtree(folder)
+        self.assertEqual(len(segments), 1)
+        lines = segments[0].lines
+        self.assertEqual([(line.num, line.pattern) for line in lines],
+                         [(CONST.SINGLE, CONST.SOLID), (CONST.DOUBLE, CONST.DASHED), (CONST.SINGLE, CONST.SOLID)])
+        for line, expected in zip(lines, [road.left, road.marks[0], road.right]):
+            np.testing.assert_allclose(line.coords, np.array(expected.points)[:, :2])
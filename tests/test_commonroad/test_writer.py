@@ -0,0 +1,57 @@
+import os
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from modules.constant import CONST
+from modules.crisce.vehicle import Vehicle
+from modules.commonroad import CommonRoadWriter
+from tests.legacy.output import two_lanes
+
+
+class TestCommonRoadWriter(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write(self):
+        # Two lanes along x, the stripes from the top (y = 7) to the bottom (y = 0)
+        road = two_lanes(range(5), mark_xs=range(3))
+        script = [{'x': 2 * t, 'y': 2, 'z': 0, 't': t} for t in [0, 0.25, 0.5]]
+        vehicles = [Vehicle(script, (0, 2, 0), (0, 0, -90), "red", CONST.RED_RGBA, [], []),
+                    Vehicle(script[:1], (0, 5, 0), (0, 0, -90), "blue", CONST.BLUE_RGBA, [], [])]
+        path = os.path.join(self.folder, "commonroad.xml")
+        CommonRoadWriter(time_step_size=0.1).write(path, "case_1", [road], vehicles)
+        return ET.parse(path).getroot()
+
+    def test_lanelets(self):
+        root = self.write()
+        self.assertEqual(root.get("commonRoadVersion"), "2020a")
+        self.assertEqual(root.get("benchmarkID"), "ZAM_case-1-1_1_T-1")
+        lanelets = root.findall("lanelet")
+        self.assertEqual([l.get("id") for l in lanelets], ["1", "2"])
+        for lanelet in lanelets:
+            left = [float(p.find("y").text) for p in lanelet.findall("leftBound/point")]
+            right = [float(p.find("y").text) for p in lanelet.findall("rightBound/point")]
+            self.assertEqual(len(left), len(right))
+            # Driving along +x, the left bound is above the right one
+            self.assertTrue(all(l > r for l, r in zip(left, right)))
+        self.assertEqual(lanelets[0].find("leftBound/lineMarking").text, "solid")
+        self.assertEqual(lanelets[0].find("rightBound/lineMarking").text, "broad_dashed")
+        self.assertEqual(lanelets[0].find("adjacentRight").get("ref"), "2")
+        self.assertEqual(lanelets[1].find("adjacentLeft").get("ref"), "1")
+
+    def test_dynamic_obstacles(self):
+        obstacles = self.write().findall("dynamicObstacle")
+        self.assertEqual([o.get("id") for o in obstacles], ["3", "4"])
+        moving, stationary = obstacles
+        times = [int(s.find("time/exact").text) for s in moving.findall("trajectory/state")]
+        self.assertEqual(int(moving.find("initialState/time/exact").text), 0)
+        self.assertEqual(times, [1, 2, 3, 4, 5])
+        xs = [float(s.find("position/point/x").text) for s in moving.findall("trajectory/state")]
+        self.assertAlmostEqual(xs[-1], 1.0)
+        self.assertAlmostEqual(float(moving.find("initialState/velocity/exact").text), 2.0)
+        self.assertIsNone(stationary.find("trajectory"))
+        self.assertAlmostEqual(float(stationary.find("initialState/velocity/exact").text), 0.0)
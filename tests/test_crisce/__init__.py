@@ -0,0 +1,17 @@
+import unittest
+
+from .test_roads import TestRoads
+from .test_bezier import TestBezier
+from .test_car import TestCar
+from .test_trajectory import TestTrajectory, TestLegacyScripts
+from .test_artifacts import TestArtifacts
+
+
+def load_tests(suite, loader):
+    suite.addTests(loader.loadTestsFromTestCase(TestRoads))
+    suite.addTests(loader.loadTestsFromTestCase(TestBezier))
+    suite.addTests(loader.loadTestsFromTestCase(TestCar))
+    suite.addTests(loader.loadTestsFromTestCase(TestTrajectory))
+    suite.addTests(loader.loadTestsFromTestCase(TestLegacyScripts))
+    suite.addTests(loader.loadTestsFromTestCase(TestArtifacts))
+    return suite
@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import cv2
+from unittest import mock
+from modules.constant import CONST
+from modules.crisce.artifacts import ArtifactWriter
+
+
+class TestArtifacts(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.image = np.full((20, 30, 3), 200, dtype=np.uint8)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def path(self, name):
+        return os.path.join(self.folder, name)
+
+    def written(self):
+        return sorted(os.listdir(self.folder))
+
+    def test_levels(self):
+        for level, expected in [(CONST.ARTIFACTS_NONE, []), (CONST.ARTIFACTS_FINAL, ["final.png"]),
+                                (CONST.ARTIFACTS_ALL, ["final.png", "intermediate.png"])]:
+            with self.subTest(level=level):
+                with ArtifactWriter(level) as artifacts:
+                    artifacts.write(self.path("intermediate.png"), self.image)
+                    artifacts.write(self.path("final.png"), self.image, final=True)
+                self.assertEqual(self.written(), expected)
+                for name in self.written():
+                    os.remove(self.path(name))
+
+    def test_close_flushes(self):
+        artifacts = ArtifactWriter(max_queue=2)
+        for i in range(10):
+            artifacts.write(self.path(f'{i}.png'), self.image)
+        artifacts.close()
+        self.assertEqual(len(self.written()), 10)
+        self.assertIsNone(artifacts.thread)
+
+    def test_copied_when_queued(self):
+        artifacts = ArtifactWriter()
+        artifacts.write(self.path("image.png"), self.image)
+        # The caller keeps drawing on the image while it waits in the queue
+        self.image[:] = 0
+        artifacts.close()
+        np.testing.assert_array_equal(cv2.imread(self.path("image.png")), np.full_like(self.image, 200))
+
+    def test_errors_do_not_stop_the_thread(self):
+        artifacts = ArtifactWriter()
+        encoded = (True, np.frombuffer(b"png", np.uint8))
+        with mock.patch("cv2.imencode", side_effect=[RuntimeError("encoder"), encoded, encoded]):
+            artifacts.write(self.path("broken.png"), self.image)
+            artifacts.write(self.path(os.path.join("missing", "image.png")), self.image)
+            artifacts.write(self.path("image.png"), self.image)
+            with self.assertLogs(level="WARNING") as logs:
+                artifacts.close()
+        self.assertEqual(self.written(), ["image.png"])
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn("broken.png", logs.output[0])
@@ -0,0 +1,40 @@
+import unittest
+import numpy as np
+from modules.crisce import bezier
+from modules.crisce.PythonRobotics.PathPlanning.BezierPath import bezier_path
+
+
+class TestBezier(unittest.TestCase):
+    def setUp(self):
+        self.control_points = np.array([[10, 20], [35, 40], [60, 38], [90, 70], [120, 65], [150, 100], [160, 140]])
+
+    def test_path_matches_pointwise_evaluation(self):
+        expected = bezier_path.calc_bezier_path(self.control_points, n_points=90)
+        np.testing.assert_allclose(bezier.bezier_path(self.control_points, 90), expected, rtol=1e-12, atol=1e-9)
+
+    def test_basis_is_cached_and_read_only(self):
+        basis = bezier.bernstein_basis(6, 90)
+        self.assertIs(basis, bezier.bernstein_basis(6, 90))
+        self.assertFalse(basis.flags.writeable)
+        np.testing.assert_allclose(basis.sum(axis=1), np.ones(90))
+
+    def test_derivatives_and_curvature(self):
+        t = np.linspace(0, 1, 25)
+        _, dt, ddt = bezier.evaluate(self.control_points, n_derivatives=2, t=t)
+        w = bezier_path.bezier_derivatives_control_points(self.control_points, 2)
+        for j, tj in enumerate(t):
+            expected_dt = bezier_path.bezier(tj, w[1])
+            expected_ddt = bezier_path.bezier(tj, w[2])
+            np.testing.assert_allclose(dt[j], expected_dt, rtol=1e-12, atol=1e-9)
+            np.testing.assert_allclose(ddt[j], expected_ddt, rtol=1e-12, atol=1e-9)
+            self.assertAlmostEqual(bezier.curvature(self.control_points, t=t)[j],
+                                   bezier_path.curvature(*expected_dt, *expected_ddt))
+
+    def test_derivative_of_a_point(self):
+        path, dt = bezier.evaluate(np.array([[3.0, 4.0]]), n_points=5, n_derivatives=1)
+        np.testing.assert_allclose(path, np.tile([3.0, 4.0], (5, 1)))
+        np.testing.assert_allclose(dt, np.zeros((5, 2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import numpy as np
+from modules.constant import CONST
+from modules.crisce.car import Car
+from modules.crisce.artifacts import ArtifactWriter
+from modules.crisce.pre_processing import Pre_Processing, VEHICLE_COLORS
+from tests.legacy.car import legacy_segmentation, legacy_closest_nodes, legacy_extract_triangle, \
+    legacy_projected_sides, projected_sides, synthetic_vehicles, synthetic_sketch, stacks_of
+
+
+class TestCar(unittest.TestCase):
+    def test_segmentation_matches_legacy(self):
+        car, image = synthetic_sketch(5, 300, 200, seed=1)
+        expected_masks, expected = legacy_segmentation(car.pre_process, image)
+        masks, segments = car.pre_process.segmentVehicles(image)
+        self.assertEqual(list(segments), ["red", "blue"])
+        for vehicle_color in expected:
+            self.assertTrue(np.array_equal(masks[vehicle_color], expected_masks[vehicle_color]))
+            self.assertTrue(np.array_equal(segments[vehicle_color], expected[vehicle_color]))
+
+    def test_segmentation_extends_to_more_colors(self):
+        car, image = synthetic_sketch(5, 300, 200, seed=1)
+        _, expected = car.pre_process.segmentVehicles(image)
+        green = {"boundary": np.array([[40, 100, 100], [80, 255, 255]]), "blur": (3, 3)}
+        pre_process = Pre_Processing(vehicle_colors=dict(VEHICLE_COLORS, green=green))
+        _, segments = pre_process.segmentVehicles(image)
+        self.assertEqual(list(segments), ["red", "blue", "green"])
+        self.assertFalse(segments["green"].any())
+        for vehicle_color in expected:
+            self.assertTrue(np.array_equal(segments[vehicle_color], expected[vehicle_color]))
+
+    def test_closest_nodes_matches_pairwise_min(self):
+        rng = np.random.default_rng(5)
+        # A coarse grid produces many equally distant candidates
+        nodes_1 = rng.integers(0, 10, size=(40, 2))
+        nodes_2 = rng.integers(0, 10, size=(30, 2))
+        expected = min([float(np.hypot(*(p1 - p2))), p1.tolist(), p2.tolist()] for p1 in nodes_1 for p2 in nodes_2)
+        self.assertEqual(Car().closestNodes(nodes_1, nodes_2), expected)
+
+    def test_crash_point_matches_legacy(self):
+        car = synthetic_vehicles(6, seed=2)
+        car.output_folder, car.process_number = "", 0
+        car.artifacts = ArtifactWriter(level=CONST.ARTIFACTS_NONE, asynchronous=False)
+        expected = legacy_closest_nodes(stacks_of(car))
+        crash_point = car.extractingCrashPoint(np.zeros((1000, 1000, 3), dtype=np.uint8), dict())
+        self.assertEqual(crash_point, [(expected[1][0] + expected[2][0]) // 2, (expected[1][1] + expected[2][1]) // 2])
+        self.assertEqual(car.vehicles["blue"]["crash_point"]["dist_to_vehicle"], expected[0])
+
+    def test_extract_triangle_matches_legacy(self):
+        # Snapshots cross the image borders and overlap at the crossing of the paths
+        car, image = synthetic_sketch(7, 400, 300, seed=4)
+        car.output_folder, car.process_number, car.headless = "", 0, True
+        car.artifacts = ArtifactWriter(level=CONST.ARTIFACTS_NONE, asynchronous=False)
+        legacy_image = image.copy()
+        expected = legacy_extract_triangle(car.vehicles, legacy_image)
+        car.extractTriangle(image, dict())
+        for (vehicle_color, vehicle_id), position in expected.items():
+            self.assertEqual(car.vehicles[vehicle_color]["vehicle_info"][vehicle_id]["triangle_position"], position)
+        np.testing.assert_array_equal(image, legacy_image)
+
+    def test_side_candidates_match_every_pixel_of_the_side(self):
+        car, rng = Car(), np.random.default_rng(8)
+        h, w = 90, 120
+        front_points = [[0, 0], [w, h], [0, 45], [60, 0]] + rng.integers(0, 90, size=(12, 2)).tolist()
+        for front_point in np.array(front_points, dtype=np.float64):
+            for side in car.frameReference(h, w).values():
+                every_angle = set(car.sideAngles(front_point, side, np.arange(side[2])).tolist())
+                for orientation in range(0, 361):
+                    angles = car.sideAngles(front_point, side, car.sideCandidates(front_point, side, orientation))
+                    self.assertEqual(bool(np.any(angles == orientation)), orientation in every_angle)
+
+    def test_projected_sides_match_legacy(self):
+        car = synthetic_vehicles(8, 640, 480, seed=6)
+        for vehicle_color in car.vehicles:
+            self.assertEqual(projected_sides(car, vehicle_color, 480, 640),
+                             legacy_projected_sides(car, vehicle_color, 480, 640))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import math
+import unittest
+import numpy as np
+from modules.crisce.roads import Roads
+from tests.legacy.roads import legacy_remove_redundant_midpoints, synthetic_midpoints
+
+
+class TestRoads(unittest.TestCase):
+    def test_nearest_point_pairs_matches_pairwise_min(self):
+        rng = np.random.default_rng(42)
+        # A coarse grid produces many equally distant candidates
+        points_1 = rng.integers(0, 20, size=(60, 2)).astype(np.int32)
+        points_2 = rng.integers(0, 20, size=(80, 2)).astype(np.int32)
+
+        expected = []
+        for p1 in points_1:
+            candidates = [[math.sqrt(math.pow(p2[0] - p1[0], 2) + math.pow(p2[1] - p1[1], 2)), p1.tolist(),
+                           p2.tolist()] for p2 in points_2]
+            expected.append(min(candidates))
+
+        self.assertEqual(Roads().nearestPointPairs(points_1, points_2), expected)
+
+    def test_remove_redundant_midpoints_matches_legacy(self):
+        midpoints = synthetic_midpoints(300, seed=7)
+        expected = legacy_remove_redundant_midpoints(midpoints, 15)
+        actual = Roads().removeRedundantMidpointsOfLane(midpoints, 15)
+        self.assertEqual(len(actual), len(expected))
+        np.testing.assert_allclose(np.array(actual, dtype=float), np.array(expected, dtype=float))
+
+    def test_remove_redundant_midpoints_of_a_single_point(self):
+        self.assertEqual(Roads().removeRedundantMidpointsOfLane([[10, 10], [10, 10]], 15), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import io
+import unittest
+import contextlib
+import numpy as np
+from modules.crisce.trajectory import Trajectory, SCRIPT_DTYPE, script_dicts
+from tests.legacy.kinematics import synthetic_vehicles, plan, legacy_plan
+
+
+class TestTrajectory(unittest.TestCase):
+    def setUp(self):
+        self.trajectory = Trajectory(np.array([[0, 0], [3, 4], [3, 10], [0, 14]]))
+
+    def test_arc_length(self):
+        np.testing.assert_allclose(self.trajectory.segments, [5, 6, 5])
+        np.testing.assert_allclose(self.trajectory.distances, [0, 5, 11, 16])
+        self.assertEqual(self.trajectory.length, 16)
+
+    def test_resample(self):
+        resampled = self.trajectory.resample(2)
+        self.assertEqual(len(resampled), 9)
+        # The points are 2 apart along the trajectory, the chords across its corners are shorter
+        np.testing.assert_allclose(resampled.points[1:3], [[1.2, 1.6], [2.4, 3.2]])
+        np.testing.assert_allclose(resampled.points[3:5], [[3, 5], [3, 7]])
+        np.testing.assert_allclose(resampled.points[[0, -1]], [[0, 0], [0, 14]])
+        np.testing.assert_allclose(self.trajectory.at_distance([2.5, 8]), [[1.5, 2], [3, 7]])
+
+    def test_speed_profiles(self):
+        np.testing.assert_allclose(self.trajectory.timestamps(2, start=1), [1, 3.5, 6.5, 9])
+        # The speed of a segment is the mean of the speeds of its points
+        np.testing.assert_allclose(self.trajectory.timestamps([4, 6, 6, 4]), [0, 1, 2, 3])
+        timestamps = self.trajectory.steps(0.5, start=0.25)
+        np.testing.assert_allclose(timestamps, [0.25, 0.75, 1.25, 1.75])
+        np.testing.assert_allclose(self.trajectory.at_time([0.5, 1.5], timestamps), [[1.5, 2], [1.5, 12]])
+
+    def test_script(self):
+        nodes = self.trajectory.script(self.trajectory.steps(0.1))
+        self.assertEqual(nodes.dtype, SCRIPT_DTYPE)
+        self.assertEqual(script_dicts(nodes)[1], {'x': 3, 'y': 4, 'z': 0, 't': 0.1})
+
+    def test_empty(self):
+        for points in [[], np.empty((0, 2)), np.empty((0, 3))]:
+            trajectory = Trajectory(points)
+            self.assertEqual((len(trajectory), trajectory.length), (0, 0))
+            self.assertEqual(trajectory.points.shape, (0, 2))
+            self.assertEqual(len(trajectory.timestamps(2)), 0)
+            self.assertEqual(script_dicts(trajectory.script(trajectory.steps(0.1))), [])
+
+    def test_single_point(self):
+        trajectory = Trajectory([[3, 4, 0]])
+        self.assertEqual(trajectory.length, 0)
+        np.testing.assert_allclose(trajectory.timestamps(2, start=1), [1])
+        np.testing.assert_allclose(trajectory.resample(2).points, [[3, 4]])
+
+
+class TestLegacyScripts(unittest.TestCase):
+    def test_same_as_legacy(self):
+        for num_points in [2, 50, 1000]:
+            with self.subTest(num_points=num_points):
+                # Kinematics prints the time stamps of the vehicles
+                with contextlib.redirect_stdout(io.StringIO()):
+                    planned = plan(synthetic_vehicles(num_points))
+                for color, (arc, script) in legacy_plan(planned).items():
+                    self.assertAlmostEqual(planned[color]["kinematics"]["arc_length"], arc, delta=1e-9 * arc)
+                    self.assertEqual(script_dicts(planned[color]["trajectories"]["script_trajectory"]), script)
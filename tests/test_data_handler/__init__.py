@@ -0,0 +1,8 @@
+import unittest
+
+from .test_json import TestStreamingJson
+
+
+def load_tests(suite, loader):
+    suite.addTests(loader.loadTestsFromTestCase(TestStreamingJson))
+    return suite
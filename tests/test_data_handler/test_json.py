@@ -0,0 +1,35 @@
+import io
+import json
+import unittest
+from unittest import mock
+from modules.constant import CONST
+from modules.crisce.vehicle import Vehicle
+from modules import data_handler
+from modules.data_handler import DataHandler
+from tests.legacy.output import two_lanes
+
+
+class TestStreamingJson(unittest.TestCase):
+    def setUp(self):
+        roads = [two_lanes(marks=False), two_lanes()]
+        vehicles = [Vehicle([{'x': x, 'y': 2, 'z': 0, 't': x / 10} for x in range(5)], (0, 2, 0), (0, 0, -90), "red",
+                            CONST.RED_RGBA, [], [], delay=0.5),
+                    Vehicle([{'x': 2, 'y': y, 'z': 0, 't': y / 10} for y in range(5)], (2, 0, 0), (0, 0, 0), "blue",
+                            CONST.BLUE_RGBA, [], [])]
+        self.dh = DataHandler(vehicles=vehicles, roads=roads, sketch_name="case", rot_deg=90)
+        vehicles, crash_point = self.dh.vehicles2json()
+        self.expected = {"name": "case", "roads": self.dh.roads2json(), "vehicles": vehicles,
+                         "crash_point": crash_point, "rot_deg": 90}
+
+    def stream(self):
+        outfile = io.BytesIO()
+        self.dh.write_json(outfile)
+        return outfile.getvalue()
+
+    def test_same_document(self):
+        self.assertEqual(json.loads(self.stream()), json.loads(json.dumps(self.expected)))
+
+    def test_standard_library_encoder(self):
+        # Without orjson the document is the one of json.dumps
+        with mock.patch.object(data_handler, "orjson", None):
+            self.assertEqual(self.stream().decode(), json.dumps(self.expected))
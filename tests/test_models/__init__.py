@@ -0,0 +1,13 @@
+import unittest
+
+from .test_records import TestStripe, TestVehicle
+from .test_lines import TestLine, TestSegment, TestOrderPoints
+
+
+def load_tests(suite, loader):
+    suite.addTests(loader.loadTestsFromTestCase(TestStripe))
+    suite.addTests(loader.loadTestsFromTestCase(TestVehicle))
+    suite.addTests(loader.loadTestsFromTestCase(TestLine))
+    suite.addTests(loader.loadTestsFromTestCase(TestSegment))
+    suite.addTests(loader.loadTestsFromTestCase(TestOrderPoints))
+    return suite
@@ -0,0 +1,89 @@
+import unittest
+import numpy as np
+from shapely.geometry import LineString
+from modules.common import order_points
+from modules.models import Line
+from modules.models.segment import Segment
+
+
+class TestLine(unittest.TestCase):
+    def setUp(self):
+        self.ls = LineString([(0, 1), (2, 3), (4, 3)])
+        self.line = Line(ls=self.ls)
+        self.line.num, self.line.pattern = "single", "solid"
+
+    def assertUnchanged(self, line):
+        self.assertIs(line.ls, self.ls)
+        np.testing.assert_array_equal(line.coords, [[0, 1], [2, 3], [4, 3]])
+        self.assertEqual(list(self.ls.coords), [(0, 1), (2, 3), (4, 3)])
+
+    def test_flip(self):
+        flipped = self.line.flip(10)
+        np.testing.assert_array_equal(flipped.coords, [[0, 9], [2, 7], [4, 7]])
+        self.assertEqual((flipped.num, flipped.pattern), ("single", "solid"))
+        self.assertUnchanged(self.line)
+        self.assertFalse(np.shares_memory(flipped.coords, self.line.coords))
+
+    def test_scale(self):
+        scaled = self.line.scale(2)
+        np.testing.assert_array_equal(scaled, [[0, 2], [4, 6], [8, 6]])
+        scaled[0, 0] = 100
+        self.assertUnchanged(self.line)
+
+    def test_with_coords(self):
+        coords = np.array([[1.0, 1.0], [2.0, 2.0]])
+        line = self.line.with_coords(coords)
+        self.assertEqual(list(line.ls.coords), [(1, 1), (2, 2)])
+        self.assertUnchanged(self.line)
+        with self.assertRaises(ValueError):
+            line.coords[0, 0] = 0
+        # The attributes are copied, a new attribute of the new line is not set on the original one
+        line.pattern = "dashed"
+        self.assertEqual(self.line.pattern, "solid")
+
+    def test_read_only(self):
+        with self.assertRaises(ValueError):
+            self.line.coords[0, 0] = 5
+        self.assertUnchanged(self.line)
+
+
+class TestSegment(unittest.TestCase):
+    def setUp(self):
+        self.coords = [[[0, 0], [10, 0]], [[0, 4], [10, 4]], [[0, 8], [10, 8]]]
+        self.segment = Segment("straight", LineString([(0, 4), (10, 4)]), width=8,
+                               left_boundary=LineString(self.coords[0]), right_boundary=LineString(self.coords[-1]))
+        self.segment.lines = [Line(ls=LineString(coords)) for coords in self.coords]
+        for line in self.segment.lines:
+            line.num, line.pattern = "single", "solid"
+
+    def assertUnchanged(self):
+        for line, coords in zip(self.segment.lines, self.coords):
+            np.testing.assert_array_equal(line.coords, coords)
+            self.assertEqual(list(line.ls.coords), list(map(tuple, coords)))
+
+    def test_flip(self):
+        lines = self.segment.lines
+        flipped = self.segment.flip(10)
+        self.assertIs(self.segment.lines, lines)
+        np.testing.assert_array_equal(flipped[0].coords, [[0, 10], [10, 10]])
+        self.assertUnchanged()
+
+    def test_bng_segment(self):
+        flipped = self.segment.flip(10)
+        self.segment.get_bng_segment(flipped, 1)
+        bng_segment = self.segment.bng_segment
+        self.assertEqual(bng_segment.width, 8)
+        self.assertEqual(bng_segment.center.points, [(0, 6, 0, 8), (10, 6, 0, 8)])
+        self.assertEqual(bng_segment.marks[0].points, [(0, 6, 0, 0.1), (10, 6, 0, 0.1)])
+        np.testing.assert_array_equal(flipped[0].coords, [[0, 10], [10, 10]])
+        self.assertUnchanged()
+
+
+class TestOrderPoints(unittest.TestCase):
+    def test_not_modified(self):
+        points = [[5, 0.1], [0, 0], [10, 0.2], [2, 0.05]]
+        copy = [list(p) for p in points]
+        ordered = order_points(points, 1)
+        self.assertEqual(ordered, [[0, 0], [2, 0.05], [5, 0.1], [10, 0.2]])
+        self.assertEqual(points, copy)
+        self.assertIsNot(ordered, points)
@@ -0,0 +1,55 @@
+import unittest
+import numpy as np
+from modules.constant import CONST
+from modules.crisce.vehicle import Vehicle
+from modules.models import Line, Stripe
+from modules.models.lib import generate
+
+
+class TestStripe(unittest.TestCase):
+    def test_generate(self):
+        line = Line(ls=None).with_coords(np.array([[0, 1], [2, 3]]))
+        stripe = Stripe(generate(line, 2, 0.1), CONST.SINGLE, CONST.SOLID)
+        self.assertEqual(stripe.points, [(0, 2, 0, 0.1), (4, 6, 0, 0.1)])
+        self.assertEqual(stripe.to_dict(), {"points": [[0, 2, 0, 0.1], [4, 6, 0, 0.1]], "num": CONST.SINGLE,
+                                            "pattern": CONST.SOLID})
+
+    def test_clipped_points(self):
+        stripe = Stripe([(0, 7, 0, 0.1), (10, 7, 0, 0.1)])
+        # Slash sets (x, y) points
+        stripe.points = [(0.5, 7), (9.5, 7)]
+        self.assertEqual(stripe.columns, 2)
+        self.assertEqual(stripe.points, [(0.5, 7), (9.5, 7)])
+        self.assertTrue(np.isnan(stripe.nodes["width"]).all())
+        self.assertEqual(Stripe([]).points, [])
+
+    def test_read_only(self):
+        stripe = Stripe([(0, 7, 0, 0.1)])
+        with self.assertRaises(ValueError):
+            stripe.nodes["x"][0] = 1
+        with self.assertRaises(ValueError):
+            stripe.array[0, 0] = 1
+
+
+class TestVehicle(unittest.TestCase):
+    def setUp(self):
+        self.script = [{'x': 0, 'y': 2, 'z': 0, 't': 0}, {'x': 3, 'y': 6, 'z': 0, 't': 0.5}]
+        self.vehicle = Vehicle(self.script, (0, 2, 0), (0, 0, -90), "red", CONST.RED_RGBA, [(0, 2, 0)],
+                               [(0, 2, 0, 0.25)])
+
+    def test_script(self):
+        self.assertEqual(self.vehicle.script, self.script)
+        self.assertEqual(self.vehicle.nodes["t"].tolist(), [0, 0.5])
+        self.vehicle.set_speed()
+        self.assertAlmostEqual(self.vehicle.speed, 10)
+
+    def test_single_node(self):
+        vehicle = Vehicle(self.script[:1], (0, 2, 0), (0, 0, -90), "blue", CONST.BLUE_RGBA, [], [])
+        vehicle.set_speed()
+        self.assertEqual(vehicle.speed, 0.0)
+
+    def test_obj_dict(self):
+        obj = self.vehicle.obj_dict()
+        self.assertEqual(list(obj.keys()), Vehicle.FIELDS)
+        self.assertEqual(obj["script"], self.script)
+        self.assertFalse(hasattr(self.vehicle, "__dict__"))
@@ -0,0 +1,8 @@
+import unittest
+
+from .test_tracer import TestTracer
+
+
+def load_tests(suite, loader):
+    suite.addTests(loader.loadTestsFromTestCase(TestTracer))
+    return suite
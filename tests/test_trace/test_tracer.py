@@ -0,0 +1,59 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from modules.trace import Tracer, aggregate
+
+
+class TestTracer(unittest.TestCase):
+    def trace(self):
+        tracer = Tracer()
+        with tracer.span("vehicles", cached=False):
+            with tracer.span("segmentation"):
+                sum(range(1000))
+            with tracer.span("contours"):
+                pass
+        with self.assertRaises(ValueError):
+            with tracer.span("roads"):
+                raise ValueError()
+        return tracer
+
+    def test_nested_spans(self):
+        spans = self.trace().records()
+        self.assertEqual([s["path"] for s in spans],
+                         ["vehicles", "vehicles/segmentation", "vehicles/contours", "roads"])
+        self.assertEqual([s["depth"] for s in spans], [0, 1, 1, 0])
+        self.assertEqual(spans[0]["args"], {"cached": False})
+        self.assertEqual(spans[3]["args"], {"error": "ValueError"})
+        for span in spans:
+            self.assertGreaterEqual(span["wall_time"], 0)
+        self.assertGreaterEqual(spans[0]["wall_time"], spans[1]["wall_time"] + spans[2]["wall_time"])
+
+    def test_disabled_tracer(self):
+        tracer = Tracer(enabled=False)
+        with tracer.span("vehicles") as span:
+            span["cached"] = True
+        self.assertEqual(tracer.records(), [])
+
+    def test_chrome_trace(self):
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, "case", "trace.json")
+            self.trace().write(path)
+            with open(path) as f:
+                trace = json.load(f)
+        finally:
+            shutil.rmtree(folder)
+        events = trace["traceEvents"]
+        self.assertEqual([e["name"] for e in events], ["vehicles", "segmentation", "contours", "roads"])
+        self.assertTrue(all(e["ph"] == "X" and e["dur"] >= 0 for e in events))
+        self.assertLessEqual(events[0]["ts"], events[1]["ts"])
+        self.assertEqual(events[1]["args"]["path"], "vehicles/segmentation")
+
+    def test_aggregate(self):
+        stages = aggregate([self.trace().records(), self.trace().records()])
+        self.assertEqual(stages["vehicles/segmentation"]["count"], 2)
+        wall_time = stages["vehicles"]["wall_time"]
+        self.assertAlmostEqual(wall_time["mean"], wall_time["total"] / 2)
+        self.assertGreaterEqual(wall_time["max"], wall_time["mean"])
@@ -0,0 +1,8 @@
+import unittest
+
+from .test_slash import TestSlash
+
+
+def load_tests(suite, loader):
+    suite.addTests(loader.loadTestsFromTestCase(TestSlash))
+    return suite
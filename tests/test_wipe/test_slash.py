@@ -0,0 +1,31 @@
+import copy
+import unittest
+from modules.wipe import Slash
+from tests.legacy.wipe import legacy_simplify, star_segments, grid_segments
+
+
+class TestSlash(unittest.TestCase):
+    def test_simplify_intersection_matches_legacy(self):
+        for num_legs in [3, 4, 5]:
+            segments = star_segments(num_legs)
+            expected = legacy_simplify(copy.deepcopy(segments))
+            self.assertEqual(Slash(segments).simplify(), expected)
+
+    def test_simplify_map_matches_legacy(self):
+        segments = grid_segments(3, 3)
+        expected = legacy_simplify(copy.deepcopy(segments))
+        self.assertEqual(Slash(segments).simplify(), expected)
+
+    def test_simplify_does_not_modify_segments(self):
+        segments = star_segments(4)
+        original = copy.deepcopy(segments)
+        Slash(segments).simplify()
+        self.assertEqual(segments, original)
+
+    def test_simplify_single_segment(self):
+        segments = star_segments(1)
+        self.assertEqual(Slash(segments).simplify(), segments)
+
+
+if __name__ == '__main__':
+    unittest.main()